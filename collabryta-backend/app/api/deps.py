@@ -1,26 +1,67 @@
 from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from app import models, schemas, core
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.tracing import route_template
+from app.core.rate_limit import DatabaseBackend, MemoryBackend, RateLimiter, RateLimitExceeded, retry_after_header
+from app.db.session import SessionLocal, engine, recent_writers
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_db() -> Generator:
+rate_limiter = RateLimiter(
+    DatabaseBackend(engine) if settings.RATE_LIMIT_BACKEND == "database" else MemoryBackend(),
+    settings.RATE_LIMITS,
+    settings.RATE_LIMIT_DEFAULT,
+)
+
+def _rate_limit_principal(request: Request) -> str:
+    # Signature check only, no DB lookup: this runs before the request gets a session
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            sub = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            if sub is not None:
+                return f"user:{sub}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+def rate_limit(request: Request) -> None:
+    """Spends a token from the caller's budget for this route; 429 with Retry-After once it is empty."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    # The route template, so /tasks/1 and /tasks/2 share the "/tasks/{id}" budget
+    path = route_template(request.scope) or request.url.path
+    try:
+        rate_limiter.check(f"{request.method} {path[len(settings.API_V1_STR):]}", _rate_limit_principal(request))
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers=retry_after_header(e.retry_after),
+        )
+
+def get_db(request: Request) -> Generator:
     try:
         db = SessionLocal()
+        # Safe methods may read from a replica; get_current_user turns this off for recent writers
+        db.info["read_only"] = request.method in ("GET", "HEAD")
         yield db
     finally:
         db.close()
 
+def get_session_factory(db: Session = Depends(get_db)) -> sessionmaker:
+    """Session factory for background work that outlives the request, bound to the same database."""
+    return sessionmaker(bind=db.get_bind(), autoflush=False, expire_on_commit=False)
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
@@ -40,6 +81,10 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    # Commits are attributed to the caller so their next reads see their own writes
+    db.info["principal"] = token_data
+    if token_data in recent_writers:
+        db.info["read_only"] = False
     user = db.query(models.User).filter(models.User.email == token_data).first() # Assuming sub is email, typical for OAuth
     if not user:
          # Fallback check if sub is ID
@@ -51,4 +96,12 @@ def get_current_user(
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # As at login: a deactivated account's tokens stop working too
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return user
+
+def get_current_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+    if current_user.email.lower() not in {email.lower() for email in settings.ADMIN_EMAILS}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
@@ -6,7 +6,12 @@ from app.api.v1.endpoints import (
     files, 
     meetings, 
     notifications,
-    tasks
+    tasks,
+    dashboard,
+    sync,
+    export,
+    mentions,
+    admin
 )
 
 api_router = APIRouter()
@@ -19,3 +24,8 @@ api_router.include_router(files.router, prefix="/files", tags=["files"])
 api_router.include_router(meetings.router, prefix="/meetings", tags=["meetings"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(mentions.router, prefix="/mentions", tags=["mentions"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.api import deps
+from app.core.config import settings
+from app.core.profiler import ProfileSession, profiler, route_pattern
+
+router = APIRouter()
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10, gt=0),
+    route: Optional[str] = None,
+    requests: Optional[int] = Query(None, ge=1),
+    interval_ms: int = Query(settings.PROFILER_INTERVAL_MS, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    current_user = Depends(deps.get_current_admin),
+):
+    """
+    Samples this worker's Python stacks and returns them for a flamegraph:
+    folded stacks as text, or a speedscope JSON file.
+
+    Without `route` the whole worker is sampled for `seconds`. With one
+    (e.g. `/messages/conversations`, `{param}` matches a path segment) only
+    requests to it are sampled, until `requests` of them finish or `seconds`
+    pass. Only the worker serving this call is profiled.
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=422, detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}")
+    session = ProfileSession(
+        interval_ms / 1000,
+        route=route_pattern(route, settings.API_V1_STR) if route else None,
+        requests=requests if route else None,
+    )
+    session.finished = asyncio.Event()
+    if not profiler.begin(session):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        await asyncio.wait_for(session.finished.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        # Joins the sampler thread, which may be mid-sample
+        await run_in_threadpool(profiler.end, session)
+
+    headers = {"X-Profile-Samples": str(session.sample_count)}
+    if route:
+        headers["X-Profile-Requests"] = str(session.completed)
+    if format == "speedscope":
+        headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+        return JSONResponse(session.speedscope(route or "all requests"), headers=headers)
+    return PlainTextResponse(session.collapsed(), headers=headers)
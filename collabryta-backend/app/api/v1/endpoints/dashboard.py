@@ -0,0 +1,22 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app import schemas, models
+from app.api import deps
+from app.services import dashboard_service
+
+router = APIRouter()
+
+@router.get("/summary", response_model=schemas.DashboardSummary)
+def read_dashboard_summary(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    meetings_limit: int = Query(5, ge=0, le=50),
+    files_limit: int = Query(5, ge=0, le=50),
+) -> Any:
+    """
+    Task, meeting, message, notification and file counters for the dashboard in one call.
+    """
+    return dashboard_service.get_summary(
+        db, user_id=current_user.id, meetings_limit=meetings_limit, files_limit=files_limit
+    )
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app import models
+from app.api import deps
+from app.services import export_service
+
+router = APIRouter()
+
+@router.get("/{kind}")
+def export_data(
+    kind: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+):
+    """
+    Stream the current user's messages, tasks, meetings or file metadata as NDJSON or CSV.
+    Rows are read from a server-side cursor and written out batch by batch.
+    """
+    if kind not in export_service.EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+
+    filename = f"{kind}.{format}"
+    media_type = export_service.FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        export_service.export(db, kind, current_user.id, fmt=format, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,22 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status, UploadFile, File, Form
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 from typing import List
-from app.api.deps import get_db, get_current_user
-from app.schemas.file import FileResponse
-from app.services import file_service
+from urllib.parse import quote
+from app.api.deps import get_db, get_current_user, get_session_factory
+from app.core import storage, tracing
+from app.core.config import settings
+from app.schemas.file import FileResponse, UploadSessionCreate, UploadSessionResponse
+from app.services import file_service, preview_service, upload_service
 from app.models.user import User
 
 router = APIRouter()
 
+def _schedule_preview(background_tasks: BackgroundTasks, session_factory: sessionmaker, db_file) -> None:
+    # Type sniffing and thumbnails happen after the response, in the preview process pool
+    background_tasks.add_task(
+        tracing.in_background(preview_service.generate_preview), session_factory, db_file.id, db_file.owner_id, db_file.filename
+    )
+
 @router.post("/upload", response_model=FileResponse)
 async def upload_file(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(None),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user)
+):
+    db_file = await file_service.upload_file(db, file, title, description or "", current_user.id)
+    _schedule_preview(background_tasks, session_factory, db_file)
+    return db_file
+
+# Resumable uploads, modeled on tus: create a session, PATCH chunks at byte
+# offsets (in parallel if the client likes), HEAD to find where to resume,
+# then finalize into a regular File.
+
+def _get_upload(db: Session, upload_id: str, user: User):
+    session = upload_service.get_session(db, upload_id, user.id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+def _offset_headers(offset: int, length: int) -> dict:
+    return {"Upload-Offset": str(offset), "Upload-Length": str(length), "Cache-Control": "no-store"}
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+def create_upload(
+    data: UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload of `length` bytes.
+    """
+    if data.length > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File is too large")
+    try:
+        session = upload_service.create_session(db, data, current_user.id)
+    except upload_service.UploadQuotaExceeded:
+        raise HTTPException(status_code=429, detail="Too many uploads in progress; finish or cancel one first")
+    response.headers["Location"] = f"{settings.API_V1_STR}/files/uploads/{session.id}"
+    response.headers.update(_offset_headers(0, session.length))
+    return UploadSessionResponse(
+        id=session.id, filename=session.filename, title=session.title,
+        length=session.length, offset=0, expires_at=session.expires_at
+    )
+
+@router.head("/uploads/{upload_id}")
+def get_upload_offset(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload-Offset says how many bytes from the start have arrived; resume from there.
+    """
+    session = _get_upload(db, upload_id, current_user)
+    return Response(headers=_offset_headers(upload_service.received_offset(db, session.id), session.length))
+
+@router.patch("/uploads/{upload_id}", status_code=204)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    content_type: str = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Write the request body at Upload-Offset. The body is streamed straight to the staging file.
+    """
+    if content_type != "application/offset+octet-stream":
+        raise HTTPException(status_code=415, detail="Chunks must be sent as application/offset+octet-stream")
+    session = _get_upload(db, upload_id, current_user)
+    if not 0 <= upload_offset <= session.length:
+        raise HTTPException(status_code=409, detail="Upload-Offset is outside the file")
+    declared = request.headers.get("content-length")
+    if declared is not None and upload_offset + int(declared) > session.length:
+        raise HTTPException(status_code=413, detail="Chunk runs past the end of the file")
+    # Give the connection back to the pool while the body streams in; write_chunk takes one again to record it
+    db.commit()
+    try:
+        offset = await upload_service.write_chunk(db, session, upload_offset, request.stream())
+    except upload_service.UploadOverflow:
+        raise HTTPException(status_code=413, detail="Chunk runs past the end of the file")
+    return Response(status_code=204, headers=_offset_headers(offset, session.length))
+
+@router.post("/uploads/{upload_id}/finalize", response_model=FileResponse)
+async def finalize_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Turn a complete upload into a file.
+    """
+    session = _get_upload(db, upload_id, current_user)
+    offset = upload_service.received_offset(db, session.id)
+    if offset < session.length:
+        raise HTTPException(
+            status_code=409, detail="Upload is incomplete", headers=_offset_headers(offset, session.length)
+        )
+    db_file = await upload_service.finalize(db, session)
+    _schedule_preview(background_tasks, session_factory, db_file)
+    return db_file
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+def cancel_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return await file_service.upload_file(db, file, title, description or "", current_user.id)
+    """
+    Abandon an upload and drop what was received.
+    """
+    upload_service.discard(db, _get_upload(db, upload_id, current_user))
 
 @router.get("/", response_model=List[FileResponse])
 def get_files(
@@ -33,3 +155,24 @@ def get_my_files(
     current_user: User = Depends(get_current_user)
 ):
     return file_service.get_user_files(db, current_user.id)
+
+@router.get("/{file_id}/download")
+def download_file(
+    file_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download a file. Object storage answers with a redirect to a short-lived
+    presigned URL, so the bytes never pass through the API.
+    """
+    db_file = file_service.get_file(db, file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if storage.backend.offloads_downloads:
+        return RedirectResponse(storage.backend.url(db_file.filename), status_code=307)
+    return StreamingResponse(
+        storage.backend.open(db_file.filename),
+        media_type=db_file.content_type or "application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(db_file.filename)}"}
+    )
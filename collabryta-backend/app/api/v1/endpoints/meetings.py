@@ -1,12 +1,19 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app import schemas, models
 from app.api import deps
+from app.core.serialization import construct_all, json_response
 from app.services import meeting_service
 
 router = APIRouter()
 
+MEETING_LIST = TypeAdapter(List[schemas.Meeting])
+
+# Relationships serialized by schemas.Meeting
+MEETING_LOADERS = (joinedload(models.Meeting.host), selectinload(models.Meeting.participants))
+
 @router.get("/", response_model=List[schemas.Meeting])
 def read_meetings(
     db: Session = Depends(deps.get_db),
@@ -16,7 +23,10 @@ def read_meetings(
     """
     Retrieve meetings for current user (hosted + attended).
     """
-    return meeting_service.get_user_meetings(db, user_id=current_user.id, recent_only=recent_only)
+    meetings = meeting_service.get_user_meetings(
+        db, user_id=current_user.id, recent_only=recent_only, options=MEETING_LOADERS
+    )
+    return json_response(MEETING_LIST, construct_all(schemas.Meeting, meetings))
 
 @router.post("/", response_model=schemas.Meeting)
 async def create_meeting(
@@ -40,7 +50,7 @@ def delete_meeting(
     """
     Delete meeting.
     """
-    meeting = meeting_service.get_meeting(db, meeting_id=id)
+    meeting = meeting_service.get_meeting(db, meeting_id=id, options=MEETING_LOADERS)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     if meeting.host_id != current_user.id:
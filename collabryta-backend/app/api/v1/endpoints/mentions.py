@@ -0,0 +1,27 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session, joinedload
+from app.api import deps
+from app.api.v1.endpoints.messages import MESSAGE_LIST
+from app.core.serialization import construct_all, json_response
+from app.models.message import Message
+from app.schemas.message import MessageResponse
+from app.services import message_service
+
+router = APIRouter()
+
+@router.get("/", response_model=List[MessageResponse])
+def get_mentions(
+    before: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+):
+    """
+    Messages that @mention the current user, newest first. Pass the last
+    message id as `before` for the next page.
+    """
+    msgs = message_service.get_mentions(
+        db, current_user.id, before=before, limit=limit, options=[joinedload(Message.sender)]
+    )
+    return json_response(MESSAGE_LIST, construct_all(MessageResponse, msgs))
@@ -1,21 +1,32 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, sessionmaker
 from app.api import deps
+from app.core import tracing
+from app.core.serialization import construct_all, json_response
 from app.schemas.message import ChatResponse, ChatCreate, MessageResponse, MessageCreate
-from app.services import message_service
+from app.services import message_service, purge_service
 
 router = APIRouter()
 
+MESSAGE_LIST = TypeAdapter(List[MessageResponse])
+
 @router.get("/conversations", response_model=List[Any])
 def get_conversations(
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
 ):
     """
-    Get all conversations (chats) for the current user.
+    Get the current user's conversations (chats), most recent activity first.
+    All of them by default; with `limit`, pass the last conversation's
+    `last_activity` and `id` as `before` and `before_id` for the next page.
     """
-    return message_service.get_user_chats(db, user_id=current_user.id)
+    return message_service.get_user_chats(db, user_id=current_user.id, limit=limit, before=before, before_id=before_id)
 
 @router.post("/conversations", response_model=ChatResponse)
 def create_conversation(
@@ -28,17 +39,46 @@ def create_conversation(
     """
     return message_service.create_chat(db, chat_in=chat_in, creator_id=current_user.id)
 
+@router.delete("/conversations/{chat_id}", status_code=202)
+def delete_conversation(
+    chat_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    session_factory: sessionmaker = Depends(deps.get_session_factory),
+    current_user = Depends(deps.get_current_user),
+):
+    """
+    Delete a conversation. A direct chat, or a group chat deleted by its
+    creator, disappears for every participant immediately and its messages
+    are removed in the background in bounded batches. Other group members
+    only leave the chat, unless they are the last one or the creator's
+    account is gone.
+    """
+    if not message_service.is_chat_member(db, chat_id=chat_id, user_id=current_user.id):
+        raise HTTPException(status_code=403, detail="Not a member of this chat")
+    if message_service.can_delete_chat(db, chat_id=chat_id, user_id=current_user.id):
+        purge_service.detach_chat(db, chat_id)
+    elif not message_service.leave_chat(db, chat_id=chat_id, user_id=current_user.id):
+        response.status_code = 200
+        return {"status": "left"}
+    background_tasks.add_task(tracing.in_background(purge_service.purge_chat), session_factory, chat_id)
+    return {"status": "scheduled"}
+
 @router.get("/{chat_id}", response_model=List[MessageResponse])
 def get_messages(
     chat_id: int,
+    before: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
 ):
     """
-    Get messages for a specific chat.
+    Get the latest messages of a chat, oldest first. Pass the first
+    message's id as `before` to load earlier history, archived or not.
     """
-    msgs = message_service.get_chat_messages(db, chat_id=chat_id, user_id=current_user.id)
-    return msgs
+    msgs = message_service.get_chat_messages(db, chat_id=chat_id, user_id=current_user.id, before=before, limit=limit)
+    return json_response(MESSAGE_LIST, construct_all(MessageResponse, msgs))
 
 @router.post("/{chat_id}", response_model=MessageResponse)
 async def send_message(
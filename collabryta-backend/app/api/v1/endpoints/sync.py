@@ -0,0 +1,21 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app import schemas, models
+from app.api import deps
+from app.services import sync_service
+
+router = APIRouter()
+
+@router.get("", response_model=schemas.SyncResponse)
+def read_changes(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+) -> Any:
+    """
+    Changes visible to the current user after the `since` cursor.
+    Pass the returned cursor back on the next call; keep paging while has_more is true.
+    """
+    return sync_service.get_changes(db, user_id=current_user.id, since=since, limit=limit)
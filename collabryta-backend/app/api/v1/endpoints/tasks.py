@@ -1,9 +1,10 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, File, Query, UploadFile
 from sqlalchemy.orm import Session
 from app import schemas, models
 from app.api import deps
-from app.services import task_service
+from app.services import task_service, import_service
 
 router = APIRouter()
 
@@ -46,6 +47,49 @@ async def create_task(
     """
     return await task_service.create_task(db, task_in=task_in, owner_id=current_user.id)
 
+@router.post("/bulk", response_model=schemas.TaskBulkResult)
+def bulk_tasks(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_in: schemas.TaskBulkRequest,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create, update and delete many tasks in one transaction.
+    """
+    update_ids = {task_id for group in bulk_in.update for task_id in group.ids}
+    delete_ids = set(bulk_in.delete)
+    tasks = task_service.get_tasks_by_ids(db, update_ids | delete_ids)
+
+    missing = (update_ids | delete_ids) - tasks.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Tasks not found: {sorted(missing)}")
+    forbidden = [
+        task_id for task_id in update_ids
+        if current_user.id not in (tasks[task_id]["owner_id"], tasks[task_id]["assigned_to_id"])
+    ] + [
+        task_id for task_id in delete_ids if tasks[task_id]["owner_id"] != current_user.id
+    ]
+    if forbidden:
+        raise HTTPException(status_code=403, detail=f"Not enough permissions for tasks: {sorted(set(forbidden))}")
+
+    return task_service.bulk_apply(db, bulk_in, owner_id=current_user.id, existing=tasks)
+
+@router.post("/import", response_model=schemas.ImportReport)
+def import_tasks(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Bulk-create tasks owned by the current user from a CSV or NDJSON upload.
+    """
+    fmt = import_service.detect_format(file.filename, format)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8")
+    return import_service.import_tasks(db, import_service.read_rows(stream, fmt), owner_id=current_user.id)
+
 @router.put("/{id}", response_model=schemas.Task)
 async def update_task(
     *,
@@ -1,14 +1,20 @@
-from datetime import datetime
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import io
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, File, Query, UploadFile
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, sessionmaker
 
 from app import schemas, models
 from app.api import deps
-from app.services import user_service
+from app.core import tracing
+from app.core.serialization import construct_all, json_response
+from app.services import user_service, import_service, purge_service
 
 router = APIRouter()
 
+USER_LIST = TypeAdapter(List[schemas.User])
+
 @router.get("/", response_model=List[schemas.User])
 def read_users(
     db: Session = Depends(deps.get_db),
@@ -20,7 +26,19 @@ def read_users(
     Retrieve users.
     """
     users = user_service.get_users(db, skip=skip, limit=limit)
-    return users
+    return json_response(USER_LIST, construct_all(schemas.User, users))
+
+@router.get("/search", response_model=List[schemas.UserSummary])
+def search_users(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Prefix and fuzzy search on user name and email, for participant pickers.
+    """
+    return user_service.search_users(db, q=q, limit=limit)
 
 @router.post("/", response_model=schemas.User)
 def create_user(
@@ -40,6 +58,21 @@ def create_user(
     user = user_service.create_user(db, user=user_in)
     return user
 
+@router.post("/import", response_model=schemas.ImportReport)
+def import_users(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_user: models.User = Depends(deps.get_current_admin),
+) -> Any:
+    """
+    Bulk-create users from a CSV or NDJSON upload (admins only). Invalid rows are reported and skipped.
+    """
+    fmt = import_service.detect_format(file.filename, format)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8")
+    return import_service.import_users(db, import_service.read_rows(stream, fmt))
+
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
     current_user: models.User = Depends(deps.get_current_user),
@@ -63,7 +96,6 @@ def update_status(
     current_user.last_seen = datetime.now().isoformat()
     db.add(current_user)
     db.commit()
-    db.refresh(current_user)
     return {"status": "ok"}
 
 @router.put("/me", response_model=schemas.User)
@@ -79,6 +111,27 @@ def update_user_me(
     user = user_service.update_user(db, db_user=current_user, user_in=user_in)
     return user
 
+@router.delete("/me", status_code=202)
+def delete_user_me(
+    *,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(deps.get_db),
+    session_factory: sessionmaker = Depends(deps.get_session_factory),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Delete own account. The account is deactivated immediately, so its
+    tokens stop working, and its data is removed in the background in
+    bounded batches. `python -m app.cli purge-deleted-users` finishes
+    purges that did not complete.
+    """
+    current_user.is_active = False
+    current_user.deletion_requested_at = datetime.now(timezone.utc)
+    db.add(current_user)
+    db.commit()
+    background_tasks.add_task(tracing.in_background(purge_service.purge_user), session_factory, current_user.id)
+    return {"status": "scheduled"}
+
 @router.post("/verify-otp")
 def verify_otp(
     *,
@@ -94,7 +147,6 @@ def verify_otp(
         current_user.two_factor_enabled = True
         db.add(current_user)
         db.commit()
-        db.refresh(current_user)
         return {"status": "verified", "user": current_user}
     else:
         raise HTTPException(status_code=400, detail="Invalid OTP")
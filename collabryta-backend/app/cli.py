@@ -0,0 +1,116 @@
+"""Command-line maintenance tasks.
+
+Usage:
+    python -m app.cli import-users users.csv
+    python -m app.cli import-tasks tasks.ndjson --owner-email lead@example.com
+    python -m app.cli send-digests --outbox ./outbox
+    python -m app.cli gc-uploads
+    python -m app.cli purge-deleted-users
+    python -m app.cli archive-messages --older-than-days 90
+    python -m app.cli rebuild-inbox
+"""
+import argparse
+import sys
+
+from app import services
+from app.core import tracing
+from app.core.config import settings
+from app.core.invalidation import bus, create_backend
+from app.db.session import SessionLocal
+from app.services import (
+    archive_service, digest_service, import_service, inbox_service, purge_service, upload_service, user_service,
+)
+
+
+def _import_users(args, db):
+    with open(args.path, encoding="utf-8", newline="") as stream:
+        fmt = import_service.detect_format(args.path, args.format)
+        return import_service.import_users(db, import_service.read_rows(stream, fmt))
+
+
+def _import_tasks(args, db):
+    owner = user_service.get_user_by_email(db, email=args.owner_email)
+    if not owner:
+        sys.exit(f"No user with email {args.owner_email}")
+    with open(args.path, encoding="utf-8", newline="") as stream:
+        fmt = import_service.detect_format(args.path, args.format)
+        return import_service.import_tasks(db, import_service.read_rows(stream, fmt), owner_id=owner.id)
+
+
+def _send_digests(args, db):
+    sender = digest_service.FileSender(args.outbox)
+    return digest_service.send_digests(db, sender, batch_size=args.batch_size)
+
+
+def _gc_uploads(args, db):
+    print(f"Removed {upload_service.collect_garbage(db)} abandoned uploads")
+
+
+def _purge_deleted_users(args, db):
+    print(f"Purged {purge_service.purge_deleted_users(SessionLocal)} deleted accounts")
+
+
+def _archive_messages(args, db):
+    print(f"Archived {archive_service.archive_old_messages(db, older_than_days=args.older_than_days)} messages")
+
+
+def _rebuild_inbox(args, db):
+    print(f"Rebuilt the inbox of {inbox_service.rebuild(db)} chats")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    users = commands.add_parser("import-users", help="Bulk-create users from CSV or NDJSON")
+    users.add_argument("path")
+    users.add_argument("--format", choices=["csv", "ndjson"])
+    users.set_defaults(handler=_import_users)
+
+    tasks = commands.add_parser("import-tasks", help="Bulk-create tasks from CSV or NDJSON")
+    tasks.add_argument("path")
+    tasks.add_argument("--owner-email", required=True)
+    tasks.add_argument("--format", choices=["csv", "ndjson"])
+    tasks.set_defaults(handler=_import_tasks)
+
+    digests = commands.add_parser("send-digests", help="Write daily summaries for opted-in users to an outbox")
+    digests.add_argument("--outbox", default=settings.DIGEST_OUTBOX_DIR)
+    digests.add_argument("--batch-size", type=int, default=settings.DIGEST_BATCH_SIZE)
+    digests.set_defaults(handler=_send_digests)
+
+    uploads = commands.add_parser("gc-uploads", help="Delete expired resumable uploads and their staged bytes")
+    uploads.set_defaults(handler=_gc_uploads)
+
+    purge = commands.add_parser("purge-deleted-users", help="Finish removing accounts whose deletion did not complete")
+    purge.set_defaults(handler=_purge_deleted_users)
+
+    archive = commands.add_parser("archive-messages", help="Move old chat history into compressed archive segments")
+    archive.add_argument("--older-than-days", type=int, default=settings.MESSAGE_ARCHIVE_AFTER_DAYS)
+    archive.set_defaults(handler=_archive_messages)
+
+    inbox = commands.add_parser("rebuild-inbox", help="Recompute every chat's conversation-list rows from its messages")
+    inbox.set_defaults(handler=_rebuild_inbox)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    # Imports change users and tasks, so running servers must drop what they cached
+    bus.attach(create_backend(settings.DATABASE_URL, settings.INVALIDATION_BACKEND))
+    tracing.setup(services)
+    db = SessionLocal()
+    try:
+        # Each run is one trace, with the same service and SQL spans as a request
+        with tracing.tracer.start_as_current_span(f"cli {args.command}"):
+            result = args.handler(args, db)
+        if result is not None:
+            print(result.model_dump_json(indent=2))
+    finally:
+        db.close()
+        bus.stop()
+        tracing.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import json
+import logging
+import queue
+import select
+import threading
+import uuid
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Topics; keys are JSON-serializable ids. An empty key list means "everything".
+DASHBOARD_SUMMARY = "dashboard_summary"  # user ids
+USER_DIRECTORY = "user_directory"  # user ids
+RECENT_WRITER = "recent_writer"  # principals that just committed a write
+
+# Postgres caps NOTIFY payloads at 8000 bytes; this leaves room for the envelope
+MAX_PAYLOAD = 7500
+
+Handler = Callable[[Sequence[Hashable]], None]
+
+
+class InvalidationBus:
+    """Fans cache invalidations out to every worker.
+
+    publish() runs this process's handlers straight away, so a worker always
+    sees its own writes, and hands the event to the backend for the others.
+    Events a worker receives back from the backend are recognised by origin
+    and skipped.
+    """
+
+    def __init__(self, backend=None):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.backend = None
+        self.attach(backend or LocalBackend())
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def attach(self, backend) -> None:
+        if self.backend is not None:
+            self.backend.stop()
+        self.backend = backend
+        backend.start(self)
+
+    def publish(self, topic: str, *keys: Hashable, local: bool = True) -> None:
+        """Evicts locally (unless local=False, for caches the caller already updated) and tells the other workers.
+
+        No keys means the whole topic; keys that are all None mean nothing.
+        """
+        if keys:
+            keys = [k for k in keys if k is not None]
+            if not keys:
+                return
+        if local:
+            self._dispatch(topic, keys)
+        self.backend.send(self.origin, topic, keys)
+
+    def deliver(self, payload: str) -> None:
+        """Entry point for backends: applies an event from another worker."""
+        try:
+            event = json.loads(payload)
+            if event["o"] != self.origin:
+                self._dispatch(event["t"], event["k"])
+        except Exception:
+            logger.exception("Bad invalidation payload %r", payload)
+
+    def resync(self) -> None:
+        """Drops everything; used when events may have been missed (listener reconnects)."""
+        for topic in self._handlers:
+            self._dispatch(topic, [])
+
+    def _dispatch(self, topic: str, keys: Sequence[Hashable]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(keys)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", topic)
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+
+def encode(origin: str, topic: str, keys: Sequence[Hashable]) -> List[str]:
+    """JSON payloads for one event, split so each fits in a NOTIFY."""
+    batches, batch, size = [], [], 0
+    for key in keys:
+        length = len(json.dumps(key)) + 2
+        if batch and size + length > MAX_PAYLOAD:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(key)
+        size += length
+    if batch or not batches:
+        batches.append(batch)
+    return [json.dumps({"o": origin, "t": topic, "k": batch}) for batch in batches]
+
+
+class LocalBackend:
+    """In-process fan-out between buses attached to the same instance.
+
+    In production that is one bus, so nothing leaves the process: enough for
+    a single worker and for SQLite. Tests attach several to stand in for workers.
+    """
+
+    def __init__(self):
+        self._buses: List[InvalidationBus] = []
+
+    def start(self, bus: InvalidationBus) -> None:
+        self._buses.append(bus)
+
+    def send(self, origin: str, topic: str, keys: Sequence[Hashable]) -> None:
+        for payload in encode(origin, topic, keys):
+            for bus in self._buses:
+                bus.deliver(payload)
+
+    def stop(self) -> None:
+        self._buses.clear()
+
+
+class PostgresBackend:
+    """Cross-worker delivery through LISTEN/NOTIFY on one channel.
+
+    A listener thread holds a dedicated connection in LISTEN and applies
+    notifications as they arrive; a publisher thread sends pg_notify from a
+    queue, so publishing never waits on the network. If the listener loses
+    its connection it reconnects and drops every cache, since notifications
+    sent in between are gone.
+    """
+
+    def __init__(self, dsn: str, channel: str = "cache_invalidation", reconnect_seconds: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._outbox: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.listening = threading.Event()
+
+    def start(self, bus: InvalidationBus) -> None:
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._listen, args=(bus,), name="invalidation-listener", daemon=True),
+            threading.Thread(target=self._publish, name="invalidation-publisher", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def send(self, origin: str, topic: str, keys: Sequence[Hashable]) -> None:
+        for payload in encode(origin, topic, keys):
+            self._outbox.put(payload)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._outbox.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def _listen(self, bus: InvalidationBus) -> None:
+        first = True
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                if not first:
+                    bus.resync()
+                first = False
+                self.listening.set()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        bus.deliver(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Invalidation listener lost its connection; reconnecting")
+                self.listening.clear()
+                self._stop.wait(self.reconnect_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _publish(self) -> None:
+        # Runs until the stop sentinel, so events queued before stop() still go out
+        conn = None
+        while True:
+            payload = self._outbox.get()
+            if payload is None:
+                break
+            try:
+                if conn is None or conn.closed:
+                    conn = self._connect()
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                # Other workers keep the stale entry until its TTL runs out
+                logger.exception("Could not publish invalidation")
+                if conn is not None:
+                    conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def create_backend(database_url: str, setting: str):
+    if setting == "postgres" or (setting == "auto" and database_url.startswith("postgresql")):
+        from sqlalchemy.engine import make_url
+        url = make_url(database_url).set(drivername="postgresql")
+        return PostgresBackend(url.render_as_string(hide_password=False))
+    return LocalBackend()
+
+
+bus = InvalidationBus()
@@ -0,0 +1,212 @@
+"""Statistical CPU profiler that can be switched on inside a running server.
+
+A sampler thread wakes every interval, reads every thread's Python stack
+with sys._current_frames() and counts identical stacks. Nothing is
+installed on the hot path (no setprofile/settrace), so the cost is one
+stack walk per thread per sample. A timer thread is used rather than
+SIGPROF because signal handlers only run on the main thread, while sync
+endpoints, bcrypt and ORM work run in the threadpool.
+"""
+import os
+import re
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Set
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Innermost frames of threads that are waiting rather than working; their samples are dropped
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+def _thread_label(name: str) -> str:
+    # Pool threads differ only by number; merging them merges their stacks
+    return re.sub(r"[-_ ]?\d+", "", name) or "thread"
+
+
+def route_pattern(route: str, prefix: str = "") -> "re.Pattern":
+    """Matches a route given with or without the API prefix; {params} match one segment."""
+    route = "/" + route.strip("/")
+    parts = re.split(r"(\{[^}]+\})", route)
+    body = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+    return re.compile(f"^(?:{re.escape(prefix)})?{body}/?$")
+
+
+class ProfileSession:
+    """One profiling run: the whole process for a duration, or only while matching requests are in flight.
+
+    In route mode the event loop thread's samples are kept only when a
+    matching request's coroutine is on the stack, so other requests
+    interleaved on the loop do not show up. Threadpool stacks are not tied
+    to a request and are kept while any matching request is in flight.
+    """
+
+    def __init__(self, interval: float, route: Optional["re.Pattern"] = None, requests: Optional[int] = None):
+        self.interval = interval
+        self.route = route
+        self.requests = requests
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.completed = 0
+        self._markers: Set[FrameType] = set()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.finished = None  # asyncio.Event set by the endpoint waiting on this session
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def matches(self, path: str) -> bool:
+        return self.route is not None and self.route.match(path) is not None
+
+    def enter(self, frame: FrameType) -> None:
+        self._loop_thread = threading.get_ident()
+        self._markers.add(frame)
+
+    def leave(self, frame: FrameType) -> None:
+        self._markers.discard(frame)
+        self.completed += 1
+        if self.requests is not None and self.completed >= self.requests and self.finished is not None:
+            self.finished.set()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.route is not None and not self._markers:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            markers = set(self._markers)
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                relevant = self.route is None or ident != self._loop_thread
+                while frame is not None:
+                    if not relevant and frame in markers:
+                        relevant = True
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if relevant:
+                    stack.reverse()
+                    self.samples[(_thread_label(names.get(ident, "thread")), tuple(stack))] += 1
+            self.sample_count += 1
+
+    def _frame_name(self, code: CodeType) -> str:
+        return f"{getattr(code, 'co_qualname', code.co_name)} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format (flamegraph.pl, speedscope, inferno): one "a;b;c count" line per stack."""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = ";".join([thread] + [self._frame_name(code).replace(";", ":") for code in stack])
+            lines.append(f"{frames} {count}\n")
+        return "".join(lines)
+
+    def speedscope(self, name: str = "collabryta") -> Dict:
+        """speedscope's file format: one sampled profile, each distinct stack weighted by its time."""
+        frames: List[Dict] = []
+        index: Dict[object, int] = {}
+
+        def frame_id(key, entry) -> int:
+            if key not in index:
+                index[key] = len(frames)
+                frames.append(entry)
+            return index[key]
+
+        samples, weights = [], []
+        for (thread, stack), count in self.samples.most_common():
+            ids = [frame_id(("thread", thread), {"name": thread})]
+            for code in stack:
+                ids.append(frame_id(code, {
+                    "name": getattr(code, "co_qualname", code.co_name),
+                    "file": _short_path(code.co_filename),
+                    "line": code.co_firstlineno,
+                }))
+            samples.append(ids)
+            weights.append(round(count * self.interval * 1000, 3))
+        end = round(sum(weights), 3)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "collabryta",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "milliseconds",
+                "startValue": 0, "endValue": end, "samples": samples, "weights": weights,
+            }],
+        }
+
+
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(filename: str) -> str:
+    # .../site-packages/sqlalchemy/orm/loading.py -> sqlalchemy/orm/loading.py, .../python3.11/json/ -> json/
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    for root in (_STDLIB, os.getcwd() + os.sep):
+        if filename.startswith(root):
+            return filename[len(root):]
+    return filename
+
+
+class Profiler:
+    """Holds the single active session; a second one is refused until it finishes."""
+
+    def __init__(self):
+        self.session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    def begin(self, session: ProfileSession) -> bool:
+        with self._lock:
+            if self.session is not None:
+                return False
+            self.session = session
+        session.start()
+        return True
+
+    def end(self, session: ProfileSession) -> None:
+        session.stop()
+        with self._lock:
+            if self.session is session:
+                self.session = None
+
+
+profiler = Profiler()
+
+
+class ProfilerMiddleware:
+    """Tells a route-filtered session which requests to sample; a no-op when nothing is profiling."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session = profiler.session
+        if session is None or scope["type"] != "http" or not session.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        # This coroutine's frame is on the loop thread's stack whenever the request is running
+        frame = sys._getframe()
+        session.enter(frame)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.leave(frame)
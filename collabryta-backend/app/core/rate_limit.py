@@ -0,0 +1,167 @@
+import asyncio
+import math
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import case, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.models.rate_limit import RateLimitBucket
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(spec: str) -> Tuple[float, float]:
+    """'10/minute' -> (capacity 10, refill rate in tokens per second)."""
+    count, _, period = spec.partition("/")
+    capacity = float(count)
+    return capacity, capacity / PERIODS[period.strip().rstrip("s")]
+
+
+class MemoryBackend:
+    """Token buckets in this process only; each worker enforces the budget separately."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        # key -> (tokens, updated, seconds to refill from empty); least recently used first
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> float:
+        """Spends cost tokens; returns 0 if allowed, else seconds until enough tokens refill."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.pop(key, (capacity, now, 0.0))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            if len(self._buckets) >= self.maxsize:
+                self._evict(now)
+            self._buckets[key] = (tokens, now, capacity / rate)
+        return 0.0 if allowed else (cost - tokens) / rate
+
+    def _evict(self, now: float) -> None:
+        # A bucket that has refilled completely is indistinguishable from a missing one
+        for key in [k for k, (_, updated, idle) in self._buckets.items() if now - updated >= idle]:
+            del self._buckets[key]
+        # Still full: drop the least recently used bucket
+        while len(self._buckets) >= self.maxsize:
+            del self._buckets[next(iter(self._buckets))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBackend:
+    """Token buckets in the rate_limit_buckets table, shared by every process on the database.
+
+    Each take is a single INSERT .. ON CONFLICT DO UPDATE .. RETURNING, so
+    the refill-and-spend is atomic without explicit locking.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> float:
+        table = RateLimitBucket.__table__
+        now = time.time()
+        refilled = table.c.tokens + (literal(now) - table.c.updated_at) * rate
+        refilled = case((refilled > capacity, literal(capacity)), else_=refilled)
+        allowed = refilled >= cost
+
+        stmt = self._insert(table).values(key=key, tokens=capacity - cost, updated_at=now, allowed=True)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "tokens": case((allowed, refilled - cost), else_=refilled),
+                "updated_at": now,
+                "allowed": allowed,
+            },
+        ).returning(table.c.tokens, table.c.allowed)
+        with self.engine.begin() as conn:
+            tokens, was_allowed = conn.execute(stmt).one()
+        return 0.0 if was_allowed else (cost - tokens) / rate
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(RateLimitBucket.__table__.delete())
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Per-route token-bucket budgets keyed by principal (user or client IP)."""
+
+    def __init__(self, backend, limits: Dict[str, str], default: Optional[str]):
+        self.backend = backend
+        self.limits = {route: parse_limit(spec) for route, spec in limits.items()}
+        self.default = parse_limit(default) if default else None
+
+    def check(self, route: str, principal: str) -> None:
+        limit = self.limits.get(route, self.default)
+        if limit is None:
+            return
+        capacity, rate = limit
+        retry_after = self.backend.take(f"{route}:{principal}", capacity, rate)
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class AdmissionMiddleware:
+    """Caps in-flight API requests below what the DB connection pool can serve.
+
+    Requests over the cap wait up to wait_seconds for a slot and are then shed
+    with 503 and Retry-After, instead of queueing on the pool until they time out.
+    Requests matching `exempt` ("METHOD /path") skip the cap: long transfers that
+    hold no connection while the body streams would otherwise starve everything else.
+    """
+
+    def __init__(self, app: ASGIApp, limit: int, wait_seconds: float, path_prefix: str = "/", exempt: Optional["re.Pattern"] = None):
+        self.app = app
+        self.limit = limit
+        self.wait_seconds = wait_seconds
+        self.path_prefix = path_prefix
+        self.exempt = exempt
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix) or (
+            self.exempt is not None and self.exempt.match(f"{scope['method']} {scope['path']}")
+        ):
+            await self.app(scope, receive, send)
+            return
+        slots = self._semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.wait_seconds)
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                {"detail": "Server is busy, try again shortly"}, status_code=503, headers=retry_after_header(1)
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slots.release()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; test clients start a new loop each time
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._slots = loop, asyncio.Semaphore(self.limit)
+        return self._slots
@@ -0,0 +1,102 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of each alphanumeric word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in re.findall(r"[^\W_]+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class PrefixTrigramIndex:
+    """In-memory prefix and fuzzy lookup over short text keys.
+
+    Prefix matches come from a sorted list of (key, id) pairs searched with
+    bisect; fuzzy matches from trigram postings scored like pg_trgm's
+    similarity(). Used where the database has no trigram support.
+    """
+
+    def __init__(self, min_similarity: float = 0.3):
+        self.min_similarity = min_similarity
+        self._entries: List[Tuple[str, Hashable]] = []
+        self._keys: Dict[Hashable, List[str]] = {}
+        self._grams: Dict[Hashable, List[Set[str]]] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, items: Iterable[Tuple[Hashable, Iterable[str]]]) -> None:
+        """Replaces the contents with (id, keys) pairs, sorting once."""
+        with self._lock:
+            self._entries, self._keys, self._grams, self._postings = [], {}, {}, {}
+            for item_id, keys in items:
+                self._index(item_id, keys, sort=False)
+            self._entries.sort()
+
+    def upsert(self, item_id: Hashable, keys: Iterable[str]) -> None:
+        with self._lock:
+            self.remove(item_id)
+            self._index(item_id, keys, sort=True)
+
+    def remove(self, item_id: Hashable) -> None:
+        with self._lock:
+            for key in self._keys.pop(item_id, []):
+                i = bisect_left(self._entries, (key, item_id))
+                if i < len(self._entries) and self._entries[i] == (key, item_id):
+                    del self._entries[i]
+            for grams in self._grams.pop(item_id, []):
+                for gram in grams:
+                    self._postings[gram].discard(item_id)
+
+    def prefix(self, prefix: str, limit: int) -> List[Hashable]:
+        prefix = prefix.lower()
+        found: List[Hashable] = []
+        with self._lock:
+            i = bisect_left(self._entries, (prefix,))
+            while i < len(self._entries) and len(found) < limit:
+                key, item_id = self._entries[i]
+                if not key.startswith(prefix):
+                    break
+                if item_id not in found:
+                    found.append(item_id)
+                i += 1
+        return found
+
+    def fuzzy(self, text: str, limit: int) -> List[Hashable]:
+        query = trigrams(text)
+        if not query:
+            return []
+        with self._lock:
+            candidates = set()
+            for gram in query:
+                candidates.update(self._postings.get(gram, ()))
+            scored = []
+            for item_id in candidates:
+                # Best-matching key wins, like greatest(similarity(a), similarity(b))
+                similarity = max(
+                    len(query & grams) / len(query | grams) for grams in self._grams[item_id]
+                )
+                if similarity >= self.min_similarity:
+                    scored.append((-similarity, item_id))
+        scored.sort(key=lambda pair: pair[0])
+        return [item_id for _, item_id in scored[:limit]]
+
+    def _index(self, item_id: Hashable, keys: Iterable[str], sort: bool) -> None:
+        keys = sorted({key.lower() for key in keys if key})
+        self._keys[item_id] = keys
+        for key in keys:
+            if sort:
+                insort(self._entries, (key, item_id))
+            else:
+                self._entries.append((key, item_id))
+        self._grams[item_id] = [trigrams(key) for key in keys]
+        for grams in self._grams[item_id]:
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(item_id)
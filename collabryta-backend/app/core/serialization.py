@@ -0,0 +1,60 @@
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """(model class, is_list) for Model, Optional[Model] and List[Model] annotations."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    origin = typing.get_origin(annotation)
+    if origin in (list, List) and args:
+        model, _ = _nested_model(args[0])
+        return model, model is not None
+    if origin is typing.Union and len(args) == 1:
+        return _nested_model(args[0])
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _plan(schema: Type[BaseModel]) -> Tuple[Tuple[str, Optional[Type[BaseModel]], bool], ...]:
+    return tuple((name, *_nested_model(field.annotation)) for name, field in schema.model_fields.items())
+
+
+def construct(schema: Type[BaseModel], obj: Any, memo: Optional[Dict] = None) -> BaseModel:
+    """Builds a response model from an ORM object without validating it.
+
+    Column values are already typed by the database, so validation only costs
+    time; on chat history it was dominated by re-checking the same sender's
+    email once per message. Nested models are built recursively, and each ORM
+    object is converted once per memo, so shared senders/participants are
+    reused. Attributes the object lacks fall back to schema defaults, as with
+    from_attributes validation.
+    """
+    memo = {} if memo is None else memo
+    key = (schema, id(obj))
+    if key in memo:
+        return memo[key]
+    values = {}
+    for name, nested, is_list in _plan(schema):
+        if not hasattr(obj, name):
+            continue
+        value = getattr(obj, name)
+        if nested is not None and value is not None:
+            value = [construct(nested, item, memo) for item in value] if is_list else construct(nested, value, memo)
+        values[name] = value
+    model = memo[key] = schema.model_construct(**values)
+    return model
+
+
+def construct_all(schema: Type[BaseModel], objs: Iterable[Any]) -> List[BaseModel]:
+    memo: Dict = {}
+    return [construct(schema, obj, memo) for obj in objs]
+
+
+def json_response(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    """Serializes straight to JSON bytes in pydantic-core, with no intermediate dicts."""
+    return Response(adapter.dump_json(value), status_code=status_code, media_type="application/json")
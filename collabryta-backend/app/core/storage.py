@@ -0,0 +1,191 @@
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, ContextManager, Iterator, Optional
+
+from app.core.config import settings
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+except ImportError:  # optional: local storage only
+    boto3 = None
+
+CHUNK_SIZE = 1024 * 1024
+# Served by the /static mount in app.main
+UPLOAD_DIR = "app/static/uploads"
+
+
+class Storage(ABC):
+    """Where uploaded files and their derivatives live, addressed by flat keys (the stored filename)."""
+
+    # True when url() hands out direct links, so downloads never pass through the app
+    offloads_downloads = False
+
+    @abstractmethod
+    def save(self, key: str, stream: BinaryIO) -> int:
+        """Writes a readable stream under key and returns its size."""
+
+    @abstractmethod
+    def put_file(self, key: str, path: str) -> int:
+        """Stores a finished local file under key, consuming it, and returns its size."""
+
+    @abstractmethod
+    def open(self, key: str) -> Iterator[bytes]:
+        """The stored bytes, in chunks, without reading the whole object into memory."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Removes the object; a key that is already gone is not an error."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Where clients fetch the object from: a static path or a presigned link."""
+
+    @abstractmethod
+    def locate(self, key: str) -> str:
+        """Human-readable location recorded on the File row."""
+
+    @abstractmethod
+    def local_copy(self, key: str) -> ContextManager[str]:
+        """A filesystem path holding the object, for tools that need one (previews)."""
+
+
+class LocalStorage(Storage):
+    """Files under a directory served by the /static mount; only works with a single app node."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys are flat; basename also stops "../" escaping the root
+        return os.path.join(self.root, os.path.basename(key))
+
+    def save(self, key: str, stream: BinaryIO) -> int:
+        with open(self._path(key), "wb") as out:
+            shutil.copyfileobj(stream, out, CHUNK_SIZE)
+            return out.tell()
+
+    def put_file(self, key: str, path: str) -> int:
+        target = self._path(key)
+        shutil.move(path, target)
+        return os.path.getsize(target)
+
+    def open(self, key: str) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{os.path.basename(key)}"
+
+    def locate(self, key: str) -> str:
+        return self._path(key)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        yield self._path(key)
+
+
+class S3Storage(Storage):
+    """Objects in an S3-compatible bucket (AWS, MinIO, ...), shared by every app node.
+
+    Uploads above the multipart threshold go up as parts on several threads,
+    and browsers download through presigned URLs instead of via the app.
+    """
+
+    offloads_downloads = True
+
+    def __init__(
+        self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, region: Optional[str] = None,
+        access_key_id: Optional[str] = None, secret_access_key: Optional[str] = None,
+        multipart_threshold: int = 16 * 1024 * 1024, multipart_chunksize: int = 16 * 1024 * 1024,
+        max_concurrency: int = 8, url_expires_seconds: int = 900, client=None,
+    ):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs boto3 installed")
+        if client is None:
+            client = boto3.client(
+                "s3", endpoint_url=endpoint_url, region_name=region,
+                aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key,
+                # One pooled connection per concurrent part upload
+                config=BotoConfig(max_pool_connections=max(10, max_concurrency)),
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expires_seconds = url_expires_seconds
+        self.transfer = TransferConfig(
+            multipart_threshold=multipart_threshold, multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency, use_threads=True,
+        )
+
+    def _key(self, key: str) -> str:
+        return self.prefix + os.path.basename(key)
+
+    def save(self, key: str, stream: BinaryIO) -> int:
+        start = stream.tell()
+        self.client.upload_fileobj(stream, self.bucket, self._key(key), Config=self.transfer)
+        return stream.tell() - start
+
+    def put_file(self, key: str, path: str) -> int:
+        size = os.path.getsize(path)
+        self.client.upload_file(path, self.bucket, self._key(key), Config=self.transfer)
+        os.remove(path)
+        return size
+
+    def open(self, key: str) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        try:
+            yield from body.iter_chunks(CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def url(self, key: str) -> str:
+        # Signed locally, no request to the object store
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._key(key)}, ExpiresIn=self.url_expires_seconds
+        )
+
+    def locate(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._key(key)}"
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._key(key), path, Config=self.transfer)
+            yield path
+        finally:
+            os.remove(path)
+
+
+def create_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            settings.S3_BUCKET, prefix=settings.S3_PREFIX, endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION, access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            multipart_threshold=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=settings.S3_MAX_CONCURRENCY, url_expires_seconds=settings.STORAGE_URL_EXPIRES_SECONDS,
+        )
+    return LocalStorage(UPLOAD_DIR, "/static/uploads")
+
+
+backend = create_storage()
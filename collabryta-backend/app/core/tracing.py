@@ -0,0 +1,557 @@
+"""Span-based tracing for requests, service calls, SQL and file I/O.
+
+The calls mirror OpenTelemetry's (start_as_current_span, set_attribute,
+record_exception, W3C traceparent propagation) and exported spans use
+OTLP/JSON field names, so traces can be loaded into OTel tooling or the
+tracer swapped for the OpenTelemetry SDK without touching call sites.
+"""
+import importlib
+import inspect
+import json
+import logging
+import pkgutil
+import random
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Returned on every traced response, so a client report can be matched to its spans
+TRACE_HEADER = "X-Trace-Id"
+# W3C Trace Context header, continued when a gateway or another service sends one
+TRACEPARENT_HEADER = "traceparent"
+
+# SQL kept on database spans; longer statements (big IN lists) are cut
+STATEMENT_MAX_LENGTH = 2000
+
+OK = "OK"
+ERROR = "ERROR"
+
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex digits
+    span_id: str  # 16 hex digits
+    sampled: bool
+
+
+def parse_traceparent(value: str) -> Optional[SpanContext]:
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class _LocalTrace:
+    """Spans finished under one local root, exported together when the root ends."""
+
+    __slots__ = ("root", "spans", "open")
+
+    def __init__(self):
+        self.root: Optional["Span"] = None
+        self.spans: List["Span"] = []
+        self.open = True
+
+
+class Span:
+    """One timed operation, with the same calls as an OpenTelemetry span.
+
+    Spans of an unsampled trace keep their ids (the response still carries
+    the trace id) but record nothing.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_id: Optional[str], local: _LocalTrace):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._local = local
+
+    @property
+    def recording(self) -> bool:
+        return self.context.sampled and self.end_ns is None
+
+    def is_recording(self) -> bool:
+        return self.recording
+
+    def get_span_context(self) -> SpanContext:
+        return self.context
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        if self.recording:
+            self.attributes.update(attributes)
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        if self.recording:
+            self.status, self.status_message = status, description
+
+    def record_exception(self, exc: BaseException) -> None:
+        if self.recording:
+            self.events.append({
+                "name": "exception",
+                "timeUnixNano": time.time_ns(),
+                "attributes": {"exception.type": type(exc).__qualname__, "exception.message": str(exc)},
+            })
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if not self.context.sampled:
+            return
+        local = self._local
+        if local.root is self:
+            local.open = False
+            local.spans.append(self)
+            self.tracer.export(local.spans)
+        elif local.open:
+            local.spans.append(self)
+        else:
+            # Outlived its root (work still running after the response went out); sent on its own
+            self.tracer.export([self])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP/JSON field names, with attributes as a plain object."""
+        status = {"code": self.status}
+        if self.status_message:
+            status["message"] = self.status_message
+        data = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": status,
+        }
+        if self.events:
+            data["events"] = self.events
+        return data
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.context.trace_id if span is not None else None
+
+
+class _NoopSpan:
+    """Stands in when there is nothing to record, so call sites never branch."""
+
+    recording = False
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ConsoleExporter:
+    """One line per span, for watching a development server."""
+
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+
+    def export(self, spans: List[Span]) -> None:
+        lines = []
+        for span in spans:
+            elapsed = (span.end_ns - span.start_ns) / 1e6
+            lines.append(
+                f"trace={span.context.trace_id} span={span.context.span_id} parent={span.parent_id or '-'} "
+                f"{elapsed:9.2f}ms {span.status:5} {span.name}\n"
+            )
+        self.out.write("".join(lines))
+        self.out.flush()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Appends spans as JSON lines, one write per finished request."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+
+    def export(self, spans: List[Span]) -> None:
+        data = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(data)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """Creates spans and hands finished local traces to the exporter; disabled without one."""
+
+    def __init__(self):
+        self.exporter = None
+        self.sample_ratio = 1.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[SpanContext] = None) -> Span:
+        """A span under parent, else under the current span, else the root of a new trace.
+
+        An explicit parent (from a traceparent header or another thread) starts
+        a new local root: its spans are exported when it ends.
+        """
+        current = _current.get() if parent is None else None
+        if current is not None:
+            trace_id, parent_id, sampled, local = (
+                current.context.trace_id, current.context.span_id, current.context.sampled, current._local
+            )
+        else:
+            if parent is not None:
+                trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+            else:
+                trace_id, parent_id = secrets.token_hex(16), None
+                sampled = self.sample_ratio >= 1 or random.random() < self.sample_ratio
+            local = _LocalTrace()
+        span = Span(self, name, SpanContext(trace_id, secrets.token_hex(8), sampled), parent_id, local)
+        if local.root is None:
+            local.root = span
+        if attributes:
+            span.set_attributes(attributes)
+        return span
+
+    @contextmanager
+    def start_as_current_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                              parent: Optional[SpanContext] = None) -> Iterator[Span]:
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, attributes, parent)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            span.set_status(ERROR, str(exc) or type(exc).__qualname__)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+
+    def export(self, spans: List[Span]) -> None:
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(spans)
+        except Exception:
+            # Tracing must never fail the request it is tracing
+            logger.exception("Could not export %s spans", len(spans))
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """A child of the current span; outside a sampled trace it records nothing and costs nothing."""
+    parent = _current.get()
+    if parent is None or not parent.recording:
+        yield NOOP_SPAN
+        return
+    with tracer.start_as_current_span(name, attributes) as child:
+        yield child
+
+
+def traced(fn: Callable, name: Optional[str] = None) -> Callable:
+    """Wraps fn so each call inside a trace gets its own span; other calls go straight through."""
+    name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None or not parent.recording:
+                return await fn(*args, **kwargs)
+            with tracer.start_as_current_span(name):
+                return await fn(*args, **kwargs)
+    else:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is None or not parent.recording:
+                return fn(*args, **kwargs)
+            with tracer.start_as_current_span(name):
+                return fn(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def instrument_package(package: ModuleType) -> None:
+    """Traces every public function defined in the package's modules (the service layer).
+
+    Callers reach services as module attributes (file_service.upload_file), so
+    replacing the attributes covers them. Generators are skipped: their work
+    happens after the call returns.
+    """
+    for info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f"{package.__name__}.{info.name}")
+        for attr, value in list(vars(module).items()):
+            if (
+                attr.startswith("_") or not inspect.isfunction(value) or value.__module__ != module.__name__
+                or getattr(value, "__traced__", False)
+                or inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value)
+            ):
+                continue
+            setattr(module, attr, traced(value))
+
+
+def uninstrument_package(package: ModuleType) -> None:
+    """Puts back the functions instrument_package replaced."""
+    for info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f"{package.__name__}.{info.name}")
+        for attr, value in list(vars(module).items()):
+            if getattr(value, "__traced__", False):
+                setattr(module, attr, value.__wrapped__)
+
+
+def in_background(fn: Callable) -> Callable:
+    """Binds fn to the current trace, for work that runs after the response (BackgroundTasks, threads).
+
+    The job gets its own span in the request's trace and exports its spans
+    when it finishes, since the request span has already gone out.
+    """
+    parent = _current.get()
+    if parent is None or not tracer.enabled:
+        return fn
+    context = parent.context
+    name = f"background {fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def job(*args, **kwargs):
+            with tracer.start_as_current_span(name, parent=context):
+                return await fn(*args, **kwargs)
+    else:
+        @wraps(fn)
+        def job(*args, **kwargs):
+            with tracer.start_as_current_span(name, parent=context):
+                return fn(*args, **kwargs)
+    return job
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if parent is None or not parent.recording:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    attributes = {"db.system": conn.dialect.name, "db.statement": statement[:STATEMENT_MAX_LENGTH]}
+    if executemany:
+        attributes["db.executemany"] = True
+    # Statements never contain other spans, so this one is not made current
+    context._trace_span = tracer.start_span(operation, attributes)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rows_affected", cursor.rowcount)
+        span.end()
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.set_status(ERROR, type(exception_context.original_exception).__qualname__)
+        span.end()
+
+
+_LISTENERS = (
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+    ("handle_error", _handle_error),
+)
+
+
+def instrument_sqlalchemy() -> None:
+    """A span per statement on every engine (primary and replicas), under whatever span is current."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, listener in _LISTENERS:
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+def uninstrument_sqlalchemy() -> None:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, listener in _LISTENERS:
+        if event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+
+def create_exporter(name: str, path: str):
+    if name == "console":
+        return ConsoleExporter()
+    if name == "file":
+        return FileExporter(path)
+    if name in ("", "none"):
+        return None
+    raise ValueError(f"Unknown TRACING_EXPORTER {name!r}")
+
+
+def configure(exporter, sample_ratio: float = 1.0) -> bool:
+    """Installs the exporter (None turns tracing off); returns whether tracing is on."""
+    if tracer.exporter is not None and tracer.exporter is not exporter:
+        tracer.exporter.shutdown()
+    tracer.exporter = exporter
+    tracer.sample_ratio = sample_ratio
+    return tracer.enabled
+
+
+def setup(package: ModuleType) -> bool:
+    """Configures tracing from settings and, when it is on, instruments the package and SQLAlchemy."""
+    if configure(create_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE), settings.TRACING_SAMPLE_RATIO):
+        instrument_package(package)
+        instrument_sqlalchemy()
+    return tracer.enabled
+
+
+def shutdown() -> None:
+    """Closes the exporter's file; a later export reopens it."""
+    if tracer.exporter is not None:
+        tracer.exporter.shutdown()
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """The matched route as a template (/api/v1/files/{file_id}/download).
+
+    Routes from included routers only know their own part of the path, so
+    the router prefixes are recovered from the concrete path.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return None
+    try:
+        concrete = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = scope["path"]
+    return path[:-len(concrete)] + path_format if concrete and path.endswith(concrete) else path_format
+
+
+class TracingMiddleware:
+    """Opens the root span of each HTTP request and returns its trace id in X-Trace-Id.
+
+    The span ends with the last body chunk, so background tasks that run
+    afterwards appear as their own spans in the same trace rather than
+    stretching the request's duration.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        parent = parse_traceparent(Headers(scope=scope).get(TRACEPARENT_HEADER, ""))
+        span = tracer.start_span(method, {"http.request.method": method, "url.path": scope["path"]}, parent)
+        token = _current.set(span)
+
+        def finish() -> None:
+            route = route_template(scope)
+            if route is not None:
+                # Low-cardinality name: the route template, not the concrete URL
+                span.name = f"{method} {route}"
+                span.set_attribute("http.route", route)
+            span.end()
+
+        async def send_traced(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status(ERROR)
+                MutableHeaders(scope=message)[TRACE_HEADER] = span.context.trace_id
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_traced)
+        except Exception as exc:
+            span.record_exception(exc)
+            span.set_status(ERROR, type(exc).__qualname__)
+            raise
+        finally:
+            finish()
+            _current.reset(token)
@@ -0,0 +1,123 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from sqlalchemy import Delete, Insert, Update, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.invalidation import RECENT_WRITER, InvalidationBus
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Read replicas picked round-robin, skipping any that failed their last health check."""
+
+    def __init__(self, engines: Iterable[Engine], check_interval: float):
+        self.engines = list(engines)
+        self.check_interval = check_interval
+        self._healthy: Dict[Engine, bool] = {engine: True for engine in self.engines}
+        self._checked_at: Dict[Engine, float] = {engine: float("-inf") for engine in self.engines}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def choose(self) -> Optional[Engine]:
+        """Returns a healthy replica, or None when all are down and reads should go to the primary."""
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._turn) % len(self.engines)]
+            if self._is_healthy(engine):
+                return engine
+        return None
+
+    def mark_down(self, engine: Engine) -> None:
+        with self._lock:
+            self._healthy[engine] = False
+            self._checked_at[engine] = time.monotonic()
+        logger.warning("Replica %s marked unhealthy; reads fall back to the primary", engine.url)
+
+    def _is_healthy(self, engine: Engine) -> bool:
+        with self._lock:
+            due = time.monotonic() - self._checked_at[engine] >= self.check_interval
+            if due:
+                self._checked_at[engine] = time.monotonic()
+        if due:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy = True
+            except DBAPIError:
+                healthy = False
+            with self._lock:
+                if healthy and not self._healthy[engine]:
+                    logger.info("Replica %s is healthy again", engine.url)
+                self._healthy[engine] = healthy
+        return self._healthy[engine]
+
+    def _on_error(self, context) -> None:
+        # A dropped connection mid-request takes the replica out until its next health check
+        if context.is_disconnect and context.engine is not None:
+            self.mark_down(context.engine)
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when info["read_only"] is set.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary, so a
+    read-only request that does write still writes in the right place.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kw):
+        super().__init__(*args, **kw)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            # Lets RecentWriters tell a committed write from a read-only transaction
+            self.info["wrote"] = True
+        elif self.replicas is not None and self.info.get("read_only"):
+            replica = self.info.get("replica")
+            if replica is None:
+                # Pinned for the rest of the session so one request sees one snapshot
+                replica = self.info["replica"] = self.replicas.choose() or False
+            if replica:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+class RecentWriters:
+    """Principals that committed a write recently and must read from the primary.
+
+    With a bus, writes are announced to the other workers too, so the next
+    request stays on the primary whichever worker serves it.
+    """
+
+    def __init__(self, window_seconds: float, bus: Optional[InvalidationBus] = None):
+        self._cache = TTLCache(ttl_seconds=window_seconds)
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(RECENT_WRITER, lambda principals: [self.add(p) for p in principals])
+
+    def add(self, principal: str) -> None:
+        self._cache.set(principal, True)
+
+    def __contains__(self, principal: str) -> bool:
+        return self._cache.get(principal) is not None
+
+    def watch(self, session_factory) -> None:
+        """Records the session's principal after every commit that wrote something."""
+
+        @event.listens_for(session_factory, "after_commit")
+        def _committed(session):
+            principal = session.info.get("principal")
+            if session.info.pop("wrote", False) and principal is not None:
+                self.add(principal)
+                if self.bus is not None:
+                    self.bus.publish(RECENT_WRITER, principal, local=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
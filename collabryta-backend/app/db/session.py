@@ -1,6 +1,47 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import sqlite3
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, raiseload, sessionmaker
 from app.core.config import settings
+from app.core.invalidation import bus
+from app.db.routing import RecentWriters, ReplicaSet, RoutingSession
+from app.db.sqlite import create_sqlite_engine
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+def _raise_on_lazy_load(execute_state: ORMExecuteState) -> None:
+    if execute_state.is_select and not execute_state.is_column_load and not execute_state.is_relationship_load:
+        # Explicit loader options on the statement still win over the wildcard;
+        # sql_only lets many-to-ones already in the identity map through
+        execute_state.statement = execute_state.statement.options(raiseload("*", sql_only=True))
+
+def enable_strict_loading(session_factory: sessionmaker) -> None:
+    """Makes any relationship a query did not eagerly load raise on access instead of emitting SQL."""
+    event.listen(session_factory, "do_orm_execute", _raise_on_lazy_load)
+
+engine = (
+    create_sqlite_engine(settings.DATABASE_URL) if settings.DATABASE_URL.startswith("sqlite")
+    else create_engine(settings.DATABASE_URL)
+)
+replicas = ReplicaSet(
+    [create_engine(url, pool_pre_ping=True) for url in settings.DATABASE_REPLICA_URLS],
+    check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS,
+) if settings.DATABASE_REPLICA_URLS else None
+# Without replicas nothing reads the stickiness, so writes are not broadcast
+recent_writers = RecentWriters(settings.REPLICA_STICKY_SECONDS, bus=bus if replicas else None)
+
+# Objects stay usable after commit: server-generated columns come back via
+# RETURNING (see eager_defaults on the models), so no refresh round trip is needed
+SessionLocal = sessionmaker(
+    class_=RoutingSession, replicas=replicas,
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+recent_writers.watch(SessionLocal)
+if settings.STRICT_LOADING:
+    enable_strict_loading(SessionLocal)
@@ -0,0 +1,186 @@
+"""SQLite profile for tests and small single-node deployments.
+
+WAL lets readers run alongside the one writer SQLite allows, and the
+pragmas trade a little durability on power loss (synchronous=NORMAL) for
+far fewer fsyncs. Writes are queued on a per-database lock in this
+process, so concurrent requests wait their turn in order instead of
+polling SQLite's busy handler; the busy timeout still covers other
+processes (CLI jobs, a second worker) using the same file.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# RETURNING (eager defaults, the rate limiter's upsert) needs 3.35
+MIN_VERSION = (3, 35, 0)
+
+# pysqlite opens a transaction implicitly before these, and SQLite takes the write lock at the first one
+_WRITE = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+_write_locks: Dict[str, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+
+def write_lock(database: str) -> threading.Lock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(os.path.abspath(database), threading.Lock())
+
+
+class _QueuedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        self.connection._before_statement(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection._before_statement(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class QueuedWriteConnection(sqlite3.Connection):
+    """Holds its database's write lock from the first write statement until commit or rollback.
+
+    A plain Lock rather than an RLock, because a session's transaction can
+    end on a different threadpool thread from the one that started it. If
+    the lock is not free within the busy timeout (say, one thread writing
+    on two connections), the statement goes ahead and SQLite's own busy
+    handling applies.
+    """
+
+    write_lock: threading.Lock
+    lock_timeout: float
+    _holding = False
+
+    def cursor(self, factory=_QueuedCursor):
+        return super().cursor(factory)
+
+    def _before_statement(self, sql: str) -> None:
+        if not self._holding and not self.in_transaction and _WRITE.match(sql):
+            if self.write_lock.acquire(timeout=self.lock_timeout):
+                self._holding = True
+            else:
+                logger.warning("Waited %.1fs for the SQLite write queue; writing anyway", self.lock_timeout)
+
+    def _release(self) -> None:
+        if self._holding:
+            self._holding = False
+            self.write_lock.release()
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            self._release()
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self._release()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._release()
+
+
+def pragmas() -> Dict[str, object]:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        # Negative sizes are KiB; this is per connection
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "temp_store": "MEMORY",
+        # Checkpoints truncate the WAL back to this size instead of leaving it at its peak
+        "journal_size_limit": 64 * 1024 * 1024,
+    }
+
+
+def _apply_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def is_file_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:") \
+        and not parsed.database.startswith("file::memory:")
+
+
+def create_sqlite_engine(url: str, **kwargs) -> Engine:
+    """An engine for a SQLite file with WAL, the tuned pragmas and the write queue.
+
+    Connections are shared across threads (FastAPI runs sync endpoints in a
+    threadpool), so check_same_thread is off. In-memory databases get a
+    plain engine: every connection is its own database there.
+    """
+    connect_args = {"check_same_thread": False, **kwargs.pop("connect_args", {})}
+    if not is_file_database(url):
+        return create_engine(url, connect_args=connect_args, **kwargs)
+
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    lock = write_lock(make_url(url).database)
+
+    class Connection(QueuedWriteConnection):
+        write_lock = lock
+        lock_timeout = timeout
+
+    connect_args.setdefault("timeout", timeout)  # pysqlite's busy timeout
+    connect_args["factory"] = Connection
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    event.listen(engine, "connect", _apply_pragmas)
+    return engine
+
+
+def capabilities(engine: Engine) -> Dict[str, object]:
+    """What this SQLite build supports among the features the app and its deployments lean on."""
+    with engine.connect() as conn:
+        dbapi = conn.connection.dbapi_connection
+        version = dbapi.execute("SELECT sqlite_version()").fetchone()[0]
+        options = {row[0] for row in dbapi.execute("PRAGMA compile_options")}
+        journal_mode = dbapi.execute("PRAGMA journal_mode").fetchone()[0]
+        try:
+            dbapi.execute("SELECT json_extract('{\"a\": 1}', '$.a')").fetchone()
+            json1 = True
+        except sqlite3.OperationalError:
+            json1 = False
+    numbers = tuple(int(part) for part in version.split("."))
+    return {
+        "version": version,
+        "journal_mode": journal_mode,
+        "returning": numbers >= (3, 35, 0),
+        "upsert": numbers >= (3, 24, 0),
+        "json1": json1,
+        "fts5": "ENABLE_FTS5" in options,
+    }
+
+
+def check(engine: Engine) -> Optional[Dict[str, object]]:
+    """Logs the SQLite build's capabilities at startup and refuses builds the app cannot run on."""
+    if engine.dialect.name != "sqlite":
+        return None
+    found = capabilities(engine)
+    if tuple(int(part) for part in found["version"].split(".")) < MIN_VERSION:
+        raise RuntimeError(
+            f"SQLite {found['version']} is too old; the app needs {'.'.join(map(str, MIN_VERSION))}+ for RETURNING"
+        )
+    missing = [name for name in ("json1", "fts5") if not found[name]]
+    logger.info("SQLite %s, journal_mode=%s", found["version"], found["journal_mode"])
+    if missing:
+        logger.warning("This SQLite build lacks %s", ", ".join(missing))
+    return found
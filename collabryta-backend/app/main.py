@@ -1,22 +1,52 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
+import re
 
+from app.core import tracing
+from app.core.compression import CompressionMiddleware
+from app.core.profiler import ProfilerMiddleware
+from app.core.invalidation import LocalBackend, bus, create_backend
+from app.core.rate_limit import AdmissionMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.db.session import engine
+from app.api.deps import rate_limit
+from app.db.session import SessionLocal, engine
 from app.db.base import Base
-from app import models
+from app.db import sqlite
+from app import models, services
+from app.services import preview_service, upload_service
+from app.services.reminder_service import ReminderScheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Refuses SQLite builds without RETURNING and logs which optional extensions are there
+    sqlite.check(engine)
     # Initialize database tables
     Base.metadata.create_all(bind=engine)
     # Ensure static directories exist
     os.makedirs("app/static/uploads", exist_ok=True)
+    # Uploads abandoned while the server was down; run `python -m app.cli gc-uploads` from cron too
+    db = SessionLocal()
+    try:
+        upload_service.collect_garbage(db)
+    finally:
+        db.close()
+    # Other workers' writes evict this worker's caches
+    bus.attach(create_backend(settings.DATABASE_URL, settings.INVALIDATION_BACKEND))
+    # Meeting and deadline reminders; every worker runs one and leases pick the sender
+    # Preview workers start before the scheduler thread does
+    preview_service.start()
+    scheduler = ReminderScheduler(SessionLocal)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
     yield
+    scheduler.stop()
+    preview_service.shutdown()
+    bus.attach(LocalBackend())
+    tracing.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,6 +54,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+app.add_middleware(
+    AdmissionMiddleware,
+    limit=settings.MAX_CONCURRENT_REQUESTS,
+    wait_seconds=settings.ADMISSION_WAIT_SECONDS,
+    path_prefix=settings.API_V1_STR,
+    # Upload chunks stream for as long as the client's bandwidth needs and release their DB connection meanwhile
+    exempt=re.compile(rf"^PATCH {re.escape(settings.API_V1_STR)}/files/uploads/[^/]+$"),
+)
+
 # CORS Configuration
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -32,11 +72,20 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[tracing.TRACE_HEADER],
     )
 
+app.add_middleware(ProfilerMiddleware)
+
+# Outermost, so a request's span covers admission and compression as well.
+# Spans wrap every service function and SQL statement made while it is open
+tracing.setup(services)
+app.add_middleware(tracing.TracingMiddleware)
+
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+# Rate limiting runs before any endpoint dependency, so rejected calls never take a DB connection
+app.include_router(api_router, prefix=settings.API_V1_STR, dependencies=[Depends(rate_limit)])
 
 @app.get("/")
 def root():
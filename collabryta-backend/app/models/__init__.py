@@ -1,6 +1,10 @@
 from app.models.user import User
-from app.models.message import Message, Chat, ChatParticipant
+from app.models.message import Message, Chat, ChatParticipant, MessageMention, MessageArchiveSegment, ChatInbox
 from app.models.file import File
 from app.models.meeting import Meeting
 from app.models.notification import Notification
 from app.models.task import Task
+from app.models.sync import ChangeLog
+from app.models.rate_limit import RateLimitBucket
+from app.models.reminder import ReminderLease
+from app.models.upload import UploadSession, UploadChunk
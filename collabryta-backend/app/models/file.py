@@ -1,19 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 class File(Base):
     __tablename__ = "files"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_type = Column(String, nullable=True)  # e.g. "PDF", "Image", "Video"
-    file_size_bytes = Column(Integer, default=0)
+    content_type = Column(String, nullable=True)  # sniffed from the bytes after upload
+    file_size_bytes = Column(BigInteger, default=0)  # resumable uploads go past 2 GB
     title = Column(String, nullable=True)
     description = Column(String, nullable=True)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    preview_path = Column(String, nullable=True)
+    preview_status = Column(String, nullable=True)  # pending, ready, unavailable, failed
     
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     owner = relationship("User", back_populates="files")
@@ -7,8 +7,8 @@ from app.db.base import Base
 meeting_participants = Table(
     'meeting_participants',
     Base.metadata,
-    Column('meeting_id', Integer, ForeignKey('meetings.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('meeting_id', Integer, ForeignKey('meetings.id', ondelete="CASCADE"), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
 )
 
 class Meeting(Base):
@@ -17,13 +17,13 @@ class Meeting(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    start_time = Column(DateTime(timezone=True), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False, index=True)
     end_time = Column(DateTime(timezone=True), nullable=False)
     location = Column(String, nullable=True) # e.g. "Conference Room A" or "Zoom"
     meeting_link = Column(String, nullable=True)
     
-    host_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    host_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Relationships
     host = relationship("User", back_populates="hosted_meetings")
-    participants = relationship("User", secondary=meeting_participants, back_populates="attended_meetings")
+    participants = relationship("User", secondary=meeting_participants, back_populates="attended_meetings", passive_deletes=True)
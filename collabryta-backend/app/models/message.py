@@ -1,34 +1,89 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 class ChatParticipant(Base):
     __tablename__ = "chat_participants"
-    chat_id = Column(Integer, ForeignKey("chats.id"), primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True)
+    # Own index: the primary key only serves lookups by chat
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
 
 class Chat(Base):
     __tablename__ = "chats"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)  # Nullable for P2P chats (can use other user's name)
     is_group = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # May delete a group chat for everyone; other members can only leave it
+    creator_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # Newest message moved to the archive; None while the whole history is in `messages`
+    archived_through = Column(Integer, nullable=True)
     
     # Relationships
-    messages = relationship("Message", back_populates="chat", cascade="all, delete-orphan")
-    participants = relationship("User", secondary="chat_participants", backref="chats")
+    # Rows are removed by ON DELETE CASCADE; the ORM never loads them just to delete them
+    messages = relationship("Message", back_populates="chat", cascade="all, delete-orphan", passive_deletes=True)
+    participants = relationship("User", secondary="chat_participants", backref="chats", passive_deletes=True)
 
 class Message(Base):
     __tablename__ = "messages"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
-    sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"), nullable=False, index=True)
+    sender_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     is_read = Column(Boolean, default=False)
 
     chat = relationship("Chat", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id])
+
+class MessageMention(Base):
+    """A user @mentioned in a message, extracted when the message is written."""
+    __tablename__ = "message_mentions"
+
+    # user_id first: the primary key is the index behind "what mentions me", newest first by message id
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # No foreign key: the mention outlives its message's move into the archive (archive_service),
+    # so the places that delete messages delete their mentions too
+    message_id = Column(Integer, primary_key=True, index=True)
+    chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"), nullable=False, index=True)
+
+class MessageArchiveSegment(Base):
+    """A run of consecutive old messages of one chat, compressed into a single row.
+
+    Segments are only appended: each covers ids after the previous one's.
+    (chat_id, last_message_id) finds the segment holding any message id.
+    """
+    __tablename__ = "message_archive_segments"
+    __table_args__ = (Index("ix_message_archive_segments_chat_last", "chat_id", "last_message_id"),)
+
+    id = Column(Integer, primary_key=True)
+    chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"), nullable=False)
+    first_message_id = Column(Integer, nullable=False)
+    last_message_id = Column(Integer, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+    codec = Column(String, nullable=False, default="zlib+json")
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ChatInbox(Base):
+    """One row per participant and chat: what the conversation list shows, kept current as messages are sent and read."""
+    __tablename__ = "chat_inbox"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True, index=True)
+    # Not a foreign key: the message may since have moved to the archive
+    last_message_id = Column(Integer, nullable=True)
+    last_message_preview = Column(Text, nullable=True)
+    # Time of the last message, or of the chat's creation while it has none
+    last_activity = Column(DateTime(timezone=True), nullable=False)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+# The inbox, newest first, is one range scan; chat_id breaks ties between equal timestamps
+Index("ix_chat_inbox_user_activity", ChatInbox.user_id, ChatInbox.last_activity.desc(), ChatInbox.chat_id.desc())
@@ -0,0 +1,11 @@
+from sqlalchemy import Boolean, Column, Float, String
+from app.db.base import Base
+
+class RateLimitBucket(Base):
+    """Token bucket state shared by every app process when RATE_LIMIT_BACKEND is "database"."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)  # route:principal
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # unix time of the last take
+    allowed = Column(Boolean, nullable=False)  # outcome of the last take, read back via RETURNING
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class ReminderLease(Base):
+    """Claim on one reminder firing; the primary key makes sure only one worker sends it."""
+    __tablename__ = "reminder_leases"
+
+    key = Column(String, primary_key=True)  # kind:entity_id:offset:event time
+    worker = Column(String, nullable=False)
+    fired_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
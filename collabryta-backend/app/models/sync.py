@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class ChangeLog(Base):
+    """Append-only outbox of entity changes, one row per affected user."""
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True, index=True)  # doubles as the sync cursor
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String, nullable=False)  # message, chat, task, meeting, file, notification
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert, delete
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_log_user_cursor", "user_id", "id"),
+    )
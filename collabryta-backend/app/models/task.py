@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, null
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 class Task(Base):
     __tablename__ = "tasks"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -13,13 +14,14 @@ class Task(Base):
     priority = Column(String, default="Medium") # Low, Medium, High
     
     start_date = Column(DateTime(timezone=True), nullable=True)
-    end_date = Column(DateTime(timezone=True), nullable=True)
+    end_date = Column(DateTime(timezone=True), nullable=True, index=True)
     
-    owner_id = Column(Integer, ForeignKey("users.id"))
-    assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    assigned_to_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # SQL-expression default so INSERT ... RETURNING covers it instead of a follow-up SELECT
+    updated_at = Column(DateTime(timezone=True), default=null(), onupdate=func.now())
 
     owner = relationship("User", foreign_keys=[owner_id], backref="created_tasks")
     assigned_to = relationship("User", foreign_keys=[assigned_to_id], backref="assigned_tasks")
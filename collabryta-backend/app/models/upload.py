@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class UploadSession(Base):
+    """A resumable upload in progress; its bytes live in the staging directory until finalized."""
+    __tablename__ = "upload_sessions"
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(String, primary_key=True)  # random hex, also names the staging file
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    length = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class UploadChunk(Base):
+    """Byte range [start, end) received for a session; insert-only, so parallel chunks never contend."""
+    __tablename__ = "upload_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, ForeignKey("upload_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    start = Column(BigInteger, nullable=False)
+    end = Column(BigInteger, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Text, JSON
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, JSON, DDL, Index, event, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -48,10 +48,30 @@ class User(Base):
 
     # Security
     two_factor_enabled = Column(Boolean, default=False)
+    # Set by DELETE /users/me; the row stays until purge_service.purge_user finishes
+    deletion_requested_at = Column(DateTime(timezone=True), nullable=True)
     
-    files = relationship("File", back_populates="owner")
+    files = relationship("File", back_populates="owner", passive_deletes=True)
     
-    hosted_meetings = relationship("Meeting", back_populates="host")
-    attended_meetings = relationship("Meeting", secondary="meeting_participants", back_populates="participants")
+    hosted_meetings = relationship("Meeting", back_populates="host", passive_deletes=True)
+    attended_meetings = relationship("Meeting", secondary="meeting_participants", back_populates="participants", passive_deletes=True)
     
-    notifications = relationship("Notification", back_populates="user")
+    notifications = relationship("Notification", back_populates="user", passive_deletes=True)
+
+    # Trigram indexes back /users/search on Postgres (prefix LIKE and fuzzy % matching)
+    __table_args__ = (
+        Index(
+            "ix_users_name_trgm", func.lower(name).label("name_lower"),
+            postgresql_using="gin", postgresql_ops={"name_lower": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_email_trgm", func.lower(email).label("email_lower"),
+            postgresql_using="gin", postgresql_ops={"email_lower": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
@@ -1,5 +1,9 @@
-from .user import User, UserCreate, UserUpdate
+from .user import User, UserCreate, UserUpdate, UserSummary
 from .token import Token, TokenPayload
 from .meeting import Meeting, MeetingCreate, MeetingUpdate
 from .notification import Notification, NotificationCreate, NotificationUpdate
-from .task import Task, TaskCreate, TaskUpdate
+from .task import Task, TaskCreate, TaskUpdate, TaskBulkRequest, TaskBulkResult
+from .dashboard import DashboardSummary
+from .sync import SyncChange, SyncResponse
+from .imports import ImportReport, ImportRowError
+from .digest import Digest, DigestReport
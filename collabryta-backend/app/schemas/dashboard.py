@@ -0,0 +1,35 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class DashboardMeeting(BaseModel):
+    id: int
+    title: str
+    start_time: datetime
+    end_time: datetime
+    location: Optional[str] = None
+    meeting_link: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class DashboardFile(BaseModel):
+    id: int
+    title: Optional[str] = None
+    filename: str
+    file_type: Optional[str] = None
+    file_size_bytes: int
+    uploaded_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class DashboardSummary(BaseModel):
+    total_tasks: int = 0
+    tasks_by_status: Dict[str, int] = {}
+    tasks_by_priority: Dict[str, int] = {}
+    overdue_tasks: int = 0
+    upcoming_meetings: List[DashboardMeeting] = []
+    unread_messages: int = 0
+    unread_notifications: int = 0
+    recent_files: List[DashboardFile] = []
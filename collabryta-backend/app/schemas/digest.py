@@ -0,0 +1,29 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+from app.schemas.dashboard import DashboardFile, DashboardMeeting
+
+class DigestTask(BaseModel):
+    id: int
+    title: Optional[str] = None
+    priority: Optional[str] = None
+    end_date: datetime
+
+class Digest(BaseModel):
+    user_id: int
+    email: str
+    name: Optional[str] = None
+    unread_messages: int = 0
+    due_tasks: List[DigestTask] = []
+    due_tasks_total: int = 0
+    upcoming_meetings: List[DashboardMeeting] = []
+    upcoming_meetings_total: int = 0
+    new_files: List[DashboardFile] = []
+
+    def is_empty(self) -> bool:
+        return not (self.unread_messages or self.due_tasks or self.upcoming_meetings or self.new_files)
+
+class DigestReport(BaseModel):
+    users: int = 0
+    sent: int = 0
+    skipped: int = 0
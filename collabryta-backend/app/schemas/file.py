@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 from typing import Optional
+from app.core import storage
 
 class FileBase(BaseModel):
     title: str
@@ -17,6 +18,33 @@ class FileResponse(FileBase):
     file_size_bytes: int
     uploaded_at: datetime
     owner_id: int
+    content_type: Optional[str] = None
+    preview_status: Optional[str] = None
+    # Read from the row for preview_url, not sent itself
+    preview_path: Optional[str] = Field(None, exclude=True)
 
     class Config:
         from_attributes = True
+
+    # Static paths for local storage, presigned links for S3; resolved when the response is rendered
+    @computed_field
+    @property
+    def download_url(self) -> str:
+        return storage.backend.url(self.filename)
+
+    @computed_field
+    @property
+    def preview_url(self) -> Optional[str]:
+        return storage.backend.url(self.preview_path) if self.preview_path else None
+
+class UploadSessionCreate(FileBase):
+    filename: str
+    length: int = Field(..., gt=0)
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    filename: str
+    title: Optional[str] = None
+    length: int
+    offset: int
+    expires_at: datetime
@@ -0,0 +1,11 @@
+from typing import List
+from pydantic import BaseModel
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportReport(BaseModel):
+    total: int = 0
+    imported: int = 0
+    errors: List[ImportRowError] = []
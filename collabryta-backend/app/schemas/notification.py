@@ -9,6 +9,8 @@ class NotificationBase(BaseModel):
 
 class NotificationCreate(NotificationBase):
     user_id: int
+    source_type: Optional[str] = None
+    source_id: Optional[int] = None
 
 class NotificationUpdate(BaseModel):
     is_read: Optional[bool] = None
@@ -18,6 +20,9 @@ class Notification(NotificationBase):
     user_id: int
     is_read: bool
     created_at: datetime
+    source_type: Optional[str] = None
+    source_id: Optional[int] = None
+    count: int = 1
 
     class Config:
         from_attributes = True
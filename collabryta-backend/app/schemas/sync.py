@@ -0,0 +1,14 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+class SyncChange(BaseModel):
+    cursor: int
+    entity: str
+    id: int
+    op: str  # upsert, delete
+    data: Optional[Any] = None
+
+class SyncResponse(BaseModel):
+    cursor: int
+    has_more: bool = False
+    changes: List[SyncChange] = []
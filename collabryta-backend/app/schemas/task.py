@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class TaskBase(BaseModel):
     title: str
@@ -28,3 +28,19 @@ class TaskInDBBase(TaskBase):
 
 class Task(TaskInDBBase):
     pass
+
+MAX_BULK_ITEMS = 1000
+
+class TaskBulkUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+    changes: TaskUpdate
+
+class TaskBulkRequest(BaseModel):
+    create: List[TaskCreate] = Field(default=[], max_length=MAX_BULK_ITEMS)
+    update: List[TaskBulkUpdate] = Field(default=[], max_length=MAX_BULK_ITEMS)
+    delete: List[int] = Field(default=[], max_length=MAX_BULK_ITEMS)
+
+class TaskBulkResult(BaseModel):
+    created: List[Task] = []
+    updated: List[int] = []
+    deleted: List[int] = []
@@ -67,3 +67,13 @@ class User(UserInDBBase):
 
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+# Compact row for participant pickers
+class UserSummary(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: str
+    job_title: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,207 @@
+"""Cold storage for old chat history.
+
+Messages older than MESSAGE_ARCHIVE_AFTER_DAYS leave the `messages` table
+in runs of up to MESSAGE_ARCHIVE_SEGMENT_SIZE, each run stored as one
+zlib-compressed JSON row in `message_archive_segments`. The hot table and
+its indexes then only hold recent history, and reading a page of old
+history is one index lookup and one decompression instead of hundreds of
+rows. Chat.archived_through records how far a chat's archive reaches.
+Mention rows stay behind in `message_mentions`; the mentions feed reads
+their messages back through get_messages.
+"""
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.message import Chat, ChatParticipant, Message, MessageArchiveSegment, MessageMention
+from app.models.user import User
+from app.services import sync_service
+
+logger = logging.getLogger(__name__)
+
+CODEC = "zlib+json"
+
+@dataclass
+class ArchivedMessage:
+    """A message read back from a segment; serializes like a Message row."""
+    id: int
+    chat_id: int
+    sender_id: int
+    content: str
+    timestamp: datetime
+    is_read: bool
+    sender: Optional[User] = None
+
+def encode_segment(rows: Sequence[Any]) -> bytes:
+    """Packs (id, sender_id, content, timestamp, is_read) rows, oldest first."""
+    payload = [[row.id, row.sender_id, row.content, row.timestamp.isoformat(), row.is_read] for row in rows]
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 9)
+
+def decode_segment(chat_id: int, data: bytes) -> List[ArchivedMessage]:
+    return [
+        ArchivedMessage(id, chat_id, sender_id, content, datetime.fromisoformat(timestamp), is_read)
+        for id, sender_id, content, timestamp, is_read in json.loads(zlib.decompress(data))
+    ]
+
+def _segment(chat_id: int, rows: Sequence[Any]) -> MessageArchiveSegment:
+    return MessageArchiveSegment(
+        chat_id=chat_id,
+        first_message_id=rows[0].id,
+        last_message_id=rows[-1].id,
+        message_count=len(rows),
+        first_timestamp=rows[0].timestamp,
+        last_timestamp=rows[-1].timestamp,
+        codec=CODEC,
+        data=encode_segment(rows),
+    )
+
+def archive_chat(db: Session, chat_id: int, cutoff: datetime) -> int:
+    """Moves the chat's messages sent before the cutoff into new segments; returns how many moved.
+
+    Unread messages and everything after them stay in the hot table, so
+    marking a chat as read never has to touch the archive. Each segment is
+    written and its rows deleted in one transaction.
+    """
+    boundary = db.query(func.max(Message.id)).filter(Message.chat_id == chat_id, Message.timestamp < cutoff).scalar()
+    first_unread = db.query(func.min(Message.id)).filter(Message.chat_id == chat_id, Message.is_read == False).scalar()
+    if boundary is None:
+        return 0
+    if first_unread is not None:
+        boundary = min(boundary, first_unread - 1)
+
+    size = settings.MESSAGE_ARCHIVE_SEGMENT_SIZE
+    moved = 0
+    while True:
+        rows = db.query(
+            Message.id, Message.sender_id, Message.content, Message.timestamp, Message.is_read
+        ).filter(Message.chat_id == chat_id, Message.id <= boundary).order_by(Message.id).limit(size).all()
+        if not rows:
+            return moved
+        db.add(_segment(chat_id, rows))
+        # The rows are the chat's oldest hot messages, so the id range holds exactly them
+        db.query(Message).filter(
+            Message.chat_id == chat_id, Message.id.between(rows[0].id, rows[-1].id)
+        ).delete(synchronize_session=False)
+        db.query(Chat).filter(Chat.id == chat_id).update({Chat.archived_through: rows[-1].id})
+        db.commit()
+        moved += len(rows)
+        if len(rows) < size:
+            return moved
+
+def archive_old_messages(db: Session, older_than_days: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """Archives every chat's messages older than the configured age."""
+    days = settings.MESSAGE_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+    chat_ids = [row.chat_id for row in db.query(Message.chat_id).filter(Message.timestamp < cutoff).distinct()]
+    moved = sum(archive_chat(db, chat_id, cutoff) for chat_id in chat_ids)
+    logger.info("Archived %s messages from %s chats", moved, len(chat_ids))
+    return moved
+
+def read_messages(db: Session, chat_id: int, before: Optional[int] = None, limit: Optional[int] = None) -> List[ArchivedMessage]:
+    """Archived messages of a chat, newest first, with senders loaded; `before` is an exclusive message id.
+
+    Segments are decompressed newest first until the page is full, so a
+    page costs one or two segments however long the history is.
+    """
+    query = select(MessageArchiveSegment.data).where(MessageArchiveSegment.chat_id == chat_id)
+    if before is not None:
+        query = query.where(MessageArchiveSegment.first_message_id < before)
+    query = query.order_by(MessageArchiveSegment.last_message_id.desc()).execution_options(yield_per=4)
+
+    messages: List[ArchivedMessage] = []
+    result = db.execute(query).scalars()
+    try:
+        for data in result:
+            rows = [m for m in reversed(decode_segment(chat_id, data)) if before is None or m.id < before]
+            messages += rows
+            if limit is not None and len(messages) >= limit:
+                messages = messages[:limit]
+                break
+    finally:
+        result.close()
+
+    _load_senders(db, messages)
+    return messages
+
+def get_messages(db: Session, refs: Iterable[Tuple[int, int]]) -> Dict[int, ArchivedMessage]:
+    """Archived messages by id, with senders loaded, for (chat_id, message_id) pairs; ids not in the archive are left out.
+
+    Segments of a chat cover disjoint id ranges, so each id is looked up by
+    the range holding it and each segment is decompressed once.
+    """
+    wanted: Dict[int, set] = {}
+    for chat_id, message_id in refs:
+        wanted.setdefault(chat_id, set()).add(message_id)
+    if not wanted:
+        return {}
+    segments = db.execute(select(MessageArchiveSegment.chat_id, MessageArchiveSegment.data).where(or_(*(
+        and_(MessageArchiveSegment.chat_id == chat_id, MessageArchiveSegment.first_message_id <= message_id,
+             MessageArchiveSegment.last_message_id >= message_id)
+        for chat_id, ids in wanted.items() for message_id in ids
+    )))).all()
+    found = {m.id: m for chat_id, data in segments for m in decode_segment(chat_id, data) if m.id in wanted[chat_id]}
+    _load_senders(db, list(found.values()))
+    return found
+
+def _load_senders(db: Session, messages: List[ArchivedMessage]) -> None:
+    if messages:
+        senders = {user.id: user for user in db.query(User).filter(User.id.in_({m.sender_id for m in messages}))}
+        for message in messages:
+            message.sender = senders.get(message.sender_id)
+
+def last_message(db: Session, chat_id: int) -> Optional[ArchivedMessage]:
+    messages = read_messages(db, chat_id, limit=1)
+    return messages[0] if messages else None
+
+def export_batches(db: Session, user_id: int) -> Iterator[List[Dict[str, Any]]]:
+    """The archived messages of the user's chats as export rows, one segment per batch."""
+    query = select(MessageArchiveSegment.chat_id, MessageArchiveSegment.data).join(
+        ChatParticipant, ChatParticipant.chat_id == MessageArchiveSegment.chat_id
+    ).where(ChatParticipant.user_id == user_id).order_by(
+        MessageArchiveSegment.chat_id, MessageArchiveSegment.last_message_id
+    ).execution_options(yield_per=4)
+    for chat_id, data in db.execute(query):
+        yield [
+            {"id": m.id, "chat_id": m.chat_id, "sender_id": m.sender_id, "content": m.content,
+             "timestamp": m.timestamp, "is_read": m.is_read}
+            for m in decode_segment(chat_id, data)
+        ]
+
+def remove_sender(db: Session, user_id: int) -> int:
+    """Drops a purged user's messages from the segments of their chats; the one case where segments are rewritten.
+
+    Each segment is rewritten (or deleted, when nothing is left) in its
+    own transaction, together with the change-log rows telling the other
+    participants and the removed messages' mentions. Returns how many
+    messages were removed.
+    """
+    segment_ids = [row.id for row in db.query(MessageArchiveSegment.id).join(
+        ChatParticipant, ChatParticipant.chat_id == MessageArchiveSegment.chat_id
+    ).filter(ChatParticipant.user_id == user_id)]
+    removed = 0
+    for segment_id in segment_ids:
+        segment = db.get(MessageArchiveSegment, segment_id)
+        messages = decode_segment(segment.chat_id, segment.data)
+        kept = [m for m in messages if m.sender_id != user_id]
+        if len(kept) == len(messages):
+            continue
+        others = [row.user_id for row in db.query(ChatParticipant.user_id).filter(
+            ChatParticipant.chat_id == segment.chat_id, ChatParticipant.user_id != user_id
+        )]
+        removed_ids = [m.id for m in messages if m.sender_id == user_id]
+        sync_service.record_changes(db, "message", removed_ids, others, op=sync_service.DELETE)
+        db.execute(delete(MessageMention).where(MessageMention.message_id.in_(removed_ids)))
+        if kept:
+            rewritten = _segment(segment.chat_id, kept)
+            for column in ("first_message_id", "last_message_id", "message_count", "first_timestamp", "last_timestamp", "data"):
+                setattr(segment, column, getattr(rewritten, column))
+        else:
+            db.delete(segment)
+        db.commit()
+        removed += len(messages) - len(kept)
+    return removed
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, or_
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.invalidation import DASHBOARD_SUMMARY, bus
+from app.models.file import File
+from app.models.meeting import Meeting, meeting_participants
+from app.models.message import Message, ChatParticipant
+from app.models.task import Task
+from app.schemas.dashboard import DashboardSummary, DashboardMeeting, DashboardFile
+
+# user_id -> {(meetings_limit, files_limit): DashboardSummary}
+_summary_cache = TTLCache(ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+def invalidate_summary(*user_ids: Optional[int]) -> None:
+    """Drops cached dashboard summaries for the given users, in every worker."""
+    if any(user_id is not None for user_id in user_ids):
+        bus.publish(DASHBOARD_SUMMARY, *user_ids)
+
+def _evict_summaries(user_ids) -> None:
+    if not user_ids:
+        _summary_cache.clear()
+    for user_id in user_ids:
+        _summary_cache.invalidate(user_id)
+
+bus.subscribe(DASHBOARD_SUMMARY, _evict_summaries)
+
+def get_summary(db: Session, user_id: int, meetings_limit: int = 5, files_limit: int = 5) -> DashboardSummary:
+    """Returns the dashboard counters and short lists for a user, served from cache when fresh."""
+    variants: Dict[Tuple[int, int], DashboardSummary] = _summary_cache.get(user_id) or {}
+    key = (meetings_limit, files_limit)
+    if key in variants:
+        return variants[key]
+
+    summary = _compute_summary(db, user_id, meetings_limit, files_limit)
+    _summary_cache.set(user_id, {**variants, key: summary})
+    return summary
+
+def _compute_summary(db: Session, user_id: int, meetings_limit: int, files_limit: int) -> DashboardSummary:
+    from app.services import notification_service
+
+    now = datetime.now(timezone.utc)
+
+    # Task counters: one grouped scan over the user's tasks
+    overdue = case(
+        (and_(Task.end_date < now, Task.status != "Completed"), 1),
+        else_=0
+    )
+    task_rows = db.query(
+        Task.status, Task.priority, func.count(Task.id), func.sum(overdue)
+    ).filter(
+        or_(Task.owner_id == user_id, Task.assigned_to_id == user_id)
+    ).group_by(Task.status, Task.priority).all()
+
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    total = overdue_count = 0
+    for status, priority, count, overdue_sum in task_rows:
+        by_status[status or "Unknown"] = by_status.get(status or "Unknown", 0) + count
+        by_priority[priority or "Unknown"] = by_priority.get(priority or "Unknown", 0) + count
+        total += count
+        overdue_count += overdue_sum or 0
+
+    # Next meetings where the user is host or participant
+    attending = db.query(meeting_participants.c.meeting_id).filter(
+        meeting_participants.c.user_id == user_id
+    )
+    meetings = db.query(
+        Meeting.id, Meeting.title, Meeting.start_time, Meeting.end_time,
+        Meeting.location, Meeting.meeting_link
+    ).filter(
+        or_(Meeting.host_id == user_id, Meeting.id.in_(attending)),
+        Meeting.start_time >= now
+    ).order_by(Meeting.start_time).limit(meetings_limit).all()
+
+    # Unread messages across every chat the user belongs to
+    unread_messages = db.query(func.count(Message.id)).join(
+        ChatParticipant,
+        and_(ChatParticipant.chat_id == Message.chat_id, ChatParticipant.user_id == user_id)
+    ).filter(
+        Message.sender_id != user_id,
+        Message.is_read == False
+    ).scalar()
+
+    files = db.query(
+        File.id, File.title, File.filename, File.file_type,
+        File.file_size_bytes, File.uploaded_at
+    ).filter(File.owner_id == user_id).order_by(File.uploaded_at.desc()).limit(files_limit).all()
+
+    return DashboardSummary(
+        total_tasks=total,
+        tasks_by_status=by_status,
+        tasks_by_priority=by_priority,
+        overdue_tasks=overdue_count,
+        upcoming_meetings=[DashboardMeeting.model_validate(m) for m in meetings],
+        unread_messages=unread_messages or 0,
+        unread_notifications=notification_service.get_unread_count(db, user_id),
+        recent_files=[DashboardFile.model_validate(f) for f in files],
+    )
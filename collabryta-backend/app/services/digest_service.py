@@ -0,0 +1,178 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select, union
+from app.core.config import settings
+from app.models.file import File
+from app.models.meeting import Meeting, meeting_participants
+from app.models.message import Message, ChatParticipant
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.dashboard import DashboardFile, DashboardMeeting
+from app.schemas.digest import Digest, DigestReport, DigestTask
+
+class DigestSender(Protocol):
+    def send(self, to: str, subject: str, body: str) -> None: ...
+
+class FileSender:
+    """Writes each digest as a plain-text message under <directory>/<date>/ for local runs."""
+
+    def __init__(self, directory: str, date: Optional[str] = None):
+        self.directory = os.path.join(directory, date or datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def send(self, to: str, subject: str, body: str) -> None:
+        name = re.sub(r"[^\w.@-]", "_", to)
+        with open(os.path.join(self.directory, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"To: {to}\nSubject: {subject}\n\n{body}")
+
+def iter_recipients(db: Session, batch_size: int) -> Iterator[List[Tuple[int, str, Optional[str]]]]:
+    """Opted-in active users in id order, batch_size at a time, via keyset pagination."""
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(User.id, User.email, User.name).where(
+                User.id > last_id,
+                User.email_summary.isnot(False),
+                User.is_active.isnot(False)
+            ).order_by(User.id).limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+def _ranked(query, user_col, order_col, limit: int):
+    """Keeps the first `limit` rows per user, with each user's total alongside."""
+    ranked = query.add_columns(
+        func.row_number().over(partition_by=user_col, order_by=order_col).label("rank"),
+        func.count().over(partition_by=user_col).label("total")
+    ).subquery()
+    return select(ranked).where(ranked.c.rank <= limit)
+
+def _unread_counts(db: Session, user_ids: Sequence[int]) -> Dict[int, int]:
+    rows = db.execute(
+        select(ChatParticipant.user_id, func.count(Message.id))
+        .join(Message, Message.chat_id == ChatParticipant.chat_id)
+        .where(
+            ChatParticipant.user_id.in_(user_ids),
+            Message.sender_id != ChatParticipant.user_id,
+            Message.is_read == False
+        ).group_by(ChatParticipant.user_id)
+    )
+    return dict(rows.all())
+
+def _due_tasks(db: Session, user_ids: Sequence[int], until: datetime, limit: int) -> Dict[int, Tuple[List[DigestTask], int]]:
+    # Unassigned tasks fall to their owner, like assignment does on create
+    responsible = func.coalesce(Task.assigned_to_id, Task.owner_id)
+    query = select(
+        responsible.label("user_id"), Task.id, Task.title, Task.priority, Task.end_date
+    ).where(
+        # Spelled out rather than responsible.in_() so both foreign key indexes apply
+        or_(
+            Task.assigned_to_id.in_(user_ids),
+            and_(Task.assigned_to_id.is_(None), Task.owner_id.in_(user_ids))
+        ),
+        Task.end_date < until,
+        or_(Task.status.is_(None), Task.status != "Completed")
+    )
+    result: Dict[int, Tuple[List[DigestTask], int]] = {}
+    for row in db.execute(_ranked(query, responsible, Task.end_date, limit)).mappings():
+        tasks, _ = result.setdefault(row["user_id"], ([], row["total"]))
+        tasks.append(DigestTask.model_validate(row))
+    return result
+
+def _upcoming_meetings(db: Session, user_ids: Sequence[int], now: datetime, until: datetime, limit: int) -> Dict[int, Tuple[List[DashboardMeeting], int]]:
+    # union, not union_all: a host who is also a participant counts once
+    pairs = union(
+        select(Meeting.host_id.label("user_id"), Meeting.id.label("meeting_id")).where(Meeting.host_id.in_(user_ids)),
+        select(meeting_participants.c.user_id, meeting_participants.c.meeting_id).where(meeting_participants.c.user_id.in_(user_ids))
+    ).subquery()
+    query = select(
+        pairs.c.user_id, Meeting.id, Meeting.title, Meeting.start_time, Meeting.end_time,
+        Meeting.location, Meeting.meeting_link
+    ).join(Meeting, Meeting.id == pairs.c.meeting_id).where(
+        Meeting.start_time >= now, Meeting.start_time < until
+    )
+    result: Dict[int, Tuple[List[DashboardMeeting], int]] = {}
+    for row in db.execute(_ranked(query, pairs.c.user_id, Meeting.start_time, limit)).mappings():
+        meetings, _ = result.setdefault(row["user_id"], ([], row["total"]))
+        meetings.append(DashboardMeeting.model_validate(row))
+    return result
+
+def _new_files(db: Session, since: datetime, limit: int) -> List[Tuple[int, DashboardFile]]:
+    """Latest uploads across the workspace; the same list serves every recipient."""
+    rows = db.execute(
+        select(
+            File.owner_id, File.id, File.title, File.filename, File.file_type,
+            File.file_size_bytes, File.uploaded_at
+        ).where(File.uploaded_at >= since).order_by(File.uploaded_at.desc()).limit(limit * 2)
+    ).mappings()
+    return [(row["owner_id"], DashboardFile.model_validate(row)) for row in rows]
+
+def build_digests(db: Session, recipients: Sequence[Tuple[int, str, Optional[str]]], now: datetime, new_files: List[Tuple[int, DashboardFile]]) -> List[Digest]:
+    """Digests for one batch of users from four set-based queries, however large the batch."""
+    user_ids = [r.id for r in recipients]
+    until = now + timedelta(hours=settings.DIGEST_PERIOD_HOURS)
+    limit = settings.DIGEST_ITEMS_PER_SECTION
+
+    unread = _unread_counts(db, user_ids)
+    tasks = _due_tasks(db, user_ids, until, limit)
+    meetings = _upcoming_meetings(db, user_ids, now, until, limit)
+
+    digests = []
+    for user_id, email, name in recipients:
+        due, due_total = tasks.get(user_id, ([], 0))
+        upcoming, upcoming_total = meetings.get(user_id, ([], 0))
+        digests.append(Digest(
+            user_id=user_id,
+            email=email,
+            name=name,
+            unread_messages=unread.get(user_id, 0),
+            due_tasks=due,
+            due_tasks_total=due_total,
+            upcoming_meetings=upcoming,
+            upcoming_meetings_total=upcoming_total,
+            # Other people's uploads only
+            new_files=[f for owner_id, f in new_files if owner_id != user_id][:limit],
+        ))
+    return digests
+
+def render(digest: Digest) -> Tuple[str, str]:
+    lines = [f"Hi {digest.name or digest.email},", ""]
+    if digest.unread_messages:
+        lines.append(f"You have {digest.unread_messages} unread message(s).")
+        lines.append("")
+    if digest.due_tasks:
+        lines.append(f"Tasks due ({digest.due_tasks_total}):")
+        lines += [f"  - {t.title} [{t.priority}] due {t.end_date:%a %d %b %H:%M}" for t in digest.due_tasks]
+        lines.append("")
+    if digest.upcoming_meetings:
+        lines.append(f"Upcoming meetings ({digest.upcoming_meetings_total}):")
+        lines += [f"  - {m.title} at {m.start_time:%a %d %b %H:%M}" for m in digest.upcoming_meetings]
+        lines.append("")
+    if digest.new_files:
+        lines.append("New files:")
+        lines += [f"  - {f.title or f.filename}" for f in digest.new_files]
+        lines.append("")
+    subject = f"Your Collabryta summary: {digest.unread_messages} unread, {digest.due_tasks_total} tasks due"
+    return subject, "\n".join(lines)
+
+def send_digests(db: Session, sender: DigestSender, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> DigestReport:
+    """Streams opted-in users in batches and sends each a digest; memory stays bounded by the batch size."""
+    now = now or datetime.now(timezone.utc)
+    report = DigestReport()
+    since = now - timedelta(hours=settings.DIGEST_PERIOD_HOURS)
+    new_files = _new_files(db, since, settings.DIGEST_ITEMS_PER_SECTION)
+
+    for batch in iter_recipients(db, batch_size or settings.DIGEST_BATCH_SIZE):
+        for digest in build_digests(db, batch, now, new_files):
+            report.users += 1
+            if digest.is_empty():
+                report.skipped += 1
+                continue
+            sender.send(digest.email, *render(digest))
+            report.sent += 1
+    return report
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List
+from sqlalchemy.orm import Session
+from sqlalchemy import select, or_
+from app.models.file import File
+from app.models.meeting import Meeting, meeting_participants
+from app.models.message import Message, ChatParticipant
+from app.models.task import Task
+from app.services import archive_service
+
+# Rows fetched per server-side cursor round trip; each batch becomes one output chunk
+BATCH_SIZE = 1000
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _messages_query(user_id: int):
+    return select(
+        Message.id, Message.chat_id, Message.sender_id, Message.content,
+        Message.timestamp, Message.is_read
+    ).join(
+        ChatParticipant, ChatParticipant.chat_id == Message.chat_id
+    ).where(ChatParticipant.user_id == user_id).order_by(Message.id)
+
+def _tasks_query(user_id: int):
+    return select(
+        Task.id, Task.title, Task.description, Task.status, Task.priority,
+        Task.start_date, Task.end_date, Task.owner_id, Task.assigned_to_id,
+        Task.created_at, Task.updated_at
+    ).where(or_(Task.owner_id == user_id, Task.assigned_to_id == user_id)).order_by(Task.id)
+
+def _meetings_query(user_id: int):
+    attending = select(meeting_participants.c.meeting_id).where(meeting_participants.c.user_id == user_id)
+    return select(
+        Meeting.id, Meeting.title, Meeting.description, Meeting.start_time, Meeting.end_time,
+        Meeting.location, Meeting.meeting_link, Meeting.host_id
+    ).where(or_(Meeting.host_id == user_id, Meeting.id.in_(attending))).order_by(Meeting.id)
+
+def _files_query(user_id: int):
+    return select(
+        File.id, File.title, File.description, File.filename, File.file_path,
+        File.file_type, File.file_size_bytes, File.uploaded_at, File.owner_id
+    ).where(File.owner_id == user_id).order_by(File.id)
+
+EXPORTS = {
+    "messages": _messages_query,
+    "tasks": _tasks_query,
+    "meetings": _meetings_query,
+    "files": _files_query,
+}
+
+def iter_batches(db: Session, kind: str, user_id: int) -> Iterator[List[Dict[str, Any]]]:
+    """Streams the user's rows of one kind from a server-side cursor, BATCH_SIZE at a time.
+
+    Archived messages come first, a segment per batch, then the hot table's.
+    """
+    if kind == "messages":
+        yield from archive_service.export_batches(db, user_id)
+    query = EXPORTS[kind](user_id).execution_options(yield_per=BATCH_SIZE)
+    result = db.execute(query).mappings()
+    for partition in result.partitions():
+        yield partition
+
+def columns(kind: str) -> List[str]:
+    return [c.name for c in EXPORTS[kind](0).selected_columns]
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def encode_ndjson(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in batch).encode("utf-8")
+
+def encode_csv(batches: Iterable[List[Dict[str, Any]]], fieldnames: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    yield buffer.getvalue().encode("utf-8")
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[name]) for name in fieldnames] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresses a byte stream incrementally into gzip framing."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export(db: Session, kind: str, user_id: int, fmt: str = "ndjson", gzip: bool = False) -> Iterator[bytes]:
+    """Returns a lazy byte stream of the user's data; nothing is read until it is iterated."""
+    batches = iter_batches(db, kind, user_id)
+    if fmt == "csv":
+        chunks = encode_csv(batches, columns(kind))
+    else:
+        chunks = encode_ndjson(batches)
+    return gzip_chunks(chunks) if gzip else chunks
@@ -1,52 +1,49 @@
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
-import aiofiles
+from starlette.concurrency import run_in_threadpool
 import os
 
 from datetime import datetime
+from app.core import storage, tracing
 from app.models.file import File
 from app.schemas.file import FileCreate
+from app.services import dashboard_service, preview_service, sync_service
 
-UPLOAD_DIR = "app/static/uploads"
 
-# Ensure directory exists
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-
-async def upload_file(db: Session, file: UploadFile, title: str, description: str, user_id: int):
-    # Create a unique filename to prevent overwrites (simple timestamp prefix)
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    clean_filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, clean_filename)
-
-    # Save physical file
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await file.read()  # async read
-        await out_file.write(content)
-        
-    file_size = len(content)
-
-    # Determine file type
+def detect_file_type(filename: str) -> str:
     # You might want a better mime-type check, but extension is a simple start
-    ext = os.path.splitext(clean_filename)[1].lower()
+    ext = os.path.splitext(filename)[1].lower()
     ftype = "Unknown"
     if ext in ['.pdf']: ftype = "PDF"
     elif ext in ['.xlsx', '.xls', '.csv']: ftype = "Spreadsheet"
     elif ext in ['.jpg', '.jpeg', '.png', '.svg']: ftype = "Image"
     elif ext in ['.mp4', '.mov']: ftype = "Video"
-    
+    return ftype
+
+
+def stored_filename(filename: str) -> str:
+    # Create a unique filename to prevent overwrites (simple timestamp prefix)
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"{timestamp}_{filename}"
+
+
+async def create_file_record(db: Session, key: str, file_size: int, title: str, description: str, user_id: int):
+    """Registers a file already in storage under key and tells its owner; shared by both upload paths."""
     db_file = File(
-        filename=clean_filename,
-        file_path=file_path,
-        file_type=ftype,
+        filename=key,
+        file_path=storage.backend.locate(key),
+        file_type=detect_file_type(key),
         file_size_bytes=file_size,
         title=title,
         description=description,
-        owner_id=user_id
+        owner_id=user_id,
+        preview_status=preview_service.PENDING
     )
     db.add(db_file)
+    db.flush()
+    sync_service.record_change(db, "file", db_file.id, [user_id])
     db.commit()
-    db.refresh(db_file)
+    dashboard_service.invalidate_summary(user_id)
     
     from app.services import notification_service
     from app.schemas.notification import NotificationCreate
@@ -60,6 +57,20 @@ async def upload_file(db: Session, file: UploadFile, title: str, description: st
 
     return db_file
 
+
+async def upload_file(db: Session, file: UploadFile, title: str, description: str, user_id: int):
+    key = stored_filename(os.path.basename(file.filename))
+
+    # Streamed from the spooled upload; S3 sends large files as parallel parts
+    with tracing.span("storage.save", {"storage.backend": type(storage.backend).__name__, "storage.key": key}) as span:
+        file_size = await run_in_threadpool(storage.backend.save, key, file.file)
+        span.set_attribute("storage.bytes", file_size)
+
+    return await create_file_record(db, key, file_size, title, description, user_id)
+
+def get_file(db: Session, file_id: int):
+    return db.query(File).filter(File.id == file_id).first()
+
 def get_files(db: Session, skip: int = 0, limit: int = 100):
     return db.query(File).offset(skip).limit(limit).all()
 
@@ -0,0 +1,220 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, func, insert, select, text
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.imports import ImportReport, ImportRowError
+from app.schemas.notification import NotificationCreate
+from app.schemas.task import TaskCreate
+from app.schemas.user import UserCreate
+from app.services import dashboard_service, notification_service, sync_service, user_service
+
+BATCH_SIZE = 1000
+
+def read_rows(stream: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yields (row number, raw record) pairs from a CSV or NDJSON text stream without buffering it."""
+    if fmt == "csv":
+        for number, record in enumerate(csv.DictReader(stream), start=1):
+            # Empty CSV cells mean "not provided"
+            yield number, {k: v for k, v in record.items() if v not in ("", None)}
+    else:
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, e
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+def _batches(rows: Iterable, size: int = BATCH_SIZE) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _error(number: int, exc: Exception) -> ImportRowError:
+    if isinstance(exc, ValidationError):
+        message = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors())
+    else:
+        message = str(exc)
+    return ImportRowError(row=number, error=message)
+
+def _column_row(table: Table, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps only real columns and fills Python-side defaults, which COPY would not apply."""
+    row = {}
+    for column in table.columns:
+        if column.name in data:
+            row[column.name] = data[column.name]
+        elif column.default is not None and not column.primary_key:
+            default = column.default
+            if default.is_callable:
+                row[column.name] = default.arg(None)
+            elif default.is_scalar:
+                row[column.name] = default.arg
+    return row
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    elif hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def _allocate_ids(db: Session, table: Table, count: int) -> List[int]:
+    """Reserves primary keys from the table's sequence so COPY-loaded rows have known ids."""
+    result = db.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+        {"table": table.name, "n": count}
+    )
+    return [row[0] for row in result]
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """Loads rows with COPY on Postgres or a single executemany elsewhere; returns the new ids in order."""
+    if not rows:
+        return []
+    table = model.__table__
+    rows = [_column_row(table, row) for row in rows]
+
+    if db.get_bind().dialect.name == "postgresql":
+        ids = _allocate_ids(db, table, len(rows))
+        names = ["id"] + [c.name for c in table.columns if c.name != "id" and c.name in rows[0]]
+        buffer = io.StringIO()
+        for new_id, row in zip(ids, rows):
+            row["id"] = new_id
+            buffer.write("\t".join(_copy_value(row.get(name)) for name in names) + "\n")
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(names)}) FROM STDIN", buffer)
+        return ids
+
+    result = db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+    return [row[0] for row in result]
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    # bcrypt releases the GIL, so a thread pool hashes on every core
+    workers = settings.IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(get_password_hash, passwords))
+
+def import_users(db: Session, rows: Iterable[Tuple[int, Any]]) -> ImportReport:
+    """Validates, hashes and loads users batch by batch, committing each batch."""
+    report = ImportReport()
+    seen_emails = set()
+
+    for batch in _batches(rows):
+        valid: List[Tuple[int, UserCreate]] = []
+        for number, record in batch:
+            report.total += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                user_in = UserCreate.model_validate(record)
+            except (ValidationError, ValueError) as e:
+                report.errors.append(_error(number, e))
+                continue
+            email = user_in.email.lower()
+            if email in seen_emails:
+                report.errors.append(ImportRowError(row=number, error="Duplicate email in import"))
+                continue
+            seen_emails.add(email)
+            valid.append((number, user_in))
+
+        # One lookup per batch for addresses that already have accounts, in any letter case
+        existing = set(db.scalars(
+            select(func.lower(User.email)).where(func.lower(User.email).in_([u.email.lower() for _, u in valid]))
+        ))
+        pending = []
+        for number, user_in in valid:
+            if user_in.email.lower() in existing:
+                report.errors.append(ImportRowError(row=number, error="The user with this email already exists"))
+            else:
+                pending.append(user_in)
+
+        hashes = _hash_passwords([u.password for u in pending])
+        rows_out = [
+            {**u.model_dump(exclude={"password"}), "hashed_password": hashed}
+            for u, hashed in zip(pending, hashes)
+        ]
+        bulk_insert(db, User, rows_out)
+        db.commit()
+        report.imported += len(rows_out)
+
+    if report.imported:
+        user_service.invalidate_directory()
+    report.errors.sort(key=lambda e: e.row)
+    return report
+
+def import_tasks(db: Session, rows: Iterable[Tuple[int, Any]], owner_id: int) -> ImportReport:
+    """Validates and loads tasks owned by owner_id, with one summary notification per assignee per batch."""
+    report = ImportReport()
+
+    for batch in _batches(rows):
+        valid: List[Tuple[int, TaskCreate]] = []
+        for number, record in batch:
+            report.total += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                valid.append((number, TaskCreate.model_validate(record)))
+            except (ValidationError, ValueError) as e:
+                report.errors.append(_error(number, e))
+
+        assignee_ids = {t.assigned_to_id for _, t in valid if t.assigned_to_id}
+        known = set(db.scalars(select(User.id).where(User.id.in_(assignee_ids)))) if assignee_ids else set()
+
+        pending: List[Dict[str, Any]] = []
+        for number, task_in in valid:
+            if task_in.assigned_to_id and task_in.assigned_to_id not in known:
+                report.errors.append(ImportRowError(row=number, error=f"Unknown assignee {task_in.assigned_to_id}"))
+                continue
+            data = task_in.model_dump()
+            data["owner_id"] = owner_id
+            data["assigned_to_id"] = data["assigned_to_id"] or owner_id
+            pending.append(data)
+
+        ids = bulk_insert(db, Task, pending)
+
+        by_assignee: Dict[int, List[int]] = {}
+        for task_id, data in zip(ids, pending):
+            by_assignee.setdefault(data["assigned_to_id"], []).append(task_id)
+
+        notifications = []
+        for assignee_id, task_ids in by_assignee.items():
+            sync_service.record_changes(db, "task", task_ids, [owner_id, assignee_id])
+            notifications.append(NotificationCreate(
+                user_id=assignee_id,
+                title="New Tasks Assigned",
+                description=f"{len(task_ids)} task(s) have been assigned to you.",
+                type="info"
+            ))
+        notification_service.create_notifications(db, notifications)
+
+        db.commit()
+        dashboard_service.invalidate_summary(owner_id, *by_assignee)
+        report.imported += len(pending)
+
+    report.errors.sort(key=lambda e: e.row)
+    return report
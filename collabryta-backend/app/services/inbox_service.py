@@ -0,0 +1,103 @@
+"""The per-participant conversation list (chat_inbox), maintained on write.
+
+Every function that changes it writes inside the caller's transaction;
+the caller's commit makes the change visible together with the message
+or read marker that caused it.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import case, delete, func, insert, tuple_, update
+from sqlalchemy.orm import Session
+from app.models.message import Chat, ChatInbox, ChatParticipant, Message
+from app.services import archive_service
+
+# Characters of the last message kept for the conversation list
+PREVIEW_LENGTH = 200
+
+def _preview(content: str) -> str:
+    return content[:PREVIEW_LENGTH]
+
+def add_chat(db: Session, chat_id: int, user_ids: Iterable[int], created_at: datetime) -> None:
+    """Inbox rows for a new chat; it sorts by its creation time until the first message."""
+    rows = [{"user_id": user_id, "chat_id": chat_id, "last_activity": created_at, "unread_count": 0} for user_id in set(user_ids)]
+    if rows:
+        db.execute(insert(ChatInbox), rows)
+
+def record_message(db: Session, message: Message) -> None:
+    """Moves the chat to the top of every participant's inbox and counts the message as unread for all but the sender."""
+    db.execute(update(ChatInbox).where(ChatInbox.chat_id == message.chat_id).values(
+        last_message_id=message.id,
+        last_message_preview=_preview(message.content),
+        last_activity=message.timestamp,
+        unread_count=ChatInbox.unread_count + case((ChatInbox.user_id != message.sender_id, 1), else_=0),
+    ).execution_options(synchronize_session=False))
+
+def record_read(db: Session, chat_id: int, reader_id: int) -> None:
+    """Updates unread counts after mark_chat_as_read.
+
+    is_read is shared by the chat, so once the reader has read everything
+    the only unread messages left are the reader's own, and those are
+    unread for every other participant.
+    """
+    remaining = db.query(func.count(Message.id)).filter(
+        Message.chat_id == chat_id, Message.is_read == False
+    ).scalar_subquery()
+    db.execute(update(ChatInbox).where(ChatInbox.chat_id == chat_id).values(
+        unread_count=case((ChatInbox.user_id == reader_id, 0), else_=remaining)
+    ).execution_options(synchronize_session=False))
+
+def remove_chat(db: Session, chat_id: int) -> None:
+    db.execute(delete(ChatInbox).where(ChatInbox.chat_id == chat_id))
+
+def remove_member(db: Session, chat_id: int, user_id: int) -> None:
+    db.execute(delete(ChatInbox).where(ChatInbox.chat_id == chat_id, ChatInbox.user_id == user_id))
+
+def page(db: Session, user_id: int, limit: Optional[int] = None, before: Optional[datetime] = None, before_id: Optional[int] = None) -> List:
+    """Inbox rows with their chat's name and kind, most recent activity first.
+
+    (before, before_id) is the last row of the previous page: its
+    last_activity and chat id.
+    """
+    query = db.query(ChatInbox, Chat.name, Chat.is_group).join(Chat, Chat.id == ChatInbox.chat_id).filter(
+        ChatInbox.user_id == user_id
+    )
+    if before is not None and before_id is not None:
+        query = query.filter(tuple_(ChatInbox.last_activity, ChatInbox.chat_id) < (before, before_id))
+    elif before is not None:
+        query = query.filter(ChatInbox.last_activity < before)
+    return query.order_by(ChatInbox.last_activity.desc(), ChatInbox.chat_id.desc()).limit(limit).all()
+
+def rebuild(db: Session, chat_ids: Optional[Iterable[int]] = None) -> int:
+    """Recomputes inbox rows from the messages themselves, one chat per transaction.
+
+    Fills the table for chats created before it existed, and repairs chats
+    whose history was rewritten (a purged user's messages removed).
+    """
+    query = db.query(Chat.id, Chat.created_at, Chat.archived_through)
+    if chat_ids is not None:
+        query = query.filter(Chat.id.in_(list(chat_ids)))
+    chats = query.order_by(Chat.id).all()
+    for chat in chats:
+        last = db.query(Message.id, Message.content, Message.timestamp).filter(
+            Message.chat_id == chat.id
+        ).order_by(Message.id.desc()).first()
+        if last is None and chat.archived_through is not None:
+            last = archive_service.last_message(db, chat.id)
+        unread_by_sender = dict(db.query(Message.sender_id, func.count(Message.id)).filter(
+            Message.chat_id == chat.id, Message.is_read == False
+        ).group_by(Message.sender_id).all())
+        unread = sum(unread_by_sender.values())
+        user_ids = [row.user_id for row in db.query(ChatParticipant.user_id).filter(ChatParticipant.chat_id == chat.id)]
+
+        remove_chat(db, chat.id)
+        if user_ids:
+            db.execute(insert(ChatInbox), [{
+                "user_id": user_id,
+                "chat_id": chat.id,
+                "last_message_id": last.id if last else None,
+                "last_message_preview": _preview(last.content) if last else None,
+                "last_activity": last.timestamp if last else chat.created_at,
+                "unread_count": unread - unread_by_sender.get(user_id, 0),
+            } for user_id in user_ids])
+        db.commit()
+    return len(chats)
@@ -1,17 +1,18 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import delete, or_
 from app.models.meeting import Meeting
 from app.models.user import User
 from app.schemas.meeting import MeetingCreate, MeetingUpdate
+from app.services import dashboard_service, sync_service
 
-def get_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
-    return db.query(Meeting).filter(Meeting.id == meeting_id).first()
+def get_meeting(db: Session, meeting_id: int, options: Sequence = ()) -> Optional[Meeting]:
+    return db.get(Meeting, meeting_id, options=options)
 
-def get_user_meetings(db: Session, user_id: int, recent_only: bool = False) -> List[Meeting]:
+def get_user_meetings(db: Session, user_id: int, recent_only: bool = False, options: Sequence = ()) -> List[Meeting]:
     # Return meetings where user is host OR participant
-    query = db.query(Meeting).filter(
+    query = db.query(Meeting).options(*options).filter(
         or_(
             Meeting.host_id == user_id,
             Meeting.participants.any(id=user_id)
@@ -36,17 +37,22 @@ async def create_meeting(db: Session, meeting_in: MeetingCreate, host_id: int) -
         end_time=meeting_in.end_time,
         location=meeting_in.location,
         meeting_link=meeting_in.meeting_link,
-        host_id=host_id
+        host_id=host_id,
+        # The host is normally the request's current user, already in the identity map
+        host=db.get(User, host_id)
     )
     
     # 2. Add participants
+    participants = []
     if meeting_in.participant_ids:
         participants = db.query(User).filter(User.id.in_(meeting_in.participant_ids)).all()
-        db_meeting.participants = participants
+    db_meeting.participants = participants
         
     db.add(db_meeting)
+    db.flush()
+    sync_service.record_change(db, "meeting", db_meeting.id, [host_id, *[p.id for p in db_meeting.participants]])
     db.commit()
-    db.refresh(db_meeting)
+    dashboard_service.invalidate_summary(host_id, *[p.id for p in db_meeting.participants])
     
     # Notify Host
     from app.services import notification_service
@@ -74,6 +80,10 @@ async def create_meeting(db: Session, meeting_in: MeetingCreate, host_id: int) -
 def delete_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
     meeting = get_meeting(db, meeting_id)
     if meeting:
-        db.delete(meeting)
+        affected = [meeting.host_id, *[p.id for p in meeting.participants]]
+        # One statement: ON DELETE CASCADE clears the participant links db.delete() would remove row by row
+        db.execute(delete(Meeting).where(Meeting.id == meeting.id))
+        sync_service.record_change(db, "meeting", meeting.id, affected, op=sync_service.DELETE)
         db.commit()
+        dashboard_service.invalidate_summary(*affected)
     return meeting
@@ -1,67 +1,117 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
-from app.models.message import Message, Chat, ChatParticipant
+import re
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import desc, insert
+from app.models.message import Message, Chat, ChatParticipant, MessageMention
 from app.models.user import User
 from app.schemas.message import ChatCreate
-from typing import List, Optional
+from app.services import archive_service, dashboard_service, inbox_service, purge_service, sync_service
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 from datetime import datetime
 
-def get_user_chats(db: Session, user_id: int) -> List[dict]:
-    """Retrieves all conversations for a specific user with last message and unread count."""
-    user_chats = db.query(Chat).join(ChatParticipant).filter(ChatParticipant.user_id == user_id).all()
-    
+# @jane, @jane.doe, @JaneDoe or a full @jane@example.com; not the middle of an email address
+MENTION_PATTERN = re.compile(r"(?<![\w.@])@([\w][\w.+-]*(?:@[\w-]+(?:\.[\w-]+)+)?)")
+
+def get_user_chats(
+    db: Session, user_id: int, limit: Optional[int] = None, before: Optional[datetime] = None, before_id: Optional[int] = None
+) -> List[dict]:
+    """Retrieves a user's conversations, most recent activity first, with last message and unread count.
+
+    Reads the maintained inbox, so a page costs one range scan plus one
+    query for the other party of direct chats.
+    """
+    rows = inbox_service.page(db, user_id, limit=limit, before=before, before_id=before_id)
+
+    others: Dict[int, User] = {}
+    direct = [row.ChatInbox.chat_id for row in rows if not row.is_group]
+    if direct:
+        for chat_id, other_user in db.query(ChatParticipant.chat_id, User).join(User, User.id == ChatParticipant.user_id).filter(
+            ChatParticipant.chat_id.in_(direct), ChatParticipant.user_id != user_id
+        ):
+            others.setdefault(chat_id, other_user)
+
     results = []
-    for chat in user_chats:
-        last_msg = db.query(Message).filter(Message.chat_id == chat.id).order_by(Message.timestamp.desc()).first()
-        
+    for entry, name, is_group in rows:
         info = {
-            "id": chat.id,
-            "is_group": chat.is_group,
-            "last_message": last_msg.content if last_msg else None,
-            "last_message_time": last_msg.timestamp if last_msg else None,
-            "unread_count": db.query(Message).filter(
-                Message.chat_id == chat.id, 
-                Message.sender_id != user_id, 
-                Message.is_read == False
-            ).count()
+            "id": entry.chat_id,
+            "is_group": is_group,
+            "last_message": entry.last_message_preview,
+            "last_message_time": entry.last_activity if entry.last_message_id is not None else None,
+            "last_activity": entry.last_activity,
+            "unread_count": entry.unread_count,
         }
 
-        if chat.is_group:
-            info["name"] = chat.name or "Group Chat"
+        if is_group:
+            info["name"] = name or "Group Chat"
             info["status"] = "group"
             info["other_user_id"] = None
+        elif entry.chat_id in others:
+            other_user = others[entry.chat_id]
+            info["name"] = other_user.name
+            info["status"] = "online" if other_user.is_active else "offline"
+            info["other_user_id"] = other_user.id
         else:
-            other_part = db.query(ChatParticipant).filter(
-                ChatParticipant.chat_id == chat.id, 
-                ChatParticipant.user_id != user_id
-            ).first()
-            
-            if other_part:
-                other_user = db.query(User).filter(User.id == other_part.user_id).first()
-                if other_user:
-                    info["name"] = other_user.name
-                    info["status"] = "online" if other_user.is_active else "offline"
-                    info["other_user_id"] = other_user.id
-                else:
-                    info.update({"name": "Unknown", "status": "offline", "other_user_id": None})
-            else:
-                 info.update({"name": "Me", "status": "online", "other_user_id": user_id})
+            info.update({"name": "Me", "status": "online", "other_user_id": user_id})
 
         results.append(info)
-    
-    results.sort(key=lambda x: x['last_message_time'] or datetime.min, reverse=True)
     return results
 
-def get_chat_messages(db: Session, chat_id: int, user_id: int) -> List[Message]:
-    """Retrieves all messages for a specific chat if the user is a participant."""
-    is_member = db.query(ChatParticipant).filter(
+def is_chat_member(db: Session, chat_id: int, user_id: int) -> bool:
+    return db.query(ChatParticipant).filter(
+        ChatParticipant.chat_id == chat_id, ChatParticipant.user_id == user_id
+    ).first() is not None
+
+def can_delete_chat(db: Session, chat_id: int, user_id: int) -> bool:
+    """Direct chats can be deleted by either side; group chats by their creator, or by any member once the creator is gone."""
+    chat = db.query(Chat.is_group, Chat.creator_id).filter(Chat.id == chat_id).first()
+    return chat is not None and (not chat.is_group or chat.creator_id in (None, user_id))
+
+def leave_chat(db: Session, chat_id: int, user_id: int) -> bool:
+    """Removes one member from a group chat; the chat and its history stay with everyone else.
+
+    Returns True when the last member left: the chat is then detached like
+    a deleted one, and the caller schedules purge_service.purge_chat.
+    """
+    db.query(ChatParticipant).filter(
+        ChatParticipant.chat_id == chat_id, ChatParticipant.user_id == user_id
+    ).delete(synchronize_session=False)
+    inbox_service.remove_member(db, chat_id, user_id)
+    remaining = [row.user_id for row in db.query(ChatParticipant.user_id).filter(ChatParticipant.chat_id == chat_id)]
+    sync_service.record_change(db, "chat", chat_id, [user_id], op=sync_service.DELETE)
+    if remaining:
+        sync_service.record_change(db, "chat", chat_id, remaining)
+        db.commit()
+    else:
+        purge_service.detach_chat(db, chat_id)
+    dashboard_service.invalidate_summary(user_id)
+    return not remaining
+
+def get_chat_messages(
+    db: Session, chat_id: int, user_id: int, before: Optional[int] = None, limit: Optional[int] = None
+) -> List[Union[Message, archive_service.ArchivedMessage]]:
+    """Retrieves a page of a chat's messages, oldest first, if the user is a participant.
+
+    The page holds the `limit` newest messages with ids below `before`
+    (all of them when limit is None). When the hot table runs out, the
+    rest of the page comes from the chat's archive.
+    """
+    membership = db.query(Chat.archived_through).select_from(Chat).join(ChatParticipant).filter(
         ChatParticipant.chat_id == chat_id, ChatParticipant.user_id == user_id
     ).first()
     
-    if not is_member:
+    if not membership:
         return [] 
-        
-    return db.query(Message).options(joinedload(Message.sender)).filter(Message.chat_id == chat_id).order_by(Message.timestamp).all()
+
+    query = db.query(Message).options(joinedload(Message.sender)).filter(Message.chat_id == chat_id)
+    if before is not None:
+        query = query.filter(Message.id < before)
+    page: list = query.order_by(Message.id.desc()).limit(limit).all()
+
+    if membership.archived_through is not None and (limit is None or len(page) < limit):
+        page += archive_service.read_messages(
+            db, chat_id, before=page[-1].id if page else before, limit=None if limit is None else limit - len(page)
+        )
+    page.reverse()
+    return page
 
 def create_chat(db: Session, chat_in: ChatCreate, creator_id: int) -> Chat:
     """Creates a new group or P2P chat."""
@@ -78,55 +128,115 @@ def create_chat(db: Session, chat_in: ChatCreate, creator_id: int) -> Chat:
         ).first()
         
         if existing:
-            return db.query(Chat).filter(Chat.id == existing.chat_id).first()
+            return db.query(Chat).options(selectinload(Chat.participants)).filter(Chat.id == existing.chat_id).first()
 
-    db_chat = Chat(name=chat_in.name, is_group=chat_in.is_group)
-    db.add(db_chat)
-    db.commit()
-    db.refresh(db_chat)
-    
     p_ids = set(chat_in.participant_ids)
     p_ids.add(creator_id)
-    
-    for pid in p_ids:
-        part = ChatParticipant(chat_id=db_chat.id, user_id=pid)
-        db.add(part)
-    
+    participants = db.query(User).filter(User.id.in_(p_ids)).all()
+
+    # Chat row and participant links go out in a single flush
+    db_chat = Chat(name=chat_in.name, is_group=chat_in.is_group, creator_id=creator_id, participants=participants)
+    db.add(db_chat)
+    db.flush()
+    inbox_service.add_chat(db, db_chat.id, [p.id for p in participants], db_chat.created_at)
+    sync_service.record_change(db, "chat", db_chat.id, [p.id for p in participants])
     db.commit()
-    db.refresh(db_chat)
     return db_chat
 
 
 
+def extract_mentions(content: str) -> Set[str]:
+    """Lower-cased @handles in the text, trailing punctuation dropped."""
+    return {match.rstrip(".-").lower() for match in MENTION_PATTERN.findall(content)}
+
+def resolve_mentions(handles: Set[str], users: Iterable[Tuple[int, str, Optional[str]]]) -> Set[int]:
+    """Matches handles to chat members by email, email name, name without spaces or first name.
+
+    A handle that fits more than one member (two Alexes) mentions nobody.
+    """
+    aliases: Dict[str, Set[int]] = {}
+    for user_id, email, name in users:
+        names = {email.lower(), email.split("@")[0].lower()}
+        if name:
+            names |= {name.replace(" ", "").lower(), name.split()[0].lower()}
+        for alias in names:
+            aliases.setdefault(alias, set()).add(user_id)
+    return {next(iter(aliases[h])) for h in handles if len(aliases.get(h, ())) == 1}
+
+def get_mentions(
+    db: Session, user_id: int, before: Optional[int] = None, limit: int = 50, options=()
+) -> List[Union[Message, archive_service.ArchivedMessage]]:
+    """Messages mentioning the user, newest first; `before` is the last message id of the previous page.
+
+    The page is one range scan of the mention index; mentioned messages
+    that were archived come back from their segments.
+    """
+    query = db.query(MessageMention.message_id, MessageMention.chat_id, Message).outerjoin(
+        Message, Message.id == MessageMention.message_id
+    ).options(*options).filter(MessageMention.user_id == user_id)
+    if before is not None:
+        query = query.filter(MessageMention.message_id < before)
+    rows = query.order_by(MessageMention.message_id.desc()).limit(limit).all()
+
+    archived = archive_service.get_messages(db, [(row.chat_id, row.message_id) for row in rows if row.Message is None])
+    return [row.Message or archived[row.message_id] for row in rows if row.Message is not None or row.message_id in archived]
+
 async def create_message(db: Session, chat_id: int, content: str, sender_id: int) -> Optional[Message]:
     """Sends a new message to a chat."""
-    is_member = db.query(ChatParticipant).filter(
-        ChatParticipant.chat_id == chat_id, ChatParticipant.user_id == sender_id
-    ).first()
+    participants = db.query(ChatParticipant).filter(ChatParticipant.chat_id == chat_id).all()
     
-    if not is_member:
+    if not any(part.user_id == sender_id for part in participants):
          return None
 
-    msg = Message(chat_id=chat_id, sender_id=sender_id, content=content)
+    # The sender is normally the request's current user, already in the identity map
+    sender = db.get(User, sender_id)
+
+    mentioned: Set[int] = set()
+    handles = extract_mentions(content)
+    if handles:
+        members = db.query(User.id, User.email, User.name).filter(
+            User.id.in_([part.user_id for part in participants if part.user_id != sender_id])
+        ).all()
+        mentioned = resolve_mentions(handles, members)
+
+    msg = Message(chat_id=chat_id, sender_id=sender_id, content=content, sender=sender)
     db.add(msg)
+    db.flush()
+    if mentioned:
+        db.execute(insert(MessageMention), [
+            {"user_id": user_id, "message_id": msg.id, "chat_id": chat_id} for user_id in mentioned
+        ])
+    inbox_service.record_message(db, msg)
+    sync_service.record_change(db, "message", msg.id, [part.user_id for part in participants])
     db.commit()
-    db.refresh(msg)
+    dashboard_service.invalidate_summary(*[part.user_id for part in participants])
     
     # Notify Participants
     from app.services import notification_service
     from app.schemas.notification import NotificationCreate
     
-    sender = db.query(User).filter(User.id == sender_id).first()
     sender_name = sender.name if sender else "Someone"
+    preview = content[:50] + ("..." if len(content) > 50 else "")
     
-    participants = db.query(ChatParticipant).filter(ChatParticipant.chat_id == chat_id).all()
     for part in participants:
-        if part.user_id != sender_id:
+        if part.user_id in mentioned:
+            # Separate source type, so mentions never coalesce into the chat's "new message" row
+            await notification_service.create_notification(db, NotificationCreate(
+                user_id=part.user_id,
+                title=f"{sender_name} mentioned you",
+                description=preview,
+                type="info",
+                source_type="mention",
+                source_id=chat_id
+            ))
+        elif part.user_id != sender_id:
             await notification_service.create_notification(db, NotificationCreate(
                 user_id=part.user_id,
                 title=f"New Message from {sender_name}",
-                description=content[:50] + ("..." if len(content) > 50 else ""),
-                type="info"
+                description=preview,
+                type="info",
+                source_type="chat",
+                source_id=chat_id
             ))
     
     return msg
@@ -140,11 +250,19 @@ def mark_chat_as_read(db: Session, chat_id: int, user_id: int) -> bool:
     if not is_member:
          return False
 
-    db.query(Message).filter(
+    unread_ids = [row.id for row in db.query(Message.id).filter(
         Message.chat_id == chat_id,
         Message.sender_id != user_id,
         Message.is_read == False
-    ).update({Message.is_read: True})
+    )]
+    
+    if unread_ids:
+        db.query(Message).filter(Message.id.in_(unread_ids)).update({Message.is_read: True})
+        # is_read is shared by every participant, so they all see the change
+        participant_ids = [row.user_id for row in db.query(ChatParticipant.user_id).filter(ChatParticipant.chat_id == chat_id)]
+        sync_service.record_changes(db, "message", unread_ids, participant_ids)
+        inbox_service.record_read(db, chat_id, user_id)
+        db.commit()
+        dashboard_service.invalidate_summary(*participant_ids)
     
-    db.commit()
     return True
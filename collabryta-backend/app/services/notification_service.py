@@ -1,8 +1,11 @@
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from app.core.config import settings
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate
+from app.services import dashboard_service, sync_service
 import json
 
 def get_notifications(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Notification]:
@@ -29,21 +32,68 @@ def get_unread_count(db: Session, user_id: int) -> int:
 
 
 async def create_notification(db: Session, notification: NotificationCreate) -> Notification:
-    """Creates a new notification record."""
-    db_notification = Notification(**notification.model_dump())
-    db.add(db_notification)
+    """Creates a new notification record.
+
+    Notifications carrying a source (e.g. a chat or task) are coalesced: a repeat
+    of the same kind for the same user and source within the coalescing window
+    updates the existing row instead of inserting a new one.
+    """
+    db_notification = None
+    if notification.source_type and notification.source_id is not None:
+        db_notification = _find_coalescable(db, notification)
+
+    if db_notification:
+        # Restart the counter if the user has already seen the earlier events
+        db_notification.count = 1 if db_notification.is_read else (db_notification.count or 1) + 1
+        db_notification.is_read = False
+        db_notification.title = notification.title
+        db_notification.description = notification.description
+        db_notification.created_at = datetime.now(timezone.utc)
+    else:
+        db_notification = Notification(**notification.model_dump())
+        db.add(db_notification)
+    db.flush()
+    sync_service.record_change(db, "notification", db_notification.id, [db_notification.user_id])
     db.commit()
-    db.refresh(db_notification)
+    dashboard_service.invalidate_summary(db_notification.user_id)
     
     return db_notification
 
+def create_notifications(db: Session, notifications: List[NotificationCreate]) -> List[int]:
+    """Inserts many notifications with one statement, without coalescing or committing.
+
+    The caller commits and then invalidates the recipients' dashboard summaries.
+    """
+    if not notifications:
+        return []
+    rows = [n.model_dump() for n in notifications]
+    result = db.execute(
+        insert(Notification).returning(Notification.id, sort_by_parameter_order=True), rows
+    )
+    ids = [row.id for row in result]
+    sync_service.record_change_map(db, "notification", {
+        notification_id: [row["user_id"]] for notification_id, row in zip(ids, rows)
+    })
+    return ids
+
+def _find_coalescable(db: Session, notification: NotificationCreate) -> Optional[Notification]:
+    window_start = datetime.now(timezone.utc) - timedelta(minutes=settings.NOTIFICATION_COALESCE_WINDOW_MINUTES)
+    return db.query(Notification).filter(
+        Notification.user_id == notification.user_id,
+        Notification.source_type == notification.source_type,
+        Notification.source_id == notification.source_id,
+        Notification.type == notification.type,
+        Notification.created_at >= window_start
+    ).order_by(Notification.created_at.desc()).first()
+
 def mark_as_read(db: Session, notification_id: int) -> Optional[Notification]:
     """Marks a single notification as read."""
     notification = db.query(Notification).filter(Notification.id == notification_id).first()
     if notification:
         notification.is_read = True
+        sync_service.record_change(db, "notification", notification.id, [notification.user_id])
         db.commit()
-        db.refresh(notification)
+        dashboard_service.invalidate_summary(notification.user_id)
     return notification
 
 def mark_all_as_read(db: Session, user_id: int) -> None:
@@ -51,9 +101,14 @@ def mark_all_as_read(db: Session, user_id: int) -> None:
     now = datetime.now(timezone.utc)
     expiration_limit = now - timedelta(hours=24)
     
-    db.query(Notification).filter(
+    unread = db.query(Notification.id).filter(
         Notification.user_id == user_id, 
         Notification.is_read == False,
         Notification.created_at >= expiration_limit
-    ).update({Notification.is_read: True})
+    )
+    unread_ids = [row.id for row in unread]
+    if unread_ids:
+        db.query(Notification).filter(Notification.id.in_(unread_ids)).update({Notification.is_read: True})
+        sync_service.record_changes(db, "notification", unread_ids, [user_id])
     db.commit()
+    dashboard_service.invalidate_summary(user_id)
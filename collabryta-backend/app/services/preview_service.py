@@ -0,0 +1,180 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import update
+from app.core import storage
+from app.core.config import settings
+from app.models.file import File
+from app.services import sync_service
+
+try:
+    from PIL import Image
+except ImportError:  # optional: no image thumbnails
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+UNAVAILABLE = "unavailable"  # no renderer for this type on this server
+FAILED = "failed"
+
+# (offset, signature, content type, file_type); first match wins
+SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", "Image"),
+    (0, b"\xff\xd8\xff", "image/jpeg", "Image"),
+    (0, b"GIF87a", "image/gif", "Image"),
+    (0, b"GIF89a", "image/gif", "Image"),
+    (0, b"%PDF-", "application/pdf", "PDF"),
+    (4, b"ftypqt", "video/quicktime", "Video"),
+    (4, b"ftyp", "video/mp4", "Video"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm", "Video"),
+]
+# Office documents are zip archives; the extension says which kind
+ZIP_TYPES = {
+    ".xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "Spreadsheet"),
+    ".docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "Unknown"),
+}
+
+class PreviewResult(NamedTuple):
+    content_type: Optional[str]
+    file_type: Optional[str]
+    preview_path: Optional[str]
+    status: str
+
+def sniff(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(content type, file_type) from the file's leading bytes, or (None, None) if unrecognised."""
+    with open(path, "rb") as f:
+        head = f.read(512)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "Image"
+    for offset, signature, content_type, file_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return content_type, file_type
+    if head.startswith(b"PK\x03\x04"):
+        return ZIP_TYPES.get(os.path.splitext(path)[1].lower(), ("application/zip", "Unknown"))
+    if b"<svg" in head.lower():
+        return "image/svg+xml", "Image"
+    return None, None
+
+def preview_key_for(key: str) -> str:
+    # Derivatives live next to the blob, so they are served and removed alongside it
+    return f"{key}.preview.jpg"
+
+def _image_thumbnail(path: str, target: str) -> None:
+    size = settings.PREVIEW_MAX_DIMENSION
+    with Image.open(path) as image:
+        image.thumbnail((size, size))
+        image.convert("RGB").save(target, "JPEG", quality=80)
+
+def _video_poster(path: str, target: str) -> None:
+    size = settings.PREVIEW_MAX_DIMENSION
+    # The thumbnail filter picks a representative frame rather than a black first one
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", path,
+         "-vf", f"thumbnail,scale='min({size},iw)':-2", "-frames:v", "1", target],
+        check=True, timeout=settings.PREVIEW_TIMEOUT_SECONDS
+    )
+
+def _pdf_first_page(path: str, target: str) -> None:
+    # pdftoppm appends the extension itself
+    subprocess.run(
+        ["pdftoppm", "-f", "1", "-l", "1", "-singlefile", "-jpeg",
+         "-scale-to", str(settings.PREVIEW_MAX_DIMENSION), path, target[:-len(".jpg")]],
+        check=True, timeout=settings.PREVIEW_TIMEOUT_SECONDS
+    )
+
+def renderer(content_type: Optional[str]):
+    """The preview generator for a content type, if the library or tool it needs is installed."""
+    if content_type is None:
+        return None
+    if content_type.startswith("image/") and content_type != "image/svg+xml":
+        return _image_thumbnail if Image is not None else None
+    if content_type.startswith("video/"):
+        return _video_poster if shutil.which("ffmpeg") else None
+    if content_type == "application/pdf":
+        return _pdf_first_page if shutil.which("pdftoppm") else None
+    return None
+
+def process(path: str, target: str) -> PreviewResult:
+    """Sniffs path and renders its preview to target; runs in a pool worker, so it takes and returns plain values."""
+    content_type, file_type = sniff(path)
+    render = renderer(content_type)
+    if render is None:
+        return PreviewResult(content_type, file_type, None, UNAVAILABLE)
+    try:
+        render(path, target)
+    except Exception:
+        logger.exception("Preview of %s failed", path)
+        return PreviewResult(content_type, file_type, None, FAILED)
+    return PreviewResult(content_type, file_type, target, READY)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# The API process runs threads (the scheduler, the threadpool), and forking
+# one can copy a lock another thread holds; workers start from a clean server
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def start() -> ProcessPoolExecutor:
+    """Creates the worker pool; the app's lifespan calls it at startup, before any request thread exists."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PREVIEW_WORKERS or os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context(_START_METHOD),
+        )
+    return _pool
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Decoding and resizing are CPU bound; worker processes keep them off the API's GIL.
+    # Outside the app (the CLI) the pool is started on first use.
+    return _pool or start()
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def save_result(db: Session, file_id: int, owner_id: int, result: PreviewResult) -> None:
+    values = {"content_type": result.content_type, "preview_path": result.preview_path, "preview_status": result.status}
+    if result.file_type:
+        values["file_type"] = result.file_type
+    db.execute(update(File).where(File.id == file_id).values(**values))
+    sync_service.record_change(db, "file", file_id, [owner_id])
+    db.commit()
+
+def _render(key: str) -> PreviewResult:
+    fd, target = tempfile.mkstemp(suffix=".jpg")
+    os.close(fd)
+    try:
+        # Remote backends download to a temporary file first; local ones hand over the path
+        with storage.backend.local_copy(key) as path:
+            result = _get_pool().submit(process, path, target).result()
+        if result.status == READY:
+            preview_key = preview_key_for(key)
+            storage.backend.put_file(preview_key, target)
+            result = result._replace(preview_path=preview_key)
+    finally:
+        if os.path.exists(target):
+            os.remove(target)
+    return result
+
+def generate_preview(session_factory: sessionmaker, file_id: int, owner_id: int, key: str) -> None:
+    """Background task: sniffs and renders in the process pool, then records the outcome on the file."""
+    try:
+        result = _render(key)
+    except Exception:
+        logger.exception("Preview failed for file %s", file_id)
+        result = PreviewResult(None, None, None, FAILED)
+    db = session_factory()
+    try:
+        save_result(db, file_id, owner_id, result)
+    finally:
+        db.close()
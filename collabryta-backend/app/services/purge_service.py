@@ -0,0 +1,165 @@
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Table, delete, select, update
+from app.core import storage
+from app.core.config import settings
+from app.models.file import File
+from app.models.meeting import Meeting, meeting_participants
+from app.models.message import Chat, ChatParticipant, Message, MessageArchiveSegment, MessageMention
+from app.models.notification import Notification
+from app.models.sync import ChangeLog
+from app.models.task import Task
+from app.models.user import User
+from app.services import archive_service, dashboard_service, inbox_service, sync_service, user_service
+
+logger = logging.getLogger(__name__)
+
+# Called with a batch's ids inside its transaction, before the rows change. It records
+# change-log rows for the other users who can see them and returns those users, whose
+# dashboards are refreshed once the batch commits.
+BatchHook = Callable[[List[int]], Set[int]]
+
+def _delete_in_batches(db: Session, table: Table, *where, before: Optional[BatchHook] = None) -> int:
+    """Deletes matching rows PURGE_BATCH_SIZE at a time, committing between batches so locks stay short."""
+    return _in_batches(db, table, delete(table), where, before)
+
+def _update_in_batches(db: Session, table: Table, values: dict, *where, before: Optional[BatchHook] = None) -> int:
+    return _in_batches(db, table, update(table).values(**values), where, before)
+
+def _in_batches(db: Session, table: Table, statement, where, before: Optional[BatchHook]) -> int:
+    batch = settings.PURGE_BATCH_SIZE
+    total = 0
+    while True:
+        ids = list(db.scalars(select(table.c.id).where(*where).limit(batch)))
+        if not ids:
+            return total
+        affected = before(ids) if before else set()
+        db.execute(statement.where(table.c.id.in_(ids)))
+        db.commit()
+        dashboard_service.invalidate_summary(*affected)
+        total += len(ids)
+        if len(ids) < batch:
+            return total
+
+def _record(db: Session, entity: str, audiences: Dict[int, Iterable[Optional[int]]], exclude: int, op: str) -> Set[int]:
+    """Records the change for everyone in each audience except the departing user; returns who was told."""
+    audiences = {entity_id: {u for u in user_ids if u is not None and u != exclude} for entity_id, user_ids in audiences.items()}
+    sync_service.record_change_map(db, entity, audiences, op=op)
+    return set().union(*audiences.values())
+
+def _audiences(rows) -> Dict[int, List[int]]:
+    grouped: Dict[int, List[int]] = {}
+    for entity_id, user_id in rows:
+        grouped.setdefault(entity_id, []).append(user_id)
+    return grouped
+
+def _message_audiences(db: Session, ids: List[int]) -> Dict[int, List[int]]:
+    return _audiences(db.query(Message.id, ChatParticipant.user_id).join(
+        ChatParticipant, ChatParticipant.chat_id == Message.chat_id
+    ).filter(Message.id.in_(ids)))
+
+def _meeting_audiences(db: Session, ids: List[int]) -> Dict[int, List[int]]:
+    audiences = _audiences(db.query(meeting_participants.c.meeting_id, meeting_participants.c.user_id).filter(
+        meeting_participants.c.meeting_id.in_(ids)
+    ))
+    for meeting_id, host_id in db.query(Meeting.id, Meeting.host_id).filter(Meeting.id.in_(ids)):
+        audiences.setdefault(meeting_id, []).append(host_id)
+    return audiences
+
+def detach_chat(db: Session, chat_id: int) -> None:
+    """Removes a chat from every participant's view right away; the rows are purged later."""
+    participant_ids = [row.user_id for row in db.query(ChatParticipant.user_id).filter(ChatParticipant.chat_id == chat_id)]
+    db.query(ChatParticipant).filter(ChatParticipant.chat_id == chat_id).delete(synchronize_session=False)
+    inbox_service.remove_chat(db, chat_id)
+    sync_service.record_change(db, "chat", chat_id, participant_ids, op=sync_service.DELETE)
+    db.commit()
+    dashboard_service.invalidate_summary(*participant_ids)
+
+def purge_chat(session_factory: sessionmaker, chat_id: int) -> None:
+    """Deletes a chat's messages and archive segments in bounded batches, then the chat row itself."""
+    db = session_factory()
+    try:
+        removed = _delete_in_batches(db, Message.__table__, Message.chat_id == chat_id)
+        _delete_in_batches(db, MessageArchiveSegment.__table__, MessageArchiveSegment.chat_id == chat_id)
+        db.execute(delete(Chat).where(Chat.id == chat_id))
+        db.commit()
+        logger.info("Purged chat %s (%s messages)", chat_id, removed)
+    finally:
+        db.close()
+
+def purge_user(session_factory: sessionmaker, user_id: int) -> None:
+    """Deletes everything a departing user owns in bounded batches, then the user row.
+
+    Deleting the user row directly would cascade through all of it in one long transaction.
+    Messages, tasks and meetings are shared, so every batch also records the change for the
+    other people who can see those rows and refreshes their dashboards.
+    """
+    db = session_factory()
+    try:
+        _delete_in_batches(db, ChangeLog.__table__, ChangeLog.user_id == user_id)
+        _delete_in_batches(db, Notification.__table__, Notification.user_id == user_id)
+
+        chat_ids = [row.chat_id for row in db.query(ChatParticipant.chat_id).filter(ChatParticipant.user_id == user_id)]
+        def forget_messages(ids: List[int]) -> Set[int]:
+            # message_mentions has no foreign key to messages (archived messages keep their mentions)
+            db.execute(delete(MessageMention).where(MessageMention.message_id.in_(ids)))
+            return _record(db, "message", _message_audiences(db, ids), user_id, sync_service.DELETE)
+        _delete_in_batches(db, Message.__table__, Message.sender_id == user_id, before=forget_messages)
+        archive_service.remove_sender(db, user_id)
+        # Other participants' inboxes may still preview or count the removed messages
+        inbox_service.rebuild(db, chat_ids)
+
+        _update_in_batches(db, Task.__table__, {"assigned_to_id": None}, Task.assigned_to_id == user_id, before=lambda ids: _record(
+            db, "task", _audiences(db.query(Task.id, Task.owner_id).filter(Task.id.in_(ids))), user_id, sync_service.UPSERT
+        ))
+        _delete_in_batches(db, Task.__table__, Task.owner_id == user_id, before=lambda ids: _record(
+            db, "task", _audiences(db.query(Task.id, Task.assigned_to_id).filter(Task.id.in_(ids))), user_id, sync_service.DELETE
+        ))
+        _delete_in_batches(db, Meeting.__table__, Meeting.host_id == user_id, before=lambda ids: _record(
+            db, "meeting", _meeting_audiences(db, ids), user_id, sync_service.DELETE
+        ))
+
+        keys = []
+        for row in db.query(File.filename, File.preview_path).filter(File.owner_id == user_id):
+            keys += [key for key in row if key]
+        _delete_in_batches(db, File.__table__, File.owner_id == user_id)
+        for key in keys:
+            try:
+                storage.backend.delete(key)
+            except Exception:
+                logger.warning("Could not remove %s for purged user %s", key, user_id)
+
+        # Chats and meetings the user only took part in lose a participant
+        attended = [row.meeting_id for row in db.query(meeting_participants.c.meeting_id).filter(
+            meeting_participants.c.user_id == user_id
+        )]
+        affected = _record(db, "chat", _audiences(db.query(ChatParticipant.chat_id, ChatParticipant.user_id).filter(
+            ChatParticipant.chat_id.in_(chat_ids)
+        )), user_id, sync_service.UPSERT)
+        affected |= _record(db, "meeting", _meeting_audiences(db, attended), user_id, sync_service.UPSERT)
+        db.execute(delete(ChatParticipant).where(ChatParticipant.user_id == user_id))
+        db.execute(delete(meeting_participants).where(meeting_participants.c.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        dashboard_service.invalidate_summary(*affected)
+        user_service.invalidate_directory()
+
+        # Chats the user was the last member of have no one left to delete them
+        occupied = {row.chat_id for row in db.query(ChatParticipant.chat_id).filter(ChatParticipant.chat_id.in_(chat_ids))}
+        for chat_id in set(chat_ids) - occupied:
+            purge_chat(session_factory, chat_id)
+        logger.info("Purged user %s", user_id)
+    finally:
+        db.close()
+
+def purge_deleted_users(session_factory: sessionmaker) -> int:
+    """Purges every account whose deletion was requested but never finished, e.g. a purge that raised."""
+    db = session_factory()
+    try:
+        user_ids = list(db.scalars(select(User.id).where(User.deletion_requested_at.isnot(None)).order_by(User.id)))
+    finally:
+        db.close()
+    for user_id in user_ids:
+        purge_user(session_factory, user_id)
+    return len(user_ids)
@@ -0,0 +1,183 @@
+import heapq
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, or_, select
+from app.core.config import settings
+from app.models.meeting import Meeting, meeting_participants
+from app.models.reminder import ReminderLease
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.notification import NotificationCreate
+from app.services import dashboard_service, notification_service
+
+logger = logging.getLogger(__name__)
+
+MEETING = "meeting"
+TASK = "task"
+
+class Reminder(NamedTuple):
+    fire_at: datetime
+    kind: str
+    entity_id: int
+    offset_minutes: int
+    event_at: datetime
+
+    @property
+    def key(self) -> str:
+        # Includes the event time, so moving a meeting schedules a fresh reminder
+        return f"{self.kind}:{self.entity_id}:{self.offset_minutes}:{self.event_at.isoformat()}"
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def due_between(db: Session, start: datetime, end: datetime) -> List[Reminder]:
+    """Reminders whose fire time falls in [start, end), from indexed range scans on the event times."""
+    reminders = []
+    for offset in settings.MEETING_REMINDER_OFFSETS_MINUTES:
+        delta = timedelta(minutes=offset)
+        rows = db.execute(select(Meeting.id, Meeting.start_time).where(
+            Meeting.start_time >= start + delta, Meeting.start_time < end + delta
+        ))
+        reminders += [Reminder(_utc(at) - delta, MEETING, id_, offset, _utc(at)) for id_, at in rows]
+    for offset in settings.TASK_DEADLINE_OFFSETS_MINUTES:
+        delta = timedelta(minutes=offset)
+        rows = db.execute(select(Task.id, Task.end_date).where(
+            Task.end_date >= start + delta, Task.end_date < end + delta,
+            or_(Task.status.is_(None), Task.status != "Completed")
+        ))
+        reminders += [Reminder(_utc(at) - delta, TASK, id_, offset, _utc(at)) for id_, at in rows]
+    return reminders
+
+def _meeting_notifications(db: Session, reminder: Reminder) -> List[NotificationCreate]:
+    meeting = db.get(Meeting, reminder.entity_id)
+    if meeting is None or _utc(meeting.start_time) != reminder.event_at:
+        return []
+    attendees = select(meeting_participants.c.user_id).where(meeting_participants.c.meeting_id == meeting.id)
+    recipients = db.scalars(select(User.id).where(
+        or_(User.id == meeting.host_id, User.id.in_(attendees)),
+        User.push_meetings.isnot(False)
+    )).all()
+    return [NotificationCreate(
+        user_id=user_id,
+        title="Meeting Starting Soon",
+        description=f"'{meeting.title}' starts in {reminder.offset_minutes} minutes.",
+        type="info",
+        source_type=MEETING,
+        source_id=meeting.id
+    ) for user_id in recipients]
+
+def _task_notifications(db: Session, reminder: Reminder) -> List[NotificationCreate]:
+    task = db.get(Task, reminder.entity_id)
+    if task is None or task.end_date is None or _utc(task.end_date) != reminder.event_at or task.status == "Completed":
+        return []
+    return [NotificationCreate(
+        user_id=user_id,
+        title="Task Due Soon",
+        description=f"'{task.title}' is due in {reminder.offset_minutes} minutes.",
+        type="warning",
+        source_type=TASK,
+        source_id=task.id
+    ) for user_id in {task.owner_id, task.assigned_to_id} if user_id]
+
+def fire(db: Session, reminder: Reminder, worker: str) -> int:
+    """Sends one reminder unless another worker already has; returns the notifications created.
+
+    The lease insert and the notifications commit together, so a crash between
+    them leaves the reminder unclaimed for the next worker to pick up.
+    """
+    build = _meeting_notifications if reminder.kind == MEETING else _task_notifications
+    notifications = build(db, reminder)
+    if not notifications:
+        db.rollback()
+        return 0
+    try:
+        db.execute(insert(ReminderLease).values(key=reminder.key, worker=worker))
+    except IntegrityError:
+        db.rollback()
+        return 0
+    notification_service.create_notifications(db, notifications)
+    db.commit()
+    dashboard_service.invalidate_summary(*[n.user_id for n in notifications])
+    return len(notifications)
+
+class ReminderScheduler:
+    """Min-heap of upcoming reminders, refilled from the database every poll.
+
+    Each poll reloads the window from SCHEDULER_CATCH_UP_MINUTES ago to
+    SCHEDULER_LOOKAHEAD_MINUTES ahead, so a restart recomputes everything
+    and meetings created or moved since the last poll are picked up. Several
+    workers can run one each; leases decide which one sends.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], worker: Optional[str] = None):
+        self.session_factory = session_factory
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self._heap: List[Tuple[datetime, str, Reminder]] = []
+        self._queued: Dict[str, datetime] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, now: datetime) -> None:
+        start = now - timedelta(minutes=settings.SCHEDULER_CATCH_UP_MINUTES)
+        db = self.session_factory()
+        try:
+            reminders = due_between(db, start, now + timedelta(minutes=settings.SCHEDULER_LOOKAHEAD_MINUTES))
+            # Leases only matter while their reminder can still be reloaded
+            db.execute(delete(ReminderLease).where(ReminderLease.fired_at < now - timedelta(days=1)))
+            db.commit()
+        finally:
+            db.close()
+        # Keys stay queued until they leave the catch-up window, so a reload does not refire them
+        self._queued = {key: fire_at for key, fire_at in self._queued.items() if fire_at >= start}
+        for reminder in reminders:
+            if reminder.key not in self._queued:
+                self._queued[reminder.key] = reminder.fire_at
+                heapq.heappush(self._heap, (reminder.fire_at, reminder.key, reminder))
+
+    def run_pending(self, now: datetime) -> int:
+        sent = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, reminder = heapq.heappop(self._heap)
+            db = self.session_factory()
+            try:
+                sent += fire(db, reminder, self.worker)
+            except Exception:
+                logger.exception("Reminder %s failed", reminder.key)
+            finally:
+                db.close()
+        return sent
+
+    def next_fire_at(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        poll = timedelta(seconds=settings.SCHEDULER_POLL_SECONDS)
+        next_load = datetime.now(timezone.utc)
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            try:
+                if now >= next_load:
+                    self.load(now)
+                    next_load = now + poll
+                self.run_pending(now)
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+            wake = min(filter(None, [next_load, self.next_fire_at()]))
+            self._stop.wait(max((wake - datetime.now(timezone.utc)).total_seconds(), 0.1))
@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, insert
+from app import models, schemas
+from app.models.sync import ChangeLog
+from app.schemas.file import FileResponse
+from app.schemas.message import MessageResponse, ChatResponse
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# entity name -> (model, response schema used to render upserts)
+ENTITIES = {
+    "message": (models.Message, MessageResponse),
+    "chat": (models.Chat, ChatResponse),
+    "task": (models.Task, schemas.Task),
+    "meeting": (models.Meeting, schemas.Meeting),
+    "file": (models.File, FileResponse),
+    "notification": (models.Notification, schemas.Notification),
+}
+
+# Relationships the schemas render, loaded with each batch instead of lazily per row
+LOADERS = {
+    "message": (joinedload(models.Message.sender),),
+    "chat": (selectinload(models.Chat.participants),),
+    "meeting": (joinedload(models.Meeting.host), selectinload(models.Meeting.participants)),
+}
+
+def record_change(db: Session, entity: str, entity_id: int, user_ids: Iterable[Optional[int]], op: str = UPSERT) -> None:
+    """Writes change-log rows inside the current transaction; the caller's commit makes them visible."""
+    record_changes(db, entity, [entity_id], user_ids, op=op)
+
+def record_changes(db: Session, entity: str, entity_ids: Iterable[int], user_ids: Iterable[Optional[int]], op: str = UPSERT) -> None:
+    """Bulk variant of record_change for set-based updates, sent as one executemany."""
+    user_ids = list(user_ids)
+    record_change_map(db, entity, {entity_id: user_ids for entity_id in entity_ids}, op=op)
+
+def record_change_map(db: Session, entity: str, audiences: Dict[int, Iterable[Optional[int]]], op: str = UPSERT) -> None:
+    """Records changes to many entities, each with its own set of affected users, in one executemany."""
+    rows = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "op": op}
+        for entity_id, user_ids in audiences.items()
+        for user_id in set(user_ids)
+        if user_id is not None
+    ]
+    if rows:
+        db.execute(insert(ChangeLog), rows)
+
+def get_changes(db: Session, user_id: int, since: int = 0, limit: int = 500) -> schemas.SyncResponse:
+    """Returns the compacted changes for a user after the given cursor.
+
+    Only the latest entry per entity is returned, so an entity edited many
+    times since the cursor costs a single row.
+    """
+    latest = db.query(
+        func.max(ChangeLog.id).label("cursor")
+    ).filter(
+        ChangeLog.user_id == user_id,
+        ChangeLog.id > since
+    ).group_by(ChangeLog.entity, ChangeLog.entity_id).subquery()
+
+    entries = db.query(ChangeLog).join(
+        latest, ChangeLog.id == latest.c.cursor
+    ).order_by(ChangeLog.id).limit(limit + 1).all()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Load every upserted entity of a kind in one query
+    wanted: Dict[str, List[int]] = {}
+    for entry in entries:
+        if entry.op == UPSERT:
+            wanted.setdefault(entry.entity, []).append(entry.entity_id)
+
+    loaded: Dict[str, Dict[int, object]] = {}
+    for entity, ids in wanted.items():
+        model, _ = ENTITIES[entity]
+        query = db.query(model).options(*LOADERS.get(entity, ())).filter(model.id.in_(ids))
+        loaded[entity] = {obj.id: obj for obj in query.all()}
+
+    changes = []
+    for entry in entries:
+        obj = loaded.get(entry.entity, {}).get(entry.entity_id)
+        if entry.op == UPSERT and obj is not None:
+            _, schema = ENTITIES[entry.entity]
+            data = schema.model_validate(obj).model_dump(mode="json")
+            changes.append(schemas.SyncChange(cursor=entry.id, entity=entry.entity, id=entry.entity_id, op=UPSERT, data=data))
+        else:
+            # Deleted, or upserted and removed since without a logged delete
+            changes.append(schemas.SyncChange(cursor=entry.id, entity=entry.entity, id=entry.entity_id, op=DELETE))
+
+    cursor = entries[-1].id if entries else since
+    return schemas.SyncResponse(cursor=cursor, has_more=has_more, changes=changes)
@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import delete, update
 from app import models, schemas
+from app.services import dashboard_service, sync_service
 from datetime import datetime
 
 def get_user_tasks(db: Session, user_id: int) -> List[models.Task]:
@@ -18,8 +20,10 @@ async def create_task(db: Session, task_in: schemas.TaskCreate, owner_id: int) -
         db_obj.assigned_to_id = owner_id
         
     db.add(db_obj)
+    db.flush()
+    sync_service.record_change(db, "task", db_obj.id, [db_obj.owner_id, db_obj.assigned_to_id])
     db.commit()
-    db.refresh(db_obj)
+    dashboard_service.invalidate_summary(db_obj.owner_id, db_obj.assigned_to_id)
     
     # Notify Assignee
     from app.services import notification_service
@@ -41,13 +45,17 @@ async def update_task(db: Session, task_id: int, task_in: schemas.TaskUpdate) ->
         return None
     
     old_status = task.status
+    old_assignee_id = task.assigned_to_id
     update_data = task_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(task, field, value)
         
     db.add(task)
+    sync_service.record_change(db, "task", task.id, [task.owner_id, task.assigned_to_id])
+    if old_assignee_id not in (task.owner_id, task.assigned_to_id):
+        sync_service.record_change(db, "task", task.id, [old_assignee_id], op=sync_service.DELETE)
     db.commit()
-    db.refresh(task)
+    dashboard_service.invalidate_summary(task.owner_id, old_assignee_id, task.assigned_to_id)
     
     # Notify Owner/Assignee on status change
     from app.services import notification_service
@@ -59,7 +67,9 @@ async def update_task(db: Session, task_id: int, task_in: schemas.TaskUpdate) ->
             user_id=task.owner_id,
             title="Task Status Updated",
             description=f"Task '{task.title}' status changed to {task.status}.",
-            type="info"
+            type="info",
+            source_type="task",
+            source_id=task.id
         ))
         
         # Notify Assignee if different from owner
@@ -68,18 +78,128 @@ async def update_task(db: Session, task_id: int, task_in: schemas.TaskUpdate) ->
                 user_id=task.assigned_to_id,
                 title="Task Status Updated",
                 description=f"Task '{task.title}' status changed to {task.status}.",
-                type="info"
+                type="info",
+                source_type="task",
+                source_id=task.id
             ))
             
     return task
 
 def delete_task(db: Session, task_id: int) -> Optional[models.Task]:
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = get_task(db, task_id)
     if not task:
         return None
-    db.delete(task)
+    # A plain DELETE; the database's ON DELETE rules handle anything that references the task
+    db.execute(delete(models.Task).where(models.Task.id == task.id))
+    sync_service.record_change(db, "task", task.id, [task.owner_id, task.assigned_to_id], op=sync_service.DELETE)
     db.commit()
+    dashboard_service.invalidate_summary(task.owner_id, task.assigned_to_id)
     return task
 
 def get_task(db: Session, task_id: int) -> Optional[models.Task]:
-     return db.query(models.Task).filter(models.Task.id == task_id).first()
+     # Identity-map lookup first, so endpoint + service loads cost one query
+     return db.get(models.Task, task_id)
+
+def get_tasks_by_ids(db: Session, task_ids: Iterable[int]) -> Dict[int, dict]:
+    """Loads the columns needed for permission checks and notification fan-out in one query."""
+    rows = db.query(
+        models.Task.id, models.Task.title, models.Task.status,
+        models.Task.owner_id, models.Task.assigned_to_id
+    ).filter(models.Task.id.in_(list(task_ids))).all()
+    return {row.id: row._asdict() for row in rows}
+
+def _fan_out(recipients: Dict[int, List[dict]], title: str, many_title: str, single_text, many_text) -> List[schemas.NotificationCreate]:
+    """One notification per recipient: the usual text for a single task, a summary for several."""
+    notifications = []
+    for user_id, tasks in recipients.items():
+        if len(tasks) == 1:
+            notifications.append(schemas.NotificationCreate(
+                user_id=user_id,
+                title=title,
+                description=single_text(tasks[0]),
+                type="info",
+                source_type="task",
+                source_id=tasks[0]["id"]
+            ))
+        else:
+            notifications.append(schemas.NotificationCreate(
+                user_id=user_id,
+                title=many_title,
+                description=many_text(tasks),
+                type="info"
+            ))
+    return notifications
+
+def bulk_apply(db: Session, bulk_in: schemas.TaskBulkRequest, owner_id: int, existing: Dict[int, dict]) -> dict:
+    """Applies a batch of creates, set-based updates and deletes in a single transaction.
+
+    `existing` is the get_tasks_by_ids snapshot the caller used for permission checks;
+    it is updated in place as the batch is applied.
+    """
+    from app.services import notification_service
+
+    upserts: Dict[int, set] = {}
+    removals: Dict[int, set] = {}
+    assigned: Dict[int, List[dict]] = {}
+    status_changes: Dict[int, List[dict]] = {}
+
+    # Creates: one flush, sent as a multi-row INSERT ... RETURNING
+    created = []
+    for task_in in bulk_in.create:
+        db_obj = models.Task(**task_in.model_dump(), owner_id=owner_id)
+        if not db_obj.assigned_to_id:
+            db_obj.assigned_to_id = owner_id
+        created.append(db_obj)
+    db.add_all(created)
+    db.flush()
+    for db_obj in created:
+        upserts[db_obj.id] = {db_obj.owner_id, db_obj.assigned_to_id}
+        assigned.setdefault(db_obj.assigned_to_id, []).append({"id": db_obj.id, "title": db_obj.title})
+
+    # Updates: one UPDATE ... WHERE id IN (...) per change set
+    updated = set()
+    for group in bulk_in.update:
+        changes = group.changes.model_dump(exclude_unset=True)
+        if not changes:
+            continue
+        db.execute(update(models.Task).where(models.Task.id.in_(group.ids)).values(**changes))
+        for task_id in group.ids:
+            task = existing[task_id]
+            old_status, old_assignee_id = task["status"], task["assigned_to_id"]
+            task.update({k: v for k, v in changes.items() if k in task})
+            upserts.setdefault(task_id, set()).update({task["owner_id"], task["assigned_to_id"]})
+            if old_assignee_id not in (task["owner_id"], task["assigned_to_id"]):
+                removals.setdefault(task_id, set()).add(old_assignee_id)
+            if "status" in changes and old_status != task["status"]:
+                for user_id in {task["owner_id"], task["assigned_to_id"]}:
+                    status_changes.setdefault(user_id, []).append(task)
+        updated.update(group.ids)
+
+    # Deletes: a single DELETE ... WHERE id IN (...)
+    deleted = list(dict.fromkeys(bulk_in.delete))
+    if deleted:
+        db.execute(delete(models.Task).where(models.Task.id.in_(deleted)))
+        for task_id in deleted:
+            task = existing[task_id]
+            removals.setdefault(task_id, set()).update({task["owner_id"], task["assigned_to_id"]})
+            upserts.pop(task_id, None)
+
+    sync_service.record_change_map(db, "task", upserts)
+    sync_service.record_change_map(db, "task", removals, op=sync_service.DELETE)
+
+    notifications = _fan_out(
+        assigned, "New Task Assigned", "New Tasks Assigned",
+        lambda t: f"Task '{t['title']}' has been assigned to you.",
+        lambda ts: f"{len(ts)} tasks have been assigned to you."
+    ) + _fan_out(
+        status_changes, "Task Status Updated", "Task Statuses Updated",
+        lambda t: f"Task '{t['title']}' status changed to {t['status']}.",
+        lambda ts: f"{len(ts)} tasks changed status."
+    )
+    notification_service.create_notifications(db, notifications)
+    db.commit()
+
+    affected = set().union(*upserts.values(), *removals.values())
+    dashboard_service.invalidate_summary(*affected)
+
+    return {"created": created, "updated": sorted(updated - set(deleted)), "deleted": deleted}
@@ -0,0 +1,136 @@
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+import aiofiles
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from starlette.concurrency import run_in_threadpool
+from app.core import storage, tracing
+from app.core.config import settings
+from app.models.upload import UploadChunk, UploadSession
+from app.schemas.file import UploadSessionCreate
+from app.services import file_service
+
+logger = logging.getLogger(__name__)
+
+class UploadOverflow(Exception):
+    """A chunk ran past the length declared when the session was created."""
+
+class UploadQuotaExceeded(Exception):
+    """The user already has as many open uploads, or reserved bytes, as they are allowed."""
+
+def staging_path(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"{upload_id}.part")
+
+def create_session(db: Session, data: UploadSessionCreate, user_id: int) -> UploadSession:
+    now = datetime.now(timezone.utc)
+    count, reserved = db.query(func.count(UploadSession.id), func.coalesce(func.sum(UploadSession.length), 0)).filter(
+        UploadSession.owner_id == user_id, UploadSession.expires_at > now
+    ).one()
+    if count >= settings.UPLOAD_MAX_SESSIONS_PER_USER or reserved + data.length > settings.UPLOAD_MAX_PENDING_BYTES_PER_USER:
+        raise UploadQuotaExceeded()
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        owner_id=user_id,
+        filename=os.path.basename(data.filename),
+        title=data.title,
+        description=data.description,
+        length=data.length,
+        expires_at=now + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    )
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    # Sized up front (sparse where supported) so chunks can land at any offset in any order
+    with open(staging_path(session.id), "wb") as f:
+        f.truncate(data.length)
+    db.add(session)
+    db.commit()
+    return session
+
+def get_session(db: Session, upload_id: str, user_id: int) -> Optional[UploadSession]:
+    """The user's session if it has not expired; an expired one is as good as collected."""
+    return db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.owner_id == user_id,
+        UploadSession.expires_at > datetime.now(timezone.utc),
+    ).first()
+
+def received_offset(db: Session, upload_id: str) -> int:
+    """End of the contiguous run of bytes received from offset 0; a resuming client continues from here."""
+    offset = 0
+    rows = db.execute(
+        select(UploadChunk.start, UploadChunk.end).where(UploadChunk.session_id == upload_id).order_by(UploadChunk.start)
+    )
+    for start, end in rows:
+        if start > offset:
+            break
+        offset = max(offset, end)
+    return offset
+
+async def write_chunk(db: Session, session: UploadSession, offset: int, stream: AsyncIterator[bytes]) -> int:
+    """Streams a request body into the staging file at offset and returns the new received offset.
+
+    Whatever arrived before a dropped connection is still recorded, so the
+    client only resends the rest.
+    """
+    position = offset
+    try:
+        async with aiofiles.open(staging_path(session.id), "r+b") as f:
+            await f.seek(offset)
+            async for data in stream:
+                if position + len(data) > session.length:
+                    raise UploadOverflow()
+                await f.write(data)
+                position += len(data)
+    finally:
+        if position > offset:
+            db.add(UploadChunk(session_id=session.id, start=offset, end=position))
+            db.commit()
+    return received_offset(db, session.id)
+
+async def finalize(db: Session, session: UploadSession):
+    """Hands a fully received upload to storage and creates its File row, as a direct upload would."""
+    key = file_service.stored_filename(session.filename)
+    with tracing.span("storage.put_file", {"storage.backend": type(storage.backend).__name__, "storage.key": key}):
+        await run_in_threadpool(storage.backend.put_file, key, staging_path(session.id))
+    title, description, length, owner_id = session.title, session.description, session.length, session.owner_id
+    db.delete(session)
+    return await file_service.create_file_record(db, key, length, title, description or "", owner_id)
+
+def discard(db: Session, session: UploadSession) -> None:
+    db.delete(session)
+    db.commit()
+    _remove_staging(session.id)
+
+def _remove_staging(upload_id: str) -> None:
+    try:
+        os.remove(staging_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+def collect_garbage(db: Session, now: Optional[datetime] = None) -> int:
+    """Removes expired sessions and staging files left without a session; returns how many uploads went."""
+    now = now or datetime.now(timezone.utc)
+    expired = db.scalars(select(UploadSession.id).where(UploadSession.expires_at < now)).all()
+    if expired:
+        db.execute(delete(UploadSession).where(UploadSession.id.in_(expired)))
+        db.commit()
+    for upload_id in expired:
+        _remove_staging(upload_id)
+
+    # Sessions removed with their owner, or a crash between staging and commit, leave files behind
+    orphans = 0
+    if os.path.isdir(settings.UPLOAD_STAGING_DIR):
+        names = {name for name in os.listdir(settings.UPLOAD_STAGING_DIR) if name.endswith(".part")}
+        live = set(db.scalars(select(UploadSession.id)).all())
+        cutoff = time.time() - settings.UPLOAD_SESSION_TTL_HOURS * 3600
+        for name in names:
+            path = os.path.join(settings.UPLOAD_STAGING_DIR, name)
+            if name[:-len(".part")] not in live and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                orphans += 1
+    if expired or orphans:
+        logger.info("Removed %s expired uploads and %s orphaned staging files", len(expired), orphans)
+    return len(expired) + orphans
@@ -1,8 +1,20 @@
-from typing import Optional, List
+import threading
+from typing import Dict, Optional, List
 from sqlalchemy.orm import Session
+from sqlalchemy import case, func, or_
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserSummary
+from app.core.invalidation import USER_DIRECTORY, bus
 from app.core.security import get_password_hash
+from app.core.search_index import PrefixTrigramIndex
+
+# In-memory directory used by search_users when the database has no pg_trgm.
+# Built on the first search and kept current by this module's writes;
+# other workers drop theirs through the invalidation bus.
+_directory = PrefixTrigramIndex()
+_directory_rows: Dict[int, UserSummary] = {}
+_directory_lock = threading.Lock()
+_directory_loaded = False
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
@@ -16,7 +28,7 @@ def create_user(db: Session, user: UserCreate) -> User:
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
+    _directory_upsert(db_user)
     return db_user
 
 def update_user(db: Session, db_user: User, user_in: UserUpdate) -> User:
@@ -37,8 +49,81 @@ def update_user(db: Session, db_user: User, user_in: UserUpdate) -> User:
 
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
+    _directory_upsert(db_user)
     return db_user
 
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
     return db.query(User).offset(skip).limit(limit).all()
+
+
+def search_users(db: Session, q: str, limit: int = 20) -> List[UserSummary]:
+    """Prefix matches on name and email first, then fuzzy (trigram) matches."""
+    q = q.strip().lower()
+    if not q:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, q, limit)
+
+    _ensure_directory(db)
+    ids = _directory.prefix(q, limit)
+    if len(ids) < limit and len(q) >= 3:
+        ids += [i for i in _directory.fuzzy(q, limit) if i not in ids][:limit - len(ids)]
+    return [_directory_rows[i] for i in ids]
+
+def invalidate_directory() -> None:
+    """Drops the in-memory directory in every worker; the next search rebuilds it."""
+    bus.publish(USER_DIRECTORY)
+
+def _drop_directory(user_ids) -> None:
+    # Other workers cannot apply a single user's change without the row, so they rebuild
+    global _directory_loaded
+    with _directory_lock:
+        _directory_loaded = False
+        _directory_rows.clear()
+        _directory.load([])
+
+def _search_postgres(db: Session, q: str, limit: int) -> List[UserSummary]:
+    name = func.lower(User.name)
+    email = func.lower(User.email)
+    pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    is_prefix = or_(name.like(pattern, escape="\\"), email.like(pattern, escape="\\"))
+    # `%` is pg_trgm's similarity operator; both sides are served by the GIN trigram indexes
+    is_similar = or_(name.op("%")(q), email.op("%")(q))
+    score = func.greatest(func.similarity(name, q), func.similarity(email, q))
+
+    rows = db.query(User.id, User.name, User.email, User.job_title).filter(
+        or_(is_prefix, is_similar)
+    ).order_by(
+        case((is_prefix, 0), else_=1), score.desc(), User.name
+    ).limit(limit).all()
+    return [UserSummary.model_validate(row) for row in rows]
+
+def _directory_keys(name: Optional[str], email: str) -> List[str]:
+    keys = [email, email.split("@")[0]]
+    if name:
+        keys.append(name)
+        keys.extend(name.split())
+    return keys
+
+def _ensure_directory(db: Session) -> None:
+    global _directory_loaded
+    if _directory_loaded:
+        return
+    with _directory_lock:
+        if _directory_loaded:
+            return
+        rows = db.query(User.id, User.name, User.email, User.job_title).all()
+        _directory_rows.clear()
+        _directory_rows.update({row.id: UserSummary.model_validate(row) for row in rows})
+        _directory.load((row.id, _directory_keys(row.name, row.email)) for row in rows)
+        _directory_loaded = True
+
+bus.subscribe(USER_DIRECTORY, _drop_directory)
+
+def _directory_upsert(user: User) -> None:
+    bus.publish(USER_DIRECTORY, user.id, local=False)
+    if not _directory_loaded:
+        return
+    with _directory_lock:
+        _directory_rows[user.id] = UserSummary.model_validate(user)
+        _directory.upsert(user.id, _directory_keys(user.name, user.email))
@@ -0,0 +1,103 @@
+"""Chat history serialization: the old encoder path vs. pydantic dump_json vs. construct().
+
+Usage (from collabryta-backend/):
+    python -m benchmarks.serialization [--messages 1000] [--rounds 20]
+
+Runs against an in-memory SQLite database, so no server or Postgres is needed.
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.core.compression import brotli
+from app.core.serialization import construct_all
+from app.db.base import Base
+from app.schemas.message import MessageResponse
+from app.services import message_service
+
+MESSAGE_LIST = TypeAdapter(List[MessageResponse])
+
+
+def seed(db, count: int) -> int:
+    alice = models.User(email="alice@example.com", name="Alice", hashed_password="x")
+    bob = models.User(email="bob@example.com", name="Bob", hashed_password="x")
+    chat = models.Chat(participants=[alice, bob])
+    db.add(chat)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    db.add_all(
+        models.Message(
+            chat_id=chat.id, sender=(alice, bob)[i % 2],
+            content=f"Message {i}: let's sync on the launch checklist before Friday.",
+            timestamp=start + timedelta(seconds=i)
+        )
+        for i in range(count)
+    )
+    db.commit()
+    return chat.id
+
+
+def legacy(messages) -> bytes:
+    # FastAPI < 0.130: validate, dump to dicts, jsonable_encoder, then json.dumps
+    validated = MESSAGE_LIST.validate_python(messages, from_attributes=True)
+    return json.dumps(jsonable_encoder(MESSAGE_LIST.dump_python(validated))).encode("utf-8")
+
+
+def validated_dump_json(messages) -> bytes:
+    # FastAPI >= 0.130 with a response_model: validate, then dump straight to JSON
+    return MESSAGE_LIST.dump_json(MESSAGE_LIST.validate_python(messages, from_attributes=True))
+
+
+def constructed_dump_json(messages) -> bytes:
+    return MESSAGE_LIST.dump_json(construct_all(MessageResponse, messages))
+
+
+def timed(fn, *args, rounds: int):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(*args)
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    chat_id = seed(db, args.messages)
+    messages = message_service.get_chat_messages(db, chat_id=chat_id, user_id=1)
+
+    print(f"{len(messages)} messages, mean of {args.rounds} rounds")
+    body = b""
+    for name, fn in (("legacy encoder", legacy), ("validate + dump_json", validated_dump_json), ("construct + dump_json", constructed_dump_json)):
+        ms, body = timed(fn, messages, rounds=args.rounds)
+        print(f"  {name:<24} {ms:8.2f} ms  {len(body):>9} bytes")
+
+    ms, packed = timed(gzip.compress, body, 6, rounds=args.rounds)
+    print(f"  {'gzip -6':<24} {ms:8.2f} ms  {len(packed):>9} bytes")
+    if brotli is not None:
+        ms, packed = timed(brotli.compress, body, rounds=args.rounds)
+        print(f"  {'brotli q11 (default)':<24} {ms:8.2f} ms  {len(packed):>9} bytes")
+        ms, packed = timed(lambda b: brotli.compress(b, quality=4), body, rounds=args.rounds)
+        print(f"  {'brotli q4':<24} {ms:8.2f} ms  {len(packed):>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
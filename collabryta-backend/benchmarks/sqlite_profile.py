@@ -0,0 +1,123 @@
+"""Concurrent chat traffic on SQLite: a default engine vs. the WAL profile in app.db.sqlite.
+
+Usage (from collabryta-backend/):
+    python -m benchmarks.sqlite_profile [--writers 4] [--readers 8] [--seconds 5]
+
+Writer threads post messages (ORM insert + commit), reader threads load a
+page of chat history, all against a database file in a temporary directory.
+Reports throughput, latency percentiles and how many operations failed with
+"database is locked".
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db.base import Base
+from app.db.sqlite import create_sqlite_engine
+
+
+def seed(engine) -> int:
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    alice = models.User(email="alice@example.com", name="Alice", hashed_password="x")
+    bob = models.User(email="bob@example.com", name="Bob", hashed_password="x")
+    chat = models.Chat(participants=[alice, bob])
+    db.add(chat)
+    db.commit()
+    db.close()
+    return chat.id
+
+
+def run(engine, chat_id: int, writers: int, readers: int, seconds: float) -> Dict[str, object]:
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    latencies: Dict[str, List[float]] = {"write": [], "read": []}
+    locked = {"write": 0, "read": 0}
+    stop = time.perf_counter() + seconds
+
+    def write(worker: int) -> None:
+        n = 0
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            db = Session()
+            try:
+                db.add(models.Message(chat_id=chat_id, sender_id=1 + worker % 2, content=f"message {worker}-{n}"))
+                db.commit()
+                latencies["write"].append(time.perf_counter() - start)
+            except OperationalError:
+                db.rollback()
+                locked["write"] += 1
+            finally:
+                db.close()
+            n += 1
+
+    def read(worker: int) -> None:
+        query = select(models.Message).where(models.Message.chat_id == chat_id).order_by(models.Message.id.desc()).limit(50)
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            db = Session()
+            try:
+                db.scalars(query).all()
+                latencies["read"].append(time.perf_counter() - start)
+            except OperationalError:
+                locked["read"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"latencies": latencies, "locked": locked}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100)[int(q) - 1] * 1000
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_profile")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args(argv)
+
+    pool = {"pool_size": args.writers + args.readers, "max_overflow": 0}
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s each")
+    for name, factory in (
+        ("default", lambda url: create_engine(url, connect_args={"check_same_thread": False}, **pool)),
+        ("wal profile", lambda url: create_sqlite_engine(url, **pool)),
+    ):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = factory(f"sqlite:///{directory}/bench.db")
+            Base.metadata.create_all(bind=engine)
+            result = run(engine, seed(engine), args.writers, args.readers, args.seconds)
+            engine.dispose()
+        for kind in ("write", "read"):
+            values = result["latencies"][kind]
+            if not values and not result["locked"][kind]:
+                continue
+            print(
+                f"  {name:<12} {kind:<5} {len(values) / args.seconds:9.0f} ops/s"
+                f"  p50 {percentile(values, 50):7.2f} ms  p99 {percentile(values, 99):8.2f} ms"
+                f"  locked {result['locked'][kind]}"
+            )
+
+
+if __name__ == "__main__":
+    main()
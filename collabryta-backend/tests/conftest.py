@@ -1,19 +1,30 @@
 import pytest
+from contextlib import contextmanager
 from typing import Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import settings
 from app.main import app
 from app.db.base import Base
 from app.api.deps import get_db
+from app.db.session import enable_strict_loading
+from app.db.sqlite import create_sqlite_engine
+from app.services import dashboard_service, user_service
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Every test logs in from the same client address; test_rate_limit turns this back on
+settings.RATE_LIMIT_ENABLED = False
+# Reminders are driven explicitly by test_reminders instead of a background thread
+settings.SCHEDULER_ENABLED = False
+
+# The same WAL profile and write queue as a SQLite deployment
+engine = create_sqlite_engine(SQLALCHEMY_DATABASE_URL)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# Unplanned lazy loads fail the test instead of hiding an N+1
+enable_strict_loading(TestingSessionLocal)
 
 @pytest.fixture(scope="module")
 def db() -> Generator:
@@ -24,6 +35,9 @@ def db() -> Generator:
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        # In-process caches would otherwise leak rows into the next module
+        dashboard_service._summary_cache.clear()
+        user_service.invalidate_directory()
 
 @pytest.fixture(scope="module")
 def client(db) -> Generator:
@@ -36,3 +50,28 @@ def client(db) -> Generator:
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as c:
         yield c
+
+@pytest.fixture
+def query_log() -> Generator:
+    """Collects the SQL statements sent to the test database while the test runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def query_budget(query_log):
+    """Context manager factory failing the test if its block sends more than `limit` statements."""
+    @contextmanager
+    def budget(limit: int):
+        start = len(query_log)
+        yield
+        used = query_log[start:]
+        assert len(used) <= limit, f"{len(used)} statements, budget {limit}:\n" + "\n".join(used)
+    return budget
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.models.message import Chat, Message, MessageArchiveSegment, MessageMention
+from app.services import archive_service, export_service
+from tests.utils import create_test_user, auth_headers
+
+def test_old_history_is_archived_and_paged_through(client: TestClient, db, monkeypatch):
+    monkeypatch.setattr(settings, "MESSAGE_ARCHIVE_SEGMENT_SIZE", 5)
+    create_test_user(db, "archivist@example.com")
+    other = create_test_user(db, "historian@example.com")
+    headers = auth_headers(client, "archivist@example.com")
+    other_headers = auth_headers(client, "historian@example.com")
+    chat_id = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/messages/{chat_id}"
+
+    for i in range(12):
+        client.post(url, headers=other_headers if i % 2 else headers, json={"content": f"m{i}"})
+    client.put(f"{url}/read", headers=headers)
+    client.put(f"{url}/read", headers=other_headers)
+    client.post(url, headers=headers, json={"content": "m12"})  # unread: it and everything after stay hot
+
+    later = datetime.now(timezone.utc) + timedelta(minutes=1)
+    assert archive_service.archive_old_messages(db, older_than_days=0, now=later) == 12
+    for i in range(13, 15):
+        client.post(url, headers=headers, json={"content": f"m{i}"})
+
+    db.expire_all()
+    assert db.query(Message).filter(Message.chat_id == chat_id).count() == 3
+    segments = db.query(MessageArchiveSegment).filter(MessageArchiveSegment.chat_id == chat_id).all()
+    assert [s.message_count for s in segments] == [5, 5, 2]
+    assert db.get(Chat, chat_id).archived_through == segments[-1].last_message_id
+
+    # The newest page spans the hot table and the archive
+    page = client.get(url, headers=headers, params={"limit": 4}).json()
+    assert [m["content"] for m in page] == ["m11", "m12", "m13", "m14"]
+    assert page[0]["sender"]["email"] == "historian@example.com"
+
+    history = page
+    while True:
+        page = client.get(url, headers=headers, params={"limit": 4, "before": history[0]["id"]}).json()
+        if not page:
+            break
+        history = page + history
+    assert [m["content"] for m in history] == [f"m{i}" for i in range(15)]
+    assert all(m["sender"] for m in history)
+
+    exported = [row["content"] for batch in export_service.iter_batches(db, "messages", other.id) for row in batch]
+    assert sorted(exported, key=lambda c: int(c[1:])) == [f"m{i}" for i in range(15)]
+
+    # A purged user's messages are cut out of the segments as well
+    assert archive_service.remove_sender(db, other.id) == 6
+    contents = [m.content for m in archive_service.read_messages(db, chat_id)]
+    assert contents == ["m10", "m8", "m6", "m4", "m2", "m0"]
+
+def test_chat_with_only_archived_history_shows_last_message(client: TestClient, db):
+    other = create_test_user(db, "quiet@example.com")
+    headers = auth_headers(client, "archivist@example.com")
+    chat_id = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}
+    ).json()["id"]
+    client.post(f"{settings.API_V1_STR}/messages/{chat_id}", headers=headers, json={"content": "long ago"})
+    client.put(f"{settings.API_V1_STR}/messages/{chat_id}/read", headers=auth_headers(client, "quiet@example.com"))
+
+    later = datetime.now(timezone.utc) + timedelta(minutes=1)
+    archive_service.archive_chat(db, chat_id, later)
+
+    conversations = client.get(f"{settings.API_V1_STR}/messages/conversations", headers=headers).json()
+    assert next(c for c in conversations if c["id"] == chat_id)["last_message"] == "long ago"
+    assert [m["content"] for m in client.get(f"{settings.API_V1_STR}/messages/{chat_id}", headers=headers).json()] == ["long ago"]
+
+def test_mentions_of_archived_messages_stay_in_the_feed(client: TestClient, db):
+    create_test_user(db, "herald@example.com", name="Herald")
+    crier = create_test_user(db, "crier@example.com", name="Crier")
+    headers = auth_headers(client, "herald@example.com")
+    crier_headers = auth_headers(client, "crier@example.com")
+    chat_id = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={
+        "name": "Square", "is_group": True, "participant_ids": [crier.id]
+    }).json()["id"]
+    url = f"{settings.API_V1_STR}/messages/{chat_id}"
+    for content in ["@crier old news", "nothing here", "@herald reply"]:
+        client.post(url, headers=crier_headers if content == "@herald reply" else headers, json={"content": content})
+    client.put(f"{url}/read", headers=headers)
+    client.put(f"{url}/read", headers=crier_headers)
+    client.post(url, headers=headers, json={"content": "@crier fresh news"})
+
+    later = datetime.now(timezone.utc) + timedelta(minutes=1)
+    assert archive_service.archive_old_messages(db, older_than_days=0, now=later) == 3
+
+    feed = client.get(f"{settings.API_V1_STR}/mentions/", headers=crier_headers).json()
+    assert [m["content"] for m in feed] == ["@crier fresh news", "@crier old news"]
+    assert feed[1]["sender"]["email"] == "herald@example.com"
+    assert [m["content"] for m in client.get(f"{settings.API_V1_STR}/mentions/?before={feed[0]['id']}", headers=crier_headers).json()] == ["@crier old news"]
+
+    # Cutting a purged sender out of the archive takes their mentions with it
+    archive_service.remove_sender(db, crier.id)
+    db.expire_all()
+    assert db.query(MessageMention).filter(MessageMention.chat_id == chat_id).count() == 2
+    assert client.get(f"{settings.API_V1_STR}/mentions/", headers=headers).json() == []
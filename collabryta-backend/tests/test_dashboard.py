@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_dashboard_summary(client: TestClient, db):
+    create_test_user(db, "dash@example.com")
+    headers = auth_headers(client, "dash@example.com")
+
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Late", "priority": "High", "end_date": past})
+    client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Done", "status": "Completed", "end_date": past})
+
+    response = client.get(f"{settings.API_V1_STR}/dashboard/summary", headers=headers)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["total_tasks"] == 2
+    assert content["tasks_by_status"] == {"Pending": 1, "Completed": 1}
+    assert content["tasks_by_priority"] == {"High": 1, "Medium": 1}
+    assert content["overdue_tasks"] == 1
+    assert content["unread_notifications"] == 2
+
+def test_dashboard_summary_invalidated_by_writes(client: TestClient, db):
+    headers = auth_headers(client, "dash@example.com")
+    before = client.get(f"{settings.API_V1_STR}/dashboard/summary", headers=headers).json()
+
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    client.post(f"{settings.API_V1_STR}/meetings/", headers=headers, json={
+        "title": "Planning",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+    })
+
+    after = client.get(f"{settings.API_V1_STR}/dashboard/summary", headers=headers).json()
+    assert len(after["upcoming_meetings"]) == len(before["upcoming_meetings"]) + 1
+    assert after["upcoming_meetings"][0]["title"] == "Planning"
+    assert after["unread_notifications"] == before["unread_notifications"] + 1
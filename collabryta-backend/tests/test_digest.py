@@ -0,0 +1,50 @@
+import os
+from datetime import datetime, timedelta, timezone
+from app import models
+from app.services import digest_service
+from tests.utils import create_test_user
+
+def test_digests_are_built_per_batch_with_fixed_queries(db, tmp_path, query_log):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    users = [create_test_user(db, f"digest{i}@example.com", name=f"Reader {i}") for i in range(5)]
+    opted_out = create_test_user(db, "nodigest@example.com")
+    opted_out.email_summary = False
+
+    chat = models.Chat(participants=[users[0], users[1]])
+    db.add(chat)
+    db.flush()
+    db.add_all([models.Message(chat_id=chat.id, sender_id=users[1].id, content=f"hi {i}") for i in range(3)])
+    db.add_all([
+        models.Task(title=f"Report {i}", owner_id=users[2].id, assigned_to_id=users[2].id, end_date=now + timedelta(hours=i + 1))
+        for i in range(7)
+    ])
+    meeting = models.Meeting(
+        title="Retro", host_id=users[3].id, participants=[users[3], users[4]],
+        start_time=now + timedelta(hours=2), end_time=now + timedelta(hours=3)
+    )
+    db.add(meeting)
+    db.commit()
+    query_log.clear()
+
+    sender = digest_service.FileSender(str(tmp_path), date="today")
+    report = digest_service.send_digests(db, sender, now=now, batch_size=2)
+
+    # Reader 1 only sent messages, so has nothing to read about
+    assert (report.users, report.sent, report.skipped) == (5, 4, 1)
+    # recent files once, then per batch of 2: users page + 3 grouped queries, plus the final empty page
+    batches = (report.users + 1) // 2
+    assert len(query_log) == 1 + batches * 4 + 1
+
+    outbox = sorted(os.listdir(tmp_path / "today"))
+    assert "nodigest@example.com.txt" not in outbox
+    assert "digest1@example.com.txt" not in outbox
+    with open(tmp_path / "today" / "digest0@example.com.txt") as f:
+        assert "3 unread message(s)" in f.read()
+    with open(tmp_path / "today" / "digest2@example.com.txt") as f:
+        body = f.read()
+    assert "Tasks due (7):" in body
+    assert body.count("  - Report") == 5
+    with open(tmp_path / "today" / "digest3@example.com.txt") as f:
+        assert "Upcoming meetings (1):" in f.read()
+    with open(tmp_path / "today" / "digest4@example.com.txt") as f:
+        assert "Retro" in f.read()
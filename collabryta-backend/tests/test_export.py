@@ -0,0 +1,33 @@
+import csv
+import gzip
+import io
+import json
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_export_tasks_ndjson(client: TestClient, db):
+    create_test_user(db, "export@example.com")
+    headers = auth_headers(client, "export@example.com")
+    for i in range(3):
+        client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": f"Task {i}"})
+
+    response = client.get(f"{settings.API_V1_STR}/export/tasks", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Task 0", "Task 1", "Task 2"]
+
+def test_export_tasks_csv_gzip(client: TestClient, db):
+    headers = auth_headers(client, "export@example.com")
+    response = client.get(f"{settings.API_V1_STR}/export/tasks", headers=headers, params={"format": "csv", "gzip": True})
+    assert response.status_code == 200
+    assert 'filename="tasks.csv.gz"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode("utf-8"))))
+    assert len(rows) == 3
+    assert rows[0]["title"] == "Task 0"
+
+def test_export_unknown_kind(client: TestClient, db):
+    headers = auth_headers(client, "export@example.com")
+    response = client.get(f"{settings.API_V1_STR}/export/passwords", headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,69 @@
+import json
+from fastapi.testclient import TestClient
+from app import models
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_import_users_csv(client: TestClient, db, monkeypatch):
+    create_test_user(db, "admin@example.com")
+    create_test_user(db, "member@example.com")
+    headers = auth_headers(client, "admin@example.com")
+    body = (
+        "email,password,name\n"
+        "ann@example.com,secret1,Ann\n"
+        "not-an-email,secret2,Bad\n"
+        "ann@example.com,secret3,Ann Again\n"
+        "Admin@Example.com,secret4,Existing\n"
+        "bob@example.com,secret5,\n"
+    )
+    # Members cannot create accounts
+    response = client.post(
+        f"{settings.API_V1_STR}/users/import",
+        headers=auth_headers(client, "member@example.com"),
+        files={"file": ("team.csv", body, "text/csv")},
+    )
+    assert response.status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["admin@example.com"])
+    response = client.post(
+        f"{settings.API_V1_STR}/users/import",
+        headers=headers,
+        files={"file": ("team.csv", body, "text/csv")},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["total"] == 5
+    assert report["imported"] == 2
+    assert [e["row"] for e in report["errors"]] == [2, 3, 4]
+
+    bob = db.query(models.User).filter(models.User.email == "bob@example.com").first()
+    assert bob.name is None
+    assert bob.is_active is True
+    assert auth_headers(client, "ann@example.com", "secret1")
+
+def test_import_tasks_ndjson(client: TestClient, db):
+    headers = auth_headers(client, "admin@example.com")
+    ann = db.query(models.User).filter(models.User.email == "ann@example.com").first()
+    lines = [
+        {"title": "One"},
+        {"title": "Two", "assigned_to_id": ann.id, "priority": "High"},
+        {"description": "missing title"},
+        {"title": "Ghost", "assigned_to_id": 99999},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{broken\n"
+    response = client.post(
+        f"{settings.API_V1_STR}/tasks/import",
+        headers=headers,
+        files={"file": ("tasks.ndjson", body, "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["total"] == 5
+    assert report["imported"] == 2
+    assert [e["row"] for e in report["errors"]] == [3, 4, 5]
+
+    ann_headers = auth_headers(client, "ann@example.com", "secret1")
+    tasks = client.get(f"{settings.API_V1_STR}/tasks/", headers=ann_headers).json()
+    assert [t["title"] for t in tasks] == ["Two"]
+    notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=ann_headers).json()
+    assert notifications[0]["title"] == "New Tasks Assigned"
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.models.message import ChatInbox
+from app.services import inbox_service
+from tests.utils import create_test_user, auth_headers
+
+CONVERSATIONS = f"{settings.API_V1_STR}/messages/conversations"
+
+def _inbox(db, user_id):
+    db.expire_all()
+    return {row.chat_id: (row.last_message_preview, row.unread_count) for row in db.query(ChatInbox).filter(ChatInbox.user_id == user_id)}
+
+def test_inbox_is_maintained_on_send_and_read(client: TestClient, db):
+    owner = create_test_user(db, "inbox@example.com", name="Inbox Owner")
+    friends = [create_test_user(db, f"friend{i}@example.com", name=f"Friend {i}") for i in range(3)]
+    headers = auth_headers(client, "inbox@example.com")
+    friend_headers = auth_headers(client, "friend0@example.com")
+
+    direct = [client.post(CONVERSATIONS, headers=headers, json={"participant_ids": [f.id]}).json()["id"] for f in friends]
+    group = client.post(CONVERSATIONS, headers=headers, json={
+        "name": "Crew", "is_group": True, "participant_ids": [f.id for f in friends[:2]]
+    }).json()["id"]
+
+    client.post(f"{settings.API_V1_STR}/messages/{direct[0]}", headers=friend_headers, json={"content": "ping"})
+    client.post(f"{settings.API_V1_STR}/messages/{group}", headers=friend_headers, json={"content": "hello crew"})
+    client.post(f"{settings.API_V1_STR}/messages/{group}", headers=headers, json={"content": "x" * 300})
+
+    inbox = _inbox(db, owner.id)
+    assert inbox[direct[0]] == ("ping", 1)
+    assert inbox[group] == ("x" * inbox_service.PREVIEW_LENGTH, 1)
+    assert inbox[direct[1]] == (None, 0)
+    assert _inbox(db, friends[1].id)[group][1] == 2
+
+    # Reading clears the reader's count; their own message stays unread for the others
+    client.put(f"{settings.API_V1_STR}/messages/{group}/read", headers=headers)
+    assert _inbox(db, owner.id)[group][1] == 0
+    assert _inbox(db, friends[1].id)[group][1] == 1
+
+    conversations = client.get(CONVERSATIONS, headers=headers).json()
+    assert {c["id"] for c in conversations} == {group, *direct}
+    assert next(c for c in conversations if c["id"] == direct[0])["name"] == "Friend 0"
+    assert next(c for c in conversations if c["id"] == direct[1])["last_message_time"] is None
+
+    # The projection matches what a rebuild from the messages computes
+    maintained = {user.id: _inbox(db, user.id) for user in [owner, *friends]}
+    inbox_service.rebuild(db, direct + [group])
+    assert {user.id: _inbox(db, user.id) for user in [owner, *friends]} == maintained
+
+def test_inbox_pages_by_last_activity(client: TestClient, db, query_budget):
+    headers = auth_headers(client, "inbox@example.com")
+    everything = client.get(CONVERSATIONS, headers=headers).json()
+    assert len(everything) == 4
+    db.expunge_all()
+
+    # current user, the inbox range scan, the other party of the direct chats
+    with query_budget(3):
+        first = client.get(CONVERSATIONS, headers=headers, params={"limit": 3}).json()
+    rest = client.get(CONVERSATIONS, headers=headers, params={
+        "limit": 3, "before": first[-1]["last_activity"], "before_id": first[-1]["id"]
+    }).json()
+    assert [c["id"] for c in first + rest] == [c["id"] for c in everything]
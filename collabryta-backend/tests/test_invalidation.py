@@ -0,0 +1,55 @@
+import json
+from app.core.cache import TTLCache
+from app.core.invalidation import DASHBOARD_SUMMARY, MAX_PAYLOAD, InvalidationBus, LocalBackend, bus, encode
+from app.services import dashboard_service
+
+def _worker(hub):
+    worker = InvalidationBus(hub)
+    cache = TTLCache(ttl_seconds=60)
+    calls = []
+
+    def evict(keys):
+        calls.append(list(keys))
+        for key in keys:
+            cache.invalidate(key)
+    worker.subscribe(DASHBOARD_SUMMARY, evict)
+    return worker, cache, calls
+
+def test_publish_evicts_in_every_worker_once():
+    hub = LocalBackend()
+    (a, a_cache, a_calls), (_, b_cache, b_calls) = _worker(hub), _worker(hub)
+    for cache in (a_cache, b_cache):
+        cache.set(1, "stale")
+        cache.set(2, "fresh")
+
+    a.publish(DASHBOARD_SUMMARY, 1, None)
+    assert (a_cache.get(1), b_cache.get(1)) == (None, None)
+    assert (a_cache.get(2), b_cache.get(2)) == ("fresh", "fresh")
+    # The publisher's own echo is ignored
+    assert a_calls == b_calls == [[1]]
+
+    # Caches the publisher already updated itself only go to the others
+    a.publish(DASHBOARD_SUMMARY, 2, local=False)
+    assert (a_cache.get(2), b_cache.get(2)) == ("fresh", None)
+    # Only None keys are a no-op, not "everything"
+    a.publish(DASHBOARD_SUMMARY, None)
+    assert len(b_calls) == 2
+
+def test_large_events_split_to_fit_notify():
+    keys = list(range(100000, 103000))
+    payloads = encode("origin", DASHBOARD_SUMMARY, keys)
+    assert len(payloads) > 1
+    assert all(len(p) < 8000 for p in payloads)
+    assert [k for p in payloads for k in json.loads(p)["k"]] == keys
+    assert MAX_PAYLOAD < 8000
+
+def test_dashboard_cache_follows_remote_events():
+    dashboard_service._summary_cache.set(41, {"cached": True})
+    dashboard_service._summary_cache.set(42, {"cached": True})
+    bus.deliver(json.dumps({"o": "another-worker", "t": DASHBOARD_SUMMARY, "k": [41]}))
+    assert dashboard_service._summary_cache.get(41) is None
+    assert dashboard_service._summary_cache.get(42) is not None
+
+    # A listener that reconnected may have missed events, so it drops everything
+    bus.resync()
+    assert dashboard_service._summary_cache.get(42) is None
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.message import MessageMention
+from tests.utils import create_test_user, auth_headers
+
+def test_mentions_are_indexed_and_notified(client: TestClient, db):
+    create_test_user(db, "lead@example.com", name="Lead")
+    jane = create_test_user(db, "jane.roe@example.com", name="Jane Roe")
+    bob = create_test_user(db, "bob@example.com", name="Bob")
+    outsider = create_test_user(db, "nosy@example.com", name="Nosy")
+    headers = auth_headers(client, "lead@example.com")
+    chat = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers,
+        json={"name": "Launch", "is_group": True, "participant_ids": [jane.id, bob.id]}
+    ).json()
+
+    for content in ["@jane can you check?", "no mention, mail lead@example.com", "@JaneRoe again", "@jane.roe and @nosy, last one"]:
+        client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": content})
+
+    # Only chat members can be mentioned
+    assert db.query(MessageMention).filter(MessageMention.user_id == outsider.id).count() == 0
+
+    jane_headers = auth_headers(client, "jane.roe@example.com")
+    first = client.get(f"{settings.API_V1_STR}/mentions/?limit=2", headers=jane_headers).json()
+    assert [m["content"] for m in first] == ["@jane.roe and @nosy, last one", "@JaneRoe again"]
+    rest = client.get(f"{settings.API_V1_STR}/mentions/?limit=2&before={first[-1]['id']}", headers=jane_headers).json()
+    assert [m["content"] for m in rest] == ["@jane can you check?"]
+    assert rest[0]["sender"]["email"] == "lead@example.com"
+    assert client.get(f"{settings.API_V1_STR}/mentions/", headers=auth_headers(client, "bob@example.com")).json() == []
+
+    notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=jane_headers).json()
+    assert {n["source_type"] for n in notifications} == {"mention", "chat"}
+    mention = next(n for n in notifications if n["source_type"] == "mention")
+    assert (mention["title"], mention["count"]) == ("Lead mentioned you", 3)
+    bob_notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=auth_headers(client, "bob@example.com")).json()
+    assert {n["source_type"] for n in bob_notifications} == {"chat"}
+
+def test_mention_feed_uses_the_index(db):
+    plan = db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT message_id FROM message_mentions WHERE user_id = 1 AND message_id < 10 ORDER BY message_id DESC"
+    )).all()
+    assert not any("SCAN" in row[-1] for row in plan), plan
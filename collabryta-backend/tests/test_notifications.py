@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_message_notifications_coalesce_per_chat(client: TestClient, db):
+    create_test_user(db, "sender@example.com", name="Sender")
+    recipient = create_test_user(db, "recipient@example.com", name="Recipient")
+    sender_headers = auth_headers(client, "sender@example.com")
+    recipient_headers = auth_headers(client, "recipient@example.com")
+
+    chat = client.post(
+        f"{settings.API_V1_STR}/messages/conversations",
+        headers=sender_headers,
+        json={"participant_ids": [recipient.id]},
+    ).json()
+    for text in ["one", "two", "three"]:
+        client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=sender_headers, json={"content": text})
+
+    notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=recipient_headers).json()
+    chat_notifications = [n for n in notifications if n["source_type"] == "chat"]
+    assert len(chat_notifications) == 1
+    assert chat_notifications[0]["count"] == 3
+    assert chat_notifications[0]["description"] == "three"
+
+    client.put(f"{settings.API_V1_STR}/notifications/read-all", headers=recipient_headers)
+    client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=sender_headers, json={"content": "four"})
+
+    notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=recipient_headers).json()
+    chat_notifications = [n for n in notifications if n["source_type"] == "chat"]
+    assert len(chat_notifications) == 1
+    assert chat_notifications[0]["count"] == 1
+    assert chat_notifications[0]["is_read"] is False
@@ -0,0 +1,56 @@
+import zipfile
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core import storage
+from app.services import preview_service
+from tests.utils import create_test_user, auth_headers
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+def test_sniff_trusts_bytes_over_extension(tmp_path):
+    cases = {
+        "photo.txt": (PNG, ("image/png", "Image")),
+        "scan.png": (b"%PDF-1.7\n", ("application/pdf", "PDF")),
+        "clip.bin": (b"\x00\x00\x00\x18ftypmp42", ("video/mp4", "Video")),
+        "notes.pdf": (b"just some text", (None, None)),
+    }
+    for name, (content, expected) in cases.items():
+        (tmp_path / name).write_bytes(content)
+        assert preview_service.sniff(str(tmp_path / name)) == expected, name
+
+    with zipfile.ZipFile(tmp_path / "budget.xlsx", "w") as archive:
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+    assert preview_service.sniff(str(tmp_path / "budget.xlsx"))[1] == "Spreadsheet"
+
+def test_upload_is_sniffed_after_response(client: TestClient, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "backend", storage.LocalStorage(str(tmp_path), "/static/uploads"))
+    create_test_user(db, "previewer@example.com")
+    headers = auth_headers(client, "previewer@example.com")
+
+    response = client.post(
+        f"{settings.API_V1_STR}/files/upload", headers=headers,
+        data={"title": "Report"}, files={"file": ("report.bin", b"%PDF-1.4\n%%EOF\n", "application/octet-stream")}
+    )
+    assert response.status_code == 200
+    assert response.json()["preview_status"] == preview_service.PENDING
+
+    [listed] = client.get(f"{settings.API_V1_STR}/files/my-files", headers=headers).json()
+    assert listed["file_type"] == "PDF"
+    assert listed["content_type"] == "application/pdf"
+    # Rendering depends on pdftoppm being installed; the sniffed type does not
+    if preview_service.renderer("application/pdf") is None:
+        assert listed["preview_status"] == preview_service.UNAVAILABLE
+        assert listed["preview_url"] is None
+    else:
+        assert listed["preview_status"] in (preview_service.READY, preview_service.FAILED)
+
+def test_image_thumbnail_is_bounded(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "wide.upload"
+    Image.new("RGB", (1600, 400), "red").save(source, "PNG")
+
+    target = tmp_path / "wide.jpg"
+    assert preview_service.process(str(source), str(target)).status == preview_service.READY
+    with Image.open(target) as thumbnail:
+        assert thumbnail.size == (settings.PREVIEW_MAX_DIMENSION, 80)
@@ -0,0 +1,76 @@
+import threading
+import time
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.profiler import profiler, route_pattern
+from tests.utils import create_test_user, auth_headers
+
+PROFILE = f"{settings.API_V1_STR}/admin/profile"
+
+def _profile_in_background(client, headers, params):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(response=client.post(PROFILE, headers=headers, params=params)))
+    thread.start()
+    deadline = time.time() + 5
+    while profiler.session is None and time.time() < deadline:
+        time.sleep(0.01)
+    return thread, result
+
+def _spin(seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        sum(range(1000))
+
+def test_route_pattern():
+    pattern = route_pattern("/messages/{chat_id}", "/api/v1")
+    assert pattern.match("/api/v1/messages/12") and pattern.match("/messages/12/")
+    assert not pattern.match("/api/v1/messages/12/read")
+
+def test_profiling_is_admin_only(client: TestClient, db):
+    create_test_user(db, "member@example.com")
+    response = client.post(PROFILE, headers=auth_headers(client, "member@example.com"), params={"seconds": 0.1})
+    assert response.status_code == 403
+
+def test_samples_only_matching_requests(client: TestClient, db, monkeypatch):
+    create_test_user(db, "ops@example.com")
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["Ops@example.com"])
+    headers = auth_headers(client, "ops@example.com")
+
+    thread, result = _profile_in_background(
+        client, headers, {"route": "/auth/login", "requests": 2, "seconds": 30, "interval_ms": 1}
+    )
+    # Ignored: not the profiled route
+    client.get("/")
+    for _ in range(2):
+        auth_headers(client, "ops@example.com")
+    thread.join(timeout=30)
+
+    response = result["response"]
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Requests"] == "2"
+    lines = response.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    # Login time goes to password hashing
+    assert "verify_password" in response.text
+    assert "root (app/main.py" not in response.text
+
+def test_speedscope_output(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["ops@example.com"])
+    headers = auth_headers(client, "ops@example.com")
+    thread, result = _profile_in_background(client, headers, {"seconds": 0.5, "format": "speedscope", "interval_ms": 2})
+    _spin(0.3)
+    thread.join(timeout=10)
+
+    response = result["response"]
+    assert response.status_code == 200
+    document = response.json()
+    [sampled] = document["profiles"]
+    assert sampled["type"] == "sampled" and len(sampled["samples"]) == len(sampled["weights"])
+    names = {frame["name"] for frame in document["shared"]["frames"]}
+    assert "_spin" in names
+    assert all(0 <= i < len(document["shared"]["frames"]) for stack in sampled["samples"] for i in stack)
+
+    # A second profile is refused while one is running
+    thread, result = _profile_in_background(client, headers, {"seconds": 0.5})
+    assert client.post(PROFILE, headers=headers, params={"seconds": 0.1}).status_code == 409
+    thread.join(timeout=10)
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.models.message import Chat, Message, MessageArchiveSegment
+from app.models.task import Task
+from app.models.user import User
+from app.services import archive_service, message_service, purge_service
+from tests.conftest import TestingSessionLocal
+from tests.utils import create_test_user, auth_headers
+
+def test_delete_conversation_purges_messages_in_batches(client: TestClient, db, monkeypatch):
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 2)
+    create_test_user(db, "purger@example.com")
+    other = create_test_user(db, "purged@example.com")
+    outsider = create_test_user(db, "outsider@example.com")
+    headers = auth_headers(client, "purger@example.com")
+
+    chat = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers,
+        json={"participant_ids": [other.id]}
+    ).json()
+    for i in range(5):
+        client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": f"m{i}"})
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/messages/conversations/{chat['id']}",
+        headers=auth_headers(client, "outsider@example.com")
+    )
+    assert response.status_code == 403
+
+    response = client.delete(f"{settings.API_V1_STR}/messages/conversations/{chat['id']}", headers=headers)
+    assert response.status_code == 202
+    assert client.get(f"{settings.API_V1_STR}/messages/conversations", headers=headers).json() == []
+
+    db.expire_all()
+    assert db.query(Message).filter(Message.chat_id == chat["id"]).count() == 0
+    assert db.get(Chat, chat["id"]) is None
+    assert db.get(User, outsider.id) is not None
+
+def test_delete_me_purges_owned_rows(client: TestClient, db):
+    user_id = create_test_user(db, "leaving@example.com").id
+    headers = auth_headers(client, "leaving@example.com")
+    client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Orphan"})
+
+    response = client.delete(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert response.status_code == 202
+
+    db.expire_all()
+    assert db.get(User, user_id) is None
+    assert db.query(Task).filter(Task.owner_id == user_id).count() == 0
+
+def test_deleted_account_tokens_stop_working_and_unfinished_purges_are_retried(client: TestClient, db, monkeypatch):
+    user_id = create_test_user(db, "interrupted@example.com").id
+    headers = auth_headers(client, "interrupted@example.com")
+    client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Left behind"})
+
+    with monkeypatch.context() as m:
+        m.setattr(purge_service, "purge_user", lambda session_factory, user_id: None)  # the purge never ran
+        assert client.delete(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 202
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 400
+    assert client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Too late"}).status_code == 400
+
+    assert purge_service.purge_deleted_users(TestingSessionLocal) == 1
+    db.expire_all()
+    assert db.get(User, user_id) is None
+    assert db.query(Task).filter(Task.owner_id == user_id).count() == 0
+
+def test_group_members_leave_and_only_the_creator_deletes(client: TestClient, db):
+    create_test_user(db, "founder@example.com")
+    members = [create_test_user(db, f"member{i}@example.com") for i in range(2)]
+    headers = auth_headers(client, "founder@example.com")
+    member_headers = auth_headers(client, "member0@example.com")
+    chat = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers,
+        json={"name": "Team", "is_group": True, "participant_ids": [m.id for m in members]}
+    ).json()
+    client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": "welcome"})
+
+    response = client.delete(f"{settings.API_V1_STR}/messages/conversations/{chat['id']}", headers=member_headers)
+    assert response.status_code == 200 and response.json() == {"status": "left"}
+    assert client.get(f"{settings.API_V1_STR}/messages/conversations", headers=member_headers).json() == []
+    remaining = client.get(f"{settings.API_V1_STR}/messages/conversations", headers=headers).json()
+    assert [c["id"] for c in remaining] == [chat["id"]]
+    db.expire_all()
+    assert db.query(Message).filter(Message.chat_id == chat["id"]).count() == 1
+
+    response = client.delete(f"{settings.API_V1_STR}/messages/conversations/{chat['id']}", headers=headers)
+    assert response.status_code == 202
+    db.expire_all()
+    assert db.get(Chat, chat["id"]) is None
+
+def test_group_without_its_creator_is_purged_when_the_last_member_leaves(client: TestClient, db):
+    create_test_user(db, "gone@example.com")
+    members = [create_test_user(db, f"left{i}@example.com") for i in range(2)]
+    headers = auth_headers(client, "gone@example.com")
+    member_headers = [auth_headers(client, m.email) for m in members]
+    chats = [client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers,
+        json={"name": name, "is_group": True, "participant_ids": [m.id for m in members]}
+    ).json()["id"] for name in ("Orphaned", "Abandoned")]
+    chat_id = chats[0]
+    client.post(f"{settings.API_V1_STR}/messages/{chat_id}", headers=member_headers[0], json={"content": "archived"})
+    client.put(f"{settings.API_V1_STR}/messages/{chat_id}/read", headers=member_headers[1])
+    archive_service.archive_chat(db, chat_id, datetime.now(timezone.utc) + timedelta(minutes=1))
+    client.post(f"{settings.API_V1_STR}/messages/{chat_id}", headers=member_headers[1], json={"content": "hot"})
+
+    assert client.delete(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 202
+    db.expire_all()
+    assert db.get(Chat, chat_id).creator_id is None
+
+    # Every member leaves: the last one out detaches the chat for purging
+    assert [message_service.leave_chat(db, chat_id, m.id) for m in members] == [False, True]
+    assert client.get(f"{settings.API_V1_STR}/messages/conversations", headers=member_headers[1]).json()[0]["id"] == chats[1]
+    purge_service.purge_chat(TestingSessionLocal, chat_id)
+    db.expire_all()
+    assert db.get(Chat, chat_id) is None
+    assert db.query(Message).filter(Message.chat_id == chat_id).count() == 0
+    assert db.query(MessageArchiveSegment).filter(MessageArchiveSegment.chat_id == chat_id).count() == 0
+
+    # Without a creator any member may delete the group outright
+    response = client.delete(f"{settings.API_V1_STR}/messages/conversations/{chats[1]}", headers=member_headers[0])
+    assert response.json() == {"status": "scheduled"}
+    db.expire_all()
+    assert db.get(Chat, chats[1]) is None
+
+def test_chat_left_empty_by_a_purged_user_is_purged(client: TestClient, db):
+    create_test_user(db, "lastone@example.com")
+    first = create_test_user(db, "firstout@example.com")
+    headers = auth_headers(client, "lastone@example.com")
+    chat = client.post(
+        f"{settings.API_V1_STR}/messages/conversations", headers=headers,
+        json={"name": "Dwindling", "is_group": True, "participant_ids": [first.id]}
+    ).json()
+    client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": "anyone?"})
+    client.delete(f"{settings.API_V1_STR}/messages/conversations/{chat['id']}", headers=auth_headers(client, "firstout@example.com"))
+
+    assert client.delete(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 202
+    db.expire_all()
+    assert db.get(Chat, chat["id"]) is None
+
+def test_purged_user_shared_rows_reach_other_clients(client: TestClient, db):
+    create_test_user(db, "departing@example.com")
+    stayer = create_test_user(db, "stayer@example.com")
+    headers = auth_headers(client, "departing@example.com")
+    stayer_headers = auth_headers(client, "stayer@example.com")
+
+    chat = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [stayer.id]}).json()
+    message = client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": "bye"}).json()
+    task = client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Handover", "assigned_to_id": stayer.id}).json()
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    meeting = client.post(f"{settings.API_V1_STR}/meetings/", headers=headers, json={
+        "title": "Farewell", "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(), "participant_ids": [stayer.id],
+    }).json()
+    cursor = client.get(f"{settings.API_V1_STR}/sync", headers=stayer_headers).json()["cursor"]
+
+    assert client.delete(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 202
+
+    changes = client.get(f"{settings.API_V1_STR}/sync", headers=stayer_headers, params={"since": cursor}).json()["changes"]
+    ops = {(c["entity"], c["id"]): c["op"] for c in changes}
+    assert ops[("message", message["id"])] == "delete"
+    assert ops[("task", task["id"])] == "delete"
+    assert ops[("meeting", meeting["id"])] == "delete"
+    assert ops[("chat", chat["id"])] == "upsert"
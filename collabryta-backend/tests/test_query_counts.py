@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app import models
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def _selects(query_log, table):
+    return [s for s in query_log if s.startswith("SELECT") and f"FROM {table}" in s]
+
+def test_create_task_round_trips(client: TestClient, db, query_log):
+    create_test_user(db, "writer@example.com")
+    headers = auth_headers(client, "writer@example.com")
+    query_log.clear()
+
+    response = client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Counted"})
+    assert response.status_code == 200
+    assert response.json()["created_at"] is not None
+    # current user, task insert, change log, notification insert, change log
+    assert len(query_log) == 5
+    assert _selects(query_log, "tasks") == []
+
+def test_update_task_round_trips(client: TestClient, db, query_log):
+    headers = auth_headers(client, "writer@example.com")
+    task = client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Before"}).json()
+    query_log.clear()
+
+    response = client.put(f"{settings.API_V1_STR}/tasks/{task['id']}", headers=headers, json={"title": "After"})
+    assert response.status_code == 200
+    assert response.json()["updated_at"] is not None
+    # current user, permission load, change log, UPDATE ... RETURNING updated_at
+    assert len(query_log) == 4
+    assert len(_selects(query_log, "tasks")) == 1
+
+def test_send_message_round_trips(client: TestClient, db, query_log):
+    other = create_test_user(db, "reader@example.com")
+    headers = auth_headers(client, "writer@example.com")
+    chat = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}).json()
+    query_log.clear()
+
+    response = client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": "hi"})
+    assert response.status_code == 200
+    assert response.json()["sender"]["email"] == "writer@example.com"
+    # current user, participants, message insert, inbox update, change log, then one coalesced notification
+    assert len(query_log) == 8
+    assert _selects(query_log, "messages") == []
+    assert len(_selects(query_log, "users")) == 1
+
+def test_create_meeting_round_trips(client: TestClient, db, query_log):
+    other = db.query(models.User).filter(models.User.email == "reader@example.com").first()
+    headers = auth_headers(client, "writer@example.com")
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    query_log.clear()
+
+    response = client.post(f"{settings.API_V1_STR}/meetings/", headers=headers, json={
+        "title": "Sync",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "participant_ids": [other.id],
+    })
+    assert response.status_code == 200
+    assert response.json()["host"]["email"] == "writer@example.com"
+    assert [p["email"] for p in response.json()["participants"]] == ["reader@example.com"]
+    assert _selects(query_log, "meetings") == []
+    # current user + participant lookup; the host comes from the identity map
+    assert len(_selects(query_log, "users")) == 2
+
+def test_list_meetings_budget(client: TestClient, db, query_budget):
+    headers = auth_headers(client, "writer@example.com")
+    other = db.query(models.User).filter(models.User.email == "reader@example.com").first()
+    start = datetime.now(timezone.utc) + timedelta(days=2)
+    for i in range(3):
+        client.post(f"{settings.API_V1_STR}/meetings/", headers=headers, json={
+            "title": f"Standup {i}",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "participant_ids": [other.id],
+        })
+    # A fresh identity map, as a real request would have
+    db.expunge_all()
+
+    # current user, meetings joined to hosts, one selectin for all participants
+    with query_budget(3):
+        response = client.get(f"{settings.API_V1_STR}/meetings/", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= 3
+    assert all(m["participants"] for m in response.json())
+
+def test_chat_history_budget(client: TestClient, db, query_budget):
+    headers = auth_headers(client, "writer@example.com")
+    other = db.query(models.User).filter(models.User.email == "reader@example.com").first()
+    chat = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}).json()
+    for i in range(3):
+        client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": f"m{i}"})
+    db.expunge_all()
+
+    # Reopening the existing conversation loads its participants in one extra query
+    with query_budget(4):
+        response = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]})
+    assert response.json()["id"] == chat["id"]
+    db.expunge_all()
+
+    # current user, membership check, messages joined to senders
+    with query_budget(3):
+        response = client.get(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers)
+    assert all(m["sender"] for m in response.json())
@@ -0,0 +1,110 @@
+import asyncio
+import re
+import pytest
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.core.config import settings
+from app.core.rate_limit import AdmissionMiddleware, DatabaseBackend, MemoryBackend, RateLimiter
+from tests.conftest import engine
+from tests.utils import create_test_user, auth_headers
+
+@pytest.fixture
+def limited(monkeypatch):
+    limiter = RateLimiter(MemoryBackend(), {"POST /users/heartbeat": "2/minute"}, default=None)
+    monkeypatch.setattr(deps, "rate_limiter", limiter)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    return limiter
+
+def test_route_budget_returns_429_with_retry_after(client: TestClient, db, limited):
+    create_test_user(db, "chatty@example.com")
+    create_test_user(db, "quiet@example.com")
+    headers = auth_headers(client, "chatty@example.com")
+
+    for _ in range(2):
+        assert client.post(f"{settings.API_V1_STR}/users/heartbeat", headers=headers).status_code == 200
+    response = client.post(f"{settings.API_V1_STR}/users/heartbeat", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) == 30
+
+    # Budgets are per user and per route
+    other = auth_headers(client, "quiet@example.com")
+    assert client.post(f"{settings.API_V1_STR}/users/heartbeat", headers=other).status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 200
+
+def test_budgets_are_keyed_by_route_template(client: TestClient, db, monkeypatch):
+    limiter = RateLimiter(MemoryBackend(), {"GET /tasks/{id}": "2/minute"}, default=None)
+    monkeypatch.setattr(deps, "rate_limiter", limiter)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    headers = auth_headers(client, "chatty@example.com")
+
+    statuses = [client.get(f"{settings.API_V1_STR}/tasks/{task_id}", headers=headers).status_code for task_id in (1, 12, 123)]
+    assert 429 not in statuses[:2] and statuses[2] == 429
+
+def test_memory_backend_stays_within_maxsize():
+    backend = MemoryBackend(maxsize=3)
+    # Slow buckets are never idle long enough to be dropped as refilled
+    for i in range(5):
+        assert backend.take(f"slow:{i}", capacity=1, rate=1 / 3600) == 0
+    assert len(backend._buckets) == 3
+    # The least recently used ones went first
+    assert list(backend._buckets) == ["slow:2", "slow:3", "slow:4"]
+    assert backend.take("slow:4", capacity=1, rate=1 / 3600) > 0
+
+def test_database_backend_shares_buckets(db):
+    first, second = DatabaseBackend(engine), DatabaseBackend(engine)
+    assert first.take("POST /auth/login:ip:1.2.3.4", capacity=2, rate=1 / 60) == 0
+    assert second.take("POST /auth/login:ip:1.2.3.4", capacity=2, rate=1 / 60) == 0
+    retry_after = first.take("POST /auth/login:ip:1.2.3.4", capacity=2, rate=1 / 60)
+    assert 59 < retry_after <= 60
+    # A denied take does not spend tokens
+    assert 59 < second.take("POST /auth/login:ip:1.2.3.4", capacity=2, rate=1 / 60) <= 60
+    assert first.take("POST /auth/login:ip:5.6.7.8", capacity=2, rate=1 / 60) == 0
+    first.clear()
+
+def test_admission_sheds_load_with_503():
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        middleware = AdmissionMiddleware(slow_app, limit=1, wait_seconds=0.05, path_prefix="/api")
+        scope = {"type": "http", "path": "/api/v1/tasks/", "headers": []}
+        first = asyncio.ensure_future(middleware(scope, None, send))
+        await asyncio.sleep(0)
+        await middleware(scope, None, send)
+        release.set()
+        await first
+
+    asyncio.run(scenario())
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
+
+def test_admission_lets_exempt_transfers_through():
+    release = asyncio.Event()
+    sent = []
+
+    async def app(scope, receive, send):
+        if scope["method"] == "GET":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        middleware = AdmissionMiddleware(
+            app, limit=1, wait_seconds=0.05, path_prefix="/api", exempt=re.compile(r"^PATCH /api/v1/files/uploads/[^/]+$")
+        )
+        busy = asyncio.ensure_future(middleware({"type": "http", "method": "GET", "path": "/api/v1/tasks/", "headers": []}, None, send))
+        await asyncio.sleep(0)
+        await middleware({"type": "http", "method": "PATCH", "path": "/api/v1/files/uploads/abc", "headers": []}, None, send)
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert [m["status"] for m in sent] == [204, 204]
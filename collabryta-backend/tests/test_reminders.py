@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from app import models
+from app.services.reminder_service import ReminderScheduler
+from tests.conftest import TestingSessionLocal
+from tests.utils import create_test_user
+
+def _reminders(db, title):
+    db.expire_all()
+    return db.query(models.Notification).filter(models.Notification.title == title).all()
+
+def test_meeting_reminder_fires_once_across_workers(db):
+    host = create_test_user(db, "host@example.com")
+    muted = create_test_user(db, "muted@example.com")
+    muted.push_meetings = False
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    meeting = models.Meeting(
+        title="Planning", host_id=host.id, participants=[muted],
+        start_time=now + timedelta(minutes=20), end_time=now + timedelta(minutes=50)
+    )
+    db.add(meeting)
+    db.commit()
+
+    first = ReminderScheduler(TestingSessionLocal, worker="a")
+    second = ReminderScheduler(TestingSessionLocal, worker="b")
+    for scheduler in (first, second):
+        scheduler.load(now)
+        assert scheduler.next_fire_at() == now + timedelta(minutes=5)
+        assert scheduler.run_pending(now) == 0
+
+    later = now + timedelta(minutes=6)
+    assert first.run_pending(later) == 1
+    assert second.run_pending(later) == 0
+
+    reminders = _reminders(db, "Meeting Starting Soon")
+    # push_meetings=False opts the participant out
+    assert [n.user_id for n in reminders] == [host.id]
+
+    # A restarted worker recomputes the window but the lease stops a second send
+    restarted = ReminderScheduler(TestingSessionLocal, worker="c")
+    restarted.load(later)
+    assert restarted.run_pending(later) == 0
+    assert len(_reminders(db, "Meeting Starting Soon")) == 1
+
+def test_moved_or_completed_tasks_do_not_fire(db):
+    owner = create_test_user(db, "deadline@example.com")
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    due = models.Task(title="Ship", owner_id=owner.id, assigned_to_id=owner.id, end_date=now + timedelta(minutes=70))
+    done = models.Task(title="Done", owner_id=owner.id, status="Completed", end_date=now + timedelta(minutes=70))
+    moved = models.Task(title="Moved", owner_id=owner.id, end_date=now + timedelta(minutes=75))
+    db.add_all([due, done, moved])
+    db.commit()
+
+    scheduler = ReminderScheduler(TestingSessionLocal, worker="a")
+    scheduler.load(now)
+    moved.end_date = now + timedelta(days=2)
+    db.commit()
+
+    assert scheduler.run_pending(now + timedelta(minutes=20)) == 1
+    assert [n.source_id for n in _reminders(db, "Task Due Soon")] == [due.id]
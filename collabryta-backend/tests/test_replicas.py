@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.routing import RecentWriters, ReplicaSet, RoutingSession
+from app.models.user import User
+
+@pytest.fixture
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    for engine, email in ((primary, "primary@example.com"), (replica, "replica@example.com")):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(User.__table__.insert().values(email=email, hashed_password="x"))
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+def _factory(primary, replicas):
+    return sessionmaker(class_=RoutingSession, replicas=ReplicaSet(replicas, check_interval=0), bind=primary)
+
+def test_reads_use_replica_and_writes_use_primary(engines):
+    primary, replica = engines
+    writers = RecentWriters(window_seconds=60)
+    factory = _factory(primary, [replica])
+    writers.watch(factory)
+
+    db = factory(info={"read_only": True, "principal": "primary@example.com"})
+    assert db.scalars(select(User.email)).all() == ["replica@example.com"]
+    assert "primary@example.com" not in writers
+
+    db.add(User(email="new@example.com", hashed_password="x"))
+    db.commit()
+    db.close()
+
+    with primary.connect() as conn:
+        assert "new@example.com" in conn.execute(select(User.email)).scalars().all()
+    with replica.connect() as conn:
+        assert "new@example.com" not in conn.execute(select(User.email)).scalars().all()
+    # The writer's next requests read from the primary
+    assert "primary@example.com" in writers
+
+def test_writable_sessions_read_from_primary(engines):
+    primary, replica = engines
+    db = _factory(primary, [replica])()
+    assert db.scalars(select(User.email)).all() == ["primary@example.com"]
+    db.close()
+
+def test_unhealthy_replica_falls_back_to_primary(engines, tmp_path):
+    primary, _ = engines
+    missing = create_engine(f"sqlite:///{tmp_path}/no/such/dir/replica.db")
+    db = _factory(primary, [missing])(info={"read_only": True})
+    assert db.scalars(select(User.email)).all() == ["primary@example.com"]
+    db.close()
@@ -0,0 +1,38 @@
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy.orm import joinedload
+from fastapi.testclient import TestClient
+from app import models
+from app.core.config import settings
+from app.core.serialization import construct_all
+from app.schemas.message import MessageResponse
+from tests.utils import create_test_user, auth_headers
+
+def test_constructed_messages_match_validated(client: TestClient, db):
+    create_test_user(db, "fast@example.com")
+    other = create_test_user(db, "json@example.com")
+    headers = auth_headers(client, "fast@example.com")
+    chat = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}).json()
+    for i in range(40):
+        client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": f"message number {i}"})
+
+    messages = db.query(models.Message).options(joinedload(models.Message.sender)).filter(models.Message.chat_id == chat["id"]).all()
+    adapter = TypeAdapter(List[MessageResponse])
+    assert adapter.dump_json(construct_all(MessageResponse, messages)) == adapter.dump_json(
+        adapter.validate_python(messages, from_attributes=True)
+    )
+
+def test_large_responses_are_compressed(client: TestClient, db):
+    headers = auth_headers(client, "fast@example.com")
+    chat_id = db.query(models.Message.chat_id).first()[0]
+
+    response = client.get(f"{settings.API_V1_STR}/messages/{chat_id}", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 40
+
+    response = client.get(f"{settings.API_V1_STR}/messages/{chat_id}", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
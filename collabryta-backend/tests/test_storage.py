@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core import storage
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def _upload(client, headers, name, content):
+    return client.post(
+        f"{settings.API_V1_STR}/files/upload", headers=headers,
+        data={"title": name}, files={"file": (name, content, "application/octet-stream")}
+    ).json()
+
+def test_local_download_streams_from_disk(client: TestClient, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "backend", storage.LocalStorage(str(tmp_path), "/static/uploads"))
+    create_test_user(db, "local@example.com")
+    headers = auth_headers(client, "local@example.com")
+
+    uploaded = _upload(client, headers, "notes.txt", b"local bytes")
+    assert uploaded["download_url"] == f"/static/uploads/{uploaded['filename']}"
+    assert "preview_path" not in uploaded
+    assert (tmp_path / uploaded["filename"]).read_bytes() == b"local bytes"
+
+    response = client.get(f"{settings.API_V1_STR}/files/{uploaded['id']}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.content == b"local bytes"
+    assert client.get(f"{settings.API_V1_STR}/files/0/download", headers=headers).status_code == 404
+
+@pytest.fixture
+def s3(monkeypatch):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="files")
+        # S3's smallest allowed part size, so an 11 MB upload goes up in three parts
+        backend = storage.S3Storage(
+            "files", prefix="uploads/", client=client,
+            multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024
+        )
+        monkeypatch.setattr(storage, "backend", backend)
+        yield backend
+
+def test_s3_multipart_upload_and_presigned_download(client: TestClient, db, s3):
+    create_test_user(db, "s3@example.com")
+    headers = auth_headers(client, "s3@example.com")
+    content = bytes(range(256)) * (11 * 4096)
+
+    uploaded = _upload(client, headers, "big.bin", content)
+    key = f"uploads/{uploaded['filename']}"
+    assert uploaded["file_path"] == f"s3://files/{key}"
+    assert uploaded["file_size_bytes"] == len(content)
+    head = s3.client.head_object(Bucket="files", Key=key, PartNumber=1)
+    assert head["PartsCount"] == 3
+    assert b"".join(s3.open(uploaded["filename"])) == content
+
+    response = client.get(
+        f"{settings.API_V1_STR}/files/{uploaded['id']}/download", headers=headers, follow_redirects=False
+    )
+    assert response.status_code == 307
+    assert key in response.headers["location"]
+    assert "Signature" in response.headers["location"]
+
+    s3.delete(uploaded["filename"])
+    assert s3.client.list_objects_v2(Bucket="files").get("KeyCount") == 0
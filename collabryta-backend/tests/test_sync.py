@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_sync_returns_compacted_changes(client: TestClient, db):
+    create_test_user(db, "sync@example.com")
+    headers = auth_headers(client, "sync@example.com")
+
+    response = client.get(f"{settings.API_V1_STR}/sync", headers=headers)
+    assert response.status_code == 200
+    cursor = response.json()["cursor"]
+
+    task = client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Draft"}).json()
+    client.put(f"{settings.API_V1_STR}/tasks/{task['id']}", headers=headers, json={"title": "Final"})
+
+    content = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"since": cursor}).json()
+    task_changes = [c for c in content["changes"] if c["entity"] == "task"]
+    assert len(task_changes) == 1
+    assert task_changes[0]["op"] == "upsert"
+    assert task_changes[0]["data"]["title"] == "Final"
+    assert {c["entity"] for c in content["changes"]} == {"task", "notification"}
+
+    cursor = content["cursor"]
+    client.delete(f"{settings.API_V1_STR}/tasks/{task['id']}", headers=headers)
+    content = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"since": cursor}).json()
+    assert content["changes"] == [
+        {"cursor": content["cursor"], "entity": "task", "id": task["id"], "op": "delete", "data": None}
+    ]
+
+    content = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"since": content["cursor"]}).json()
+    assert content["changes"] == []
+
+def test_sync_pages_with_limit(client: TestClient, db):
+    headers = auth_headers(client, "sync@example.com")
+    for i in range(3):
+        client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": f"Task {i}"})
+
+    first = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"limit": 2}).json()
+    assert first["has_more"] is True
+    assert len(first["changes"]) == 2
+    rest = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"since": first["cursor"], "limit": 100}).json()
+    assert rest["has_more"] is False
+    seen = {(c["entity"], c["id"]) for c in first["changes"] + rest["changes"]}
+    assert len(seen) == len(first["changes"]) + len(rest["changes"])
+
+def test_sync_renders_chats_and_messages(client: TestClient, db):
+    other = create_test_user(db, "sync-peer@example.com")
+    headers = auth_headers(client, "sync@example.com")
+    cursor = client.get(f"{settings.API_V1_STR}/sync", headers=headers).json()["cursor"]
+    chat = client.post(f"{settings.API_V1_STR}/messages/conversations", headers=headers, json={"participant_ids": [other.id]}).json()
+    client.post(f"{settings.API_V1_STR}/messages/{chat['id']}", headers=headers, json={"content": "synced"})
+    db.expunge_all()
+
+    changes = client.get(f"{settings.API_V1_STR}/sync", headers=headers, params={"since": cursor}).json()["changes"]
+    data = {c["entity"]: c["data"] for c in changes}
+    assert {p["email"] for p in data["chat"]["participants"]} == {"sync@example.com", "sync-peer@example.com"}
+    assert data["message"]["sender"]["email"] == "sync@example.com"
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_bulk_create_update_delete(client: TestClient, db, query_log):
+    create_test_user(db, "lead@example.com")
+    member = create_test_user(db, "member@example.com")
+    headers = auth_headers(client, "lead@example.com")
+
+    response = client.post(f"{settings.API_V1_STR}/tasks/bulk", headers=headers, json={
+        "create": [{"title": f"Task {i}", "assigned_to_id": member.id} for i in range(4)],
+    })
+    assert response.status_code == 200
+    ids = [t["id"] for t in response.json()["created"]]
+    assert len(ids) == 4
+
+    query_log.clear()
+    response = client.post(f"{settings.API_V1_STR}/tasks/bulk", headers=headers, json={
+        "update": [{"ids": ids[:3], "changes": {"status": "Completed"}}],
+        "delete": [ids[3]],
+    })
+    assert response.status_code == 200
+    assert response.json() == {"created": [], "updated": ids[:3], "deleted": [ids[3]]}
+    assert len([s for s in query_log if s.startswith("UPDATE tasks")]) == 1
+    assert len([s for s in query_log if s.startswith("DELETE FROM tasks")]) == 1
+
+    member_headers = auth_headers(client, "member@example.com")
+    tasks = client.get(f"{settings.API_V1_STR}/tasks/", headers=member_headers).json()
+    assert sorted(t["id"] for t in tasks) == ids[:3]
+    assert {t["status"] for t in tasks} == {"Completed"}
+
+    notifications = client.get(f"{settings.API_V1_STR}/notifications/", headers=member_headers).json()
+    titles = [n["title"] for n in notifications]
+    assert titles.count("Task Statuses Updated") == 1
+    assert titles.count("New Tasks Assigned") == 1
+
+def test_bulk_rejects_whole_batch_without_permission(client: TestClient, db):
+    create_test_user(db, "outsider@example.com")
+    headers = auth_headers(client, "lead@example.com")
+    own = client.post(f"{settings.API_V1_STR}/tasks/", headers=headers, json={"title": "Mine"}).json()
+
+    outsider = auth_headers(client, "outsider@example.com")
+    response = client.post(f"{settings.API_V1_STR}/tasks/bulk", headers=outsider, json={
+        "update": [{"ids": [own["id"]], "changes": {"title": "Hijacked"}}],
+    })
+    assert response.status_code == 403
+    response = client.post(f"{settings.API_V1_STR}/tasks/bulk", headers=headers, json={"delete": [999999]})
+    assert response.status_code == 404
+    assert client.get(f"{settings.API_V1_STR}/tasks/{own['id']}", headers=headers).json()["title"] == "Mine"
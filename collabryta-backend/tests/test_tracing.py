@@ -0,0 +1,93 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import services
+from app.services import file_service
+from app.core import storage, tracing
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+@pytest.fixture
+def spans(tmp_path):
+    """Traces to a file for the test and returns a reader for what was exported."""
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(tracing.FileExporter(str(path)))
+    tracing.instrument_package(services)
+    tracing.instrument_sqlalchemy()
+
+    def read():
+        tracing.shutdown()
+        return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+    try:
+        yield read
+    finally:
+        tracing.configure(None)
+        tracing.uninstrument_sqlalchemy()
+        tracing.uninstrument_package(services)
+
+def test_parse_traceparent():
+    context = tracing.SpanContext("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    assert tracing.parse_traceparent(tracing.format_traceparent(context)) == context
+    for bad in ("", "00-xyz-00f067aa0ba902b7-01", "00-" + "0" * 32 + "-00f067aa0ba902b7-01"):
+        assert tracing.parse_traceparent(bad) is None
+
+def test_uninstrumenting_restores_services_and_engine_listeners():
+    original = file_service.upload_file
+    tracing.instrument_package(services)
+    tracing.instrument_sqlalchemy()
+    assert file_service.upload_file.__wrapped__ is original
+    assert event.contains(Engine, "before_cursor_execute", tracing._before_cursor_execute)
+
+    tracing.uninstrument_sqlalchemy()
+    tracing.uninstrument_package(services)
+    assert file_service.upload_file is original
+    assert not event.contains(Engine, "before_cursor_execute", tracing._before_cursor_execute)
+
+def test_request_service_sql_and_background_spans_share_a_trace(client: TestClient, db, tmp_path, monkeypatch, spans):
+    monkeypatch.setattr(storage, "backend", storage.LocalStorage(str(tmp_path / "uploads"), "/static/uploads"))
+    create_test_user(db, "tracer@example.com")
+    headers = auth_headers(client, "tracer@example.com")
+
+    response = client.post(
+        f"{settings.API_V1_STR}/files/upload", headers=headers,
+        data={"title": "Traced"}, files={"file": ("traced.txt", b"hello", "text/plain")}
+    )
+    assert response.status_code == 200
+    trace_id = response.headers[tracing.TRACE_HEADER]
+
+    exported = [s for s in spans() if s["traceId"] == trace_id]
+    by_name = {s["name"]: s for s in exported}
+    root = by_name["POST /api/v1/files/upload"]
+    assert root["parentSpanId"] == ""
+    assert root["attributes"]["http.response.status_code"] == 200
+
+    upload = by_name["file_service.upload_file"]
+    assert upload["parentSpanId"] == root["spanId"]
+    assert by_name["storage.save"]["parentSpanId"] == upload["spanId"]
+    assert by_name["storage.save"]["attributes"]["storage.bytes"] == 5
+    assert by_name["file_service.create_file_record"]["parentSpanId"] == upload["spanId"]
+    inserts = [s for s in exported if s["name"] == "INSERT" and "files" in s["attributes"]["db.statement"]]
+    assert inserts and inserts[0]["parentSpanId"] == by_name["file_service.create_file_record"]["spanId"]
+
+    # The preview runs after the response but stays in the request's trace
+    background = by_name["background preview_service.generate_preview"]
+    assert background["parentSpanId"] == root["spanId"]
+    assert background["startTimeUnixNano"] >= root["endTimeUnixNano"]
+    job = by_name["preview_service.generate_preview"]
+    assert job["parentSpanId"] == background["spanId"]
+    assert by_name["preview_service.save_result"]["parentSpanId"] == job["spanId"]
+
+def test_incoming_traceparent_is_continued(client: TestClient, spans):
+    sampled = tracing.SpanContext("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    response = client.get("/", headers={"traceparent": tracing.format_traceparent(sampled)})
+    assert response.headers[tracing.TRACE_HEADER] == sampled.trace_id
+
+    # An unsampled caller still gets its trace id back, but nothing is recorded
+    unsampled = sampled._replace(trace_id="0af7651916cd43dd8448eb211c80319c", sampled=False)
+    response = client.get("/", headers={"traceparent": tracing.format_traceparent(unsampled)})
+    assert response.headers[tracing.TRACE_HEADER] == unsampled.trace_id
+
+    [root] = spans()
+    assert (root["traceId"], root["parentSpanId"], root["name"]) == (sampled.trace_id, sampled.span_id, "GET /")
@@ -0,0 +1,97 @@
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.models.file import File
+from app.models.upload import UploadChunk, UploadSession
+from app.schemas.file import UploadSessionCreate
+from app.core import storage
+from app.services import upload_service
+from tests.utils import create_test_user, auth_headers
+
+CHUNK = {"Content-Type": "application/offset+octet-stream"}
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(storage, "backend", storage.LocalStorage(str(tmp_path), "/static/uploads"))
+    return tmp_path
+
+def _offset(client, url, headers):
+    return int(client.head(url, headers=headers).headers["upload-offset"])
+
+def test_chunks_in_any_order_then_finalize(client: TestClient, db, dirs):
+    create_test_user(db, "uploader@example.com")
+    create_test_user(db, "snooper@example.com")
+    headers = auth_headers(client, "uploader@example.com")
+
+    response = client.post(
+        f"{settings.API_V1_STR}/files/uploads", headers=headers,
+        json={"filename": "../clip.mp4", "title": "Clip", "length": 11}
+    )
+    assert response.status_code == 201
+    url = response.headers["location"]
+    assert _offset(client, url, headers) == 0
+
+    # The tail arrives first, as it would from a parallel sender
+    response = client.patch(url, headers={**headers, **CHUNK, "Upload-Offset": "6"}, content=b"world")
+    assert response.status_code == 204
+    assert response.headers["upload-offset"] == "0"
+    assert client.post(f"{url}/finalize", headers=headers).status_code == 409
+
+    assert client.patch(url, headers={**headers, **CHUNK, "Upload-Offset": "0"}, content=b"hello ").headers["upload-offset"] == "11"
+    assert client.patch(url, headers={**headers, **CHUNK, "Upload-Offset": "8"}, content=b"rld!").status_code == 413
+    assert client.head(url, headers=auth_headers(client, "snooper@example.com")).status_code == 404
+
+    response = client.post(f"{url}/finalize", headers=headers)
+    assert response.status_code == 200
+    uploaded = response.json()
+    assert uploaded["file_type"] == "Video"
+    assert uploaded["file_size_bytes"] == 11
+    assert uploaded["filename"].endswith("_clip.mp4")
+    with open(uploaded["file_path"], "rb") as f:
+        assert f.read() == b"hello world"
+
+    assert db.get(File, uploaded["id"]) is not None
+    assert client.head(url, headers=headers).status_code == 404
+    assert os.listdir(dirs / "staging") == []
+
+def test_collect_garbage_drops_expired_sessions(db, dirs):
+    owner = create_test_user(db, "abandoner@example.com")
+    stale = upload_service.create_session(db, UploadSessionCreate(filename="a.bin", title="A", length=4), owner.id)
+    fresh = upload_service.create_session(db, UploadSessionCreate(filename="b.bin", title="B", length=4), owner.id)
+    stale.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db.add(UploadChunk(session_id=stale.id, start=0, end=2))
+    db.commit()
+    orphan = os.path.join(settings.UPLOAD_STAGING_DIR, "gone.part")
+    open(orphan, "wb").close()
+    os.utime(orphan, (0, 0))
+
+    assert upload_service.collect_garbage(db) == 2
+    db.expire_all()
+    assert [s.id for s in db.query(UploadSession)] == [fresh.id]
+    assert db.query(UploadChunk).count() == 0
+    assert os.listdir(settings.UPLOAD_STAGING_DIR) == [f"{fresh.id}.part"]
+
+def test_open_uploads_are_capped_and_expired_ones_refused(client: TestClient, db, dirs, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_SESSIONS_PER_USER", 2)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_PENDING_BYTES_PER_USER", 100)
+    headers = auth_headers(client, "uploader@example.com")
+    url = f"{settings.API_V1_STR}/files/uploads"
+
+    first = client.post(url, headers=headers, json={"filename": "a.bin", "title": "A", "length": 60})
+    assert first.status_code == 201
+    # Reserved bytes count against the quota
+    assert client.post(url, headers=headers, json={"filename": "b.bin", "title": "B", "length": 50}).status_code == 429
+    assert client.post(url, headers=headers, json={"filename": "c.bin", "title": "C", "length": 10}).status_code == 201
+    assert client.post(url, headers=headers, json={"filename": "d.bin", "title": "D", "length": 1}).status_code == 429
+
+    # Past its expiry a session takes no more chunks and frees its share of the quota
+    session = db.get(UploadSession, first.json()["id"])
+    session.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db.commit()
+    location = first.headers["location"]
+    assert client.patch(location, headers={**headers, **CHUNK, "Upload-Offset": "0"}, content=b"late").status_code == 404
+    assert client.post(f"{location}/finalize", headers=headers).status_code == 404
+    assert client.post(url, headers=headers, json={"filename": "e.bin", "title": "E", "length": 80}).status_code == 201
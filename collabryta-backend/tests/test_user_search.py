@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from tests.utils import create_test_user, auth_headers
+
+def test_search_users_prefix_and_fuzzy(client: TestClient, db):
+    create_test_user(db, "searcher@example.com", name="Searcher")
+    create_test_user(db, "alice.smith@example.com", name="Alice Smith")
+    create_test_user(db, "bob@example.com", name="Bob Allen")
+    headers = auth_headers(client, "searcher@example.com")
+
+    response = client.get(f"{settings.API_V1_STR}/users/search", headers=headers, params={"q": "al"})
+    assert response.status_code == 200
+    assert [u["name"] for u in response.json()] == ["Alice Smith", "Bob Allen"]
+    assert set(response.json()[0]) == {"id", "name", "email", "job_title"}
+
+    response = client.get(f"{settings.API_V1_STR}/users/search", headers=headers, params={"q": "smit"})
+    assert [u["email"] for u in response.json()] == ["alice.smith@example.com"]
+
+    response = client.get(f"{settings.API_V1_STR}/users/search", headers=headers, params={"q": "alise"})
+    assert [u["name"] for u in response.json()] == ["Alice Smith"]
+
+def test_search_sees_profile_updates(client: TestClient, db):
+    headers = auth_headers(client, "searcher@example.com")
+    client.put(f"{settings.API_V1_STR}/users/me", headers=headers, json={"name": "Zelda Quinn"})
+
+    response = client.get(f"{settings.API_V1_STR}/users/search", headers=headers, params={"q": "zel"})
+    assert [u["email"] for u in response.json()] == ["searcher@example.com"]
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.user import User
+
+def create_test_user(db: Session, email: str, password: str = "password123", name: str = "Test User") -> User:
+    user = User(email=email, name=name, hashed_password=get_password_hash(password))
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def auth_headers(client: TestClient, email: str, password: str = "password123") -> dict:
+    response = client.post(f"{settings.API_V1_STR}/auth/login", data={"username": email, "password": password})
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -76,6 +76,9 @@ const FilesPage: React.FC = () => {
     return parseFloat((bytes / Math.pow(k, i)).toFixed(1)) + ' ' + sizes[i];
   };
 
+  // Local storage returns static paths, object storage absolute presigned URLs
+  const assetUrl = (url: string) => (url.startsWith("http") ? url : `http://localhost:8000${url}`);
+
   const mapFileType = (ftype: string | undefined, filename: string) => {
     const ext = filename.split('.').pop()?.toLowerCase() || '';
     if (['doc', 'docx'].includes(ext)) return <FileText size={24} className="text-blue-600" />;
@@ -181,8 +184,12 @@ const FilesPage: React.FC = () => {
             <div className="divide-y divide-zinc-100">
               {filteredFiles.map((file) => (
                 <div key={file.id} className="p-4 flex items-center gap-4 hover:bg-zinc-50 group transition-colors">
-                  <div className="w-10 h-10 rounded-lg bg-zinc-50 flex items-center justify-center shrink-0 border border-zinc-100">
-                    {mapFileType(file.file_type, file.filename)}
+                  <div className="w-10 h-10 rounded-lg bg-zinc-50 flex items-center justify-center shrink-0 border border-zinc-100 overflow-hidden">
+                    {file.preview_url ? (
+                      <img src={assetUrl(file.preview_url)} alt="" loading="lazy" className="w-full h-full object-cover" />
+                    ) : (
+                      mapFileType(file.file_type, file.filename)
+                    )}
                   </div>
 
                   <div className="flex-1 min-w-0">
@@ -196,7 +203,7 @@ const FilesPage: React.FC = () => {
 
                   <div className="flex items-center gap-2 opacity-0 group-hover:opacity-100 transition-opacity">
                     <a
-                      href={`http://localhost:8000/${file.file_path.replace(/\\/g, '/').replace(/^app\//, '')}`}
+                      href={file.download_url ? assetUrl(file.download_url) : `http://localhost:8000/${file.file_path.replace(/\\/g, '/').replace(/^app\//, '')}`}
                       target="_blank"
                       rel="noopener noreferrer"
                       className="p-2 text-zinc-400 hover:text-blue-600 hover:bg-blue-50 rounded-lg transition-colors"
@@ -5,7 +5,7 @@ import {
     ArrowLeft, Phone, Video, MoreVertical,
     Check
 } from "lucide-react";
-import { messageService, Chat, Message } from "../../services/messageService";
+import { messageService, Chat, Message, MESSAGE_PAGE_SIZE } from "../../services/messageService";
 import { userService, User } from "../../services/userService";
 import { authService } from "../../services/authService";
 import { motion, AnimatePresence } from "framer-motion";
@@ -97,6 +97,13 @@ const CreateGroupModal = ({ isOpen, onClose, users, onCreate }: any) => {
     );
 };
 
+// Pages from polling and "load earlier" overlap; keep one copy of each message, in id order
+const mergeMessages = (current: Message[], page: Message[], chatId: number): Message[] => {
+    const byId = new Map(current.filter(m => m.chat_id === chatId).map(m => [m.id, m]));
+    page.forEach(m => byId.set(m.id, m));
+    return Array.from(byId.values()).sort((a, b) => a.id - b.id);
+};
+
 const MessagesPage: React.FC = () => {
     const [chats, setChats] = useState<Chat[]>([]);
     const [messages, setMessages] = useState<Message[]>([]);
@@ -107,6 +114,7 @@ const MessagesPage: React.FC = () => {
     const [inputText, setInputText] = useState("");
     const [isMobileChatOpen, setIsMobileChatOpen] = useState(false);
     const [isGroupModalOpen, setIsGroupModalOpen] = useState(false);
+    const [reachedStart, setReachedStart] = useState(false);
 
     const messagesContainerRef = useRef<HTMLDivElement>(null);
 
@@ -134,7 +142,7 @@ const MessagesPage: React.FC = () => {
     const loadMessages = useCallback(async (chatId: number) => {
         try {
             const msgs = await messageService.getMessages(chatId);
-            setMessages(msgs);
+            setMessages(prev => mergeMessages(prev, msgs, chatId));
             await messageService.markAsRead(chatId);
             loadChats();
         } catch (e) {
@@ -142,6 +150,17 @@ const MessagesPage: React.FC = () => {
         }
     }, [loadChats]);
 
+    const loadEarlierMessages = async () => {
+        if (!activeChatId || messages.length === 0) return;
+        try {
+            const msgs = await messageService.getMessages(activeChatId, messages[0].id);
+            setMessages(prev => mergeMessages(prev, msgs, activeChatId));
+            setReachedStart(msgs.length < MESSAGE_PAGE_SIZE);
+        } catch (e) {
+            console.error("Failed to load earlier messages:", e);
+        }
+    };
+
     const scrollToBottom = useCallback((smooth = true) => {
         if (messagesContainerRef.current) {
             const { scrollHeight, clientHeight } = messagesContainerRef.current;
@@ -171,14 +190,17 @@ const MessagesPage: React.FC = () => {
 
     useEffect(() => {
         if (activeChatId) {
+            setReachedStart(false);
             loadMessages(activeChatId);
             setTimeout(() => scrollToBottom(false), 100);
         }
     }, [activeChatId, loadMessages, scrollToBottom]);
 
+    // Only new messages scroll down; polling and loading earlier history leave the position alone
+    const lastMessageId = messages.length ? messages[messages.length - 1].id : null;
     useEffect(() => {
         scrollToBottom();
-    }, [messages, scrollToBottom]);
+    }, [lastMessageId, scrollToBottom]);
 
     const handleSendMessage = async () => {
         if (!inputText.trim() || !activeChatId) return;
@@ -345,6 +367,13 @@ const MessagesPage: React.FC = () => {
                     {/* Chat Messages */}
                     <div className="flex-1 overflow-hidden relative">
                         <div ref={messagesContainerRef} className="absolute inset-0 overflow-y-auto p-4 sm:p-6 space-y-4 custom-scrollbar">
+                            {messages.length >= MESSAGE_PAGE_SIZE && !reachedStart && (
+                                <div className="flex justify-center">
+                                    <button onClick={loadEarlierMessages} className="px-3 py-1.5 text-xs font-semibold text-zinc-500 hover:text-zinc-900 hover:bg-zinc-100 rounded-lg transition-colors">
+                                        Load earlier messages
+                                    </button>
+                                </div>
+                            )}
                             <AnimatePresence initial={false}>
                                 {messages.map((msg, idx) => {
                                     const isMe = msg.sender_id === currentUser?.id;
@@ -10,6 +10,10 @@ export interface FileData {
     description?: string;
     uploaded_at: string;
     owner_id: number;
+    content_type?: string | null;
+    preview_status?: string | null;
+    preview_url?: string | null;
+    download_url?: string | null;
 }
 
 export const fileService = {
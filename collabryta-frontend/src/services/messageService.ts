@@ -6,6 +6,7 @@ export interface Chat {
     is_group: boolean;
     last_message?: string;
     last_message_time?: string;
+    last_activity?: string;
     status?: 'online' | 'offline' | 'group';
     other_user_id?: number | null;
     unread_count?: number;
@@ -27,6 +28,8 @@ export interface Message {
     is_read: boolean;
 }
 
+export const MESSAGE_PAGE_SIZE = 100;
+
 export const messageService = {
     getChats: async (): Promise<Chat[]> => {
         const response = await api.get('/messages/conversations');
@@ -42,8 +45,9 @@ export const messageService = {
         return response.data;
     },
 
-    getMessages: async (chatId: number): Promise<Message[]> => {
-        const response = await api.get(`/messages/${chatId}`);
+    // Latest page of a chat, oldest first; pass the first loaded message id as `before` for earlier history
+    getMessages: async (chatId: number, before?: number, limit: number = MESSAGE_PAGE_SIZE): Promise<Message[]> => {
+        const response = await api.get(`/messages/${chatId}`, { params: { before, limit } });
         return response.data;
     },
 